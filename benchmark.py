@@ -0,0 +1,84 @@
+import argparse
+import asyncio
+import gc
+import os
+import tracemalloc
+import typing
+
+from proto import client_to_agent_pb2
+from server.lobby import Lobby
+from server.supervisor import get_usage
+
+
+async def drain(session: 'typing.AsyncIterator[client_to_agent_pb2.Frame]') -> None:
+    async for _ in session:
+        pass
+
+
+async def open_sessions(
+        service: Lobby, user_count: int, room_size: int, closing: asyncio.Future) -> 'list[asyncio.Task]':
+    sessions = []
+    channel_index = 0
+
+    async def read(index: int, command: client_to_agent_pb2.CommandRequest):
+        yield client_to_agent_pb2.Frame(login=client_to_agent_pb2.UserRequest(index=index))
+
+        if command is not None:
+            yield client_to_agent_pb2.Frame(command=command)
+
+        await closing
+
+    for index in range(1, user_count + 1):
+        command = None
+
+        if room_size and 1 == index % room_size:
+            command = client_to_agent_pb2.CommandRequest(status=client_to_agent_pb2.CommandRequest.Status.MAKE_CHANNEL)
+            channel_index += 1
+        elif room_size:
+            command = client_to_agent_pb2.CommandRequest(
+                status=client_to_agent_pb2.CommandRequest.Status.JOIN_CHANNEL, channel=channel_index)
+
+        sessions.append(asyncio.ensure_future(drain(service.Session(read(index, command), None))))
+
+        await asyncio.sleep(0)
+
+    for _ in range(4):
+        await asyncio.sleep(0)
+
+    return sessions
+
+
+async def run() -> None:
+    parser = argparse.ArgumentParser(
+        prog='python benchmark.py', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--users', dest='users', type=int, default=50000, help='number of sessions to open')
+    parser.add_argument('--room-size', dest='room_size', type=int, default=10, help='users per room, 0 for lobby only')
+    arguments = parser.parse_args()
+
+    service = Lobby('localhost:0', 'localhost:0')
+    gc.collect()
+    tracemalloc.start()
+    base_memory = tracemalloc.get_traced_memory()[0]
+    base_usage = get_usage(os.getpid())
+
+    closing = asyncio.get_event_loop().create_future()
+    sessions = await open_sessions(service, arguments.users, arguments.room_size, closing)
+
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0] - base_memory
+    usage = get_usage(os.getpid())
+
+    print(f'{service.streams} sessions in rooms of {arguments.room_size}')
+    print(f'{len(asyncio.all_tasks())} tasks live, {len(asyncio.all_tasks()) / arguments.users:.1f} per user')
+    print(f'traced memory {memory / 2 ** 20:.1f}MiB, {memory / arguments.users:.0f} bytes per user')
+
+    if base_usage is not None and usage is not None:
+        rss = usage.RSS - base_usage.RSS
+        print(f'rss {rss / 2 ** 20:.1f}MiB, {rss / arguments.users:.0f} bytes per user')
+
+    closing.set_result(None)
+    await asyncio.gather(*sessions)
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(run())
@@ -1,52 +1,122 @@
 import argparse
+import asyncio
 import collections
-import concurrent.futures
 import logging
-import os
-import signal
+import socket
 import sys
 
 import grpc
-import socket
-import typing
 
 from proto import client_to_agent_pb2
 from proto import client_to_agent_pb2_grpc
 
 
-class Channel:
-    def __init__(self, address: str, channel_index: int, user_index: int, executor: concurrent.futures.ThreadPoolExecutor):
-        self.__address = address
-        self.__index = channel_index
+class Session:
+    __keepalive_seconds = 5
+    __outbox_capacity = 1024
+    __batch_size = 256
+
+    def __init__(self, call: grpc.aio.StreamStreamCall, user_index: int):
+        self.__call = call
+        self.__index = user_index
+        self.__replies = asyncio.Queue()
+        self.__outbox = asyncio.Queue(self.__outbox_capacity)
+        self.__listings = {}
+        self.channel = 0
+
+    async def login(self) -> None:
+        await self.__call.write(
+            client_to_agent_pb2.Frame(login=client_to_agent_pb2.UserRequest(index=self.__index)))
+
+    async def send_chat(self, text: str, channel: int = 0) -> None:
+        await self.__outbox.put(
+            client_to_agent_pb2.Frame(chat=client_to_agent_pb2.Chat(index=self.__index, text=text, channel=channel)))
+
+    async def request(
+            self, status: client_to_agent_pb2.CommandRequest.Status, channel: int = 0,
+            version: int = None, after: int = None) -> client_to_agent_pb2.CommandReply:
+        await self.__outbox.put(
+            client_to_agent_pb2.Frame(command=client_to_agent_pb2.CommandRequest(
+                index=self.__index, status=status, channel=channel, version=version, after=after)))
+
+        return await self.__replies.get()
+
+    async def list(
+            self, status: client_to_agent_pb2.CommandRequest.Status, channel: int = 0,
+            after: int = None) -> client_to_agent_pb2.CommandReply:
+        key = (status, channel, after)
+        listing = self.__listings.get(key)
+        response = await self.request(status, channel, None if listing is None else listing.version, after)
+
+        if client_to_agent_pb2.CommandReply.Status.UNCHANGED == response.status:
+            return listing
+
+        self.__listings[key] = response
+
+        return response
+
+    async def keep_alive(self) -> None:
+        while True:
+            await self.__outbox.put(client_to_agent_pb2.Frame(keepalive=client_to_agent_pb2.HeartbeatReply()))
+            await asyncio.sleep(self.__keepalive_seconds)
+
+    async def flush(self) -> None:
+        while True:
+            frames = [await self.__outbox.get()]
+
+            while not self.__outbox.empty():
+                frames.append(self.__outbox.get_nowait())
+
+            for frame in self.__get_frames(frames):
+                await self.__call.write(frame)
+
+    async def receive(self) -> None:
+        async for frame in self.__call:
+            body = frame.WhichOneof('body')
+
+            if 'chat' == body:
+                print(f'{frame.chat.index}: {frame.chat.text}')
+            elif 'chats' == body:
+                for chat in frame.chats.chats:
+                    print(f'{chat.index}: {chat.text}')
+            elif 'status' == body:
+                print_status(frame.status)
+            elif 'reply' == body:
+                self.__replies.put_nowait(frame.reply)
+            elif 'keepalive' == body:
+                logging.debug(frame.keepalive.time)
+
+    def __get_frames(
+            self, frames: 'list[client_to_agent_pb2.Frame]') -> 'collections.Iterator[client_to_agent_pb2.Frame]':
+        chats = []
+
+        for frame in frames:
+            if 'chat' == frame.WhichOneof('body') and len(chats) < self.__batch_size:
+                chats.append(frame.chat)
+                continue
 
-        channel = grpc.insecure_channel(address)
-        self.__stub = stub = client_to_agent_pb2_grpc.ChannelStub(channel)
+            if chats:
+                yield self.__get_chat_frame(chats)
 
-        iterator = stub.TryChatReceive(
-            client_to_agent_pb2.Chat(index=user_index))
-        self.__chat_future = executor.submit(handle_chat_response, iterator)
+            chats = []
 
-        iterator = stub.TryStatusRequest(
-            client_to_agent_pb2.UserRequest(index=user_index))
-        self.__status_future = executor.submit(handle_status_response, iterator)
+            if 'chat' == frame.WhichOneof('body'):
+                chats.append(frame.chat)
+            else:
+                yield frame
 
-    @property
-    def stub(self) -> client_to_agent_pb2_grpc.ChannelStub:
-        return self.__stub
+        if chats:
+            yield self.__get_chat_frame(chats)
 
-    @property
-    def address(self) -> str:
-        return self.__address
+    @staticmethod
+    def __get_chat_frame(chats: 'list[client_to_agent_pb2.Chat]') -> client_to_agent_pb2.Frame:
+        if 1 == len(chats):
+            return client_to_agent_pb2.Frame(chat=chats[0])
 
-    @property
-    def index(self) -> int:
-        return self.__index
+        return client_to_agent_pb2.Frame(chats=client_to_agent_pb2.ChatBatch(chats=chats))
 
 
-def handle_chat_send(
-        user_index: int,
-        lobby_stub: client_to_agent_pb2_grpc.LobbyStub,
-        executor: concurrent.futures.ThreadPoolExecutor) -> None:
+async def handle_chat_send(session: Session) -> None:
     lobby_chat_command = '/all'
     make_channel_command = '/make'
     list_channels_command = '/list'
@@ -64,44 +134,44 @@ def handle_chat_send(
         (help_command, 'list up all commands'),
     )
     helps = collections.OrderedDict(helps)
-    channel = None
+    loop = asyncio.get_event_loop()
 
     print(f'Help: {help_command}')
 
     while True:
-        try:
-            text = input()
-        except KeyboardInterrupt as e:
+        text = await loop.run_in_executor(None, sys.stdin.readline)
+
+        if not text:
             break
 
         text = text.strip()
         words = text.split()
+
+        if not words:
+            continue
+
         command = words[0]
 
         if command not in helps:
-            if channel is None:
+            if not session.channel:
                 print('You have to join a channel to chat')
             else:
-                channel.stub.TryChatSend(client_to_agent_pb2.Chat(index=user_index, text=text))
+                await session.send_chat(text, session.channel)
 
             continue
 
         text = ' '.join(words[1:])
 
         if lobby_chat_command == command:
-            lobby_stub.TryChatSend(client_to_agent_pb2.Chat(index=user_index, text=text))
+            await session.send_chat(text)
         elif make_channel_command == command:
-            if channel is None:
-                response = lobby_stub.TryCommand(
-                    client_to_agent_pb2.CommandRequest(
-                        index=user_index,
-                        status=client_to_agent_pb2.CommandRequest.Status.MAKE_CHANNEL))
+            if not session.channel:
+                response = await session.request(client_to_agent_pb2.CommandRequest.Status.MAKE_CHANNEL)
 
                 if client_to_agent_pb2.CommandReply.Status.SUCCESS == response.status:
-                    channel_index = response.channels[0]
-                    channel = Channel(response.address, channel_index, user_index, executor)
+                    session.channel = response.channels[0]
 
-                    print(f'channel is created:{response.address}')
+                    print(f'channel {session.channel} is created:{response.address}')
                 elif client_to_agent_pb2.CommandReply.Status.FAILURE == response.status:
                     print('channel creating is failed')
                 else:
@@ -109,10 +179,7 @@ def handle_chat_send(
             else:
                 print('you are in a channel already')
         elif list_channels_command == command:
-            response = lobby_stub.TryCommand(
-                client_to_agent_pb2.CommandRequest(
-                    index=user_index,
-                    status=client_to_agent_pb2.CommandRequest.Status.LIST_CHANNELS))
+            response = await session.list(client_to_agent_pb2.CommandRequest.Status.LIST_CHANNELS)
 
             if response.channels:
                 for channel in response.channels:
@@ -120,7 +187,7 @@ def handle_chat_send(
             else:
                 print('There is no channel')
         elif join_channel_command == command:
-            if channel is not None:
+            if session.channel:
                 print('You entered in a channel')
                 continue
 
@@ -130,14 +197,10 @@ def handle_chat_send(
                 print('You entered invalid channel')
                 continue
 
-            response = lobby_stub.TryCommand(
-                client_to_agent_pb2.CommandRequest(
-                    status=client_to_agent_pb2.CommandRequest.Status.JOIN_CHANNEL,
-                    index=user_index,
-                    channel=channel_index))
+            response = await session.request(client_to_agent_pb2.CommandRequest.Status.JOIN_CHANNEL, channel_index)
 
             if client_to_agent_pb2.CommandReply.Status.SUCCESS == response.status:
-                channel = Channel(response.address, channel_index, user_index, executor)
+                session.channel = channel_index
 
                 print(f'You joined at channel {response.address}')
             elif client_to_agent_pb2.CommandReply.Status.FAILURE == response.status:
@@ -145,35 +208,35 @@ def handle_chat_send(
             else:
                 assert False
         elif leave_channel_command == command:
-            if channel is None:
+            if not session.channel:
                 print('It can use when you are in a channel')
                 continue
 
-            lobby_stub.TryCommand(
-                client_to_agent_pb2.CommandRequest(
-                    status=client_to_agent_pb2.CommandRequest.Status.LEAVE_CHANNEL,
-                    index=user_index,
-                    channel=channel.index))
+            await session.request(client_to_agent_pb2.CommandRequest.Status.LEAVE_CHANNEL, session.channel)
 
-            print(f'You left from channel {channel.address}')
-            channel = None
+            print(f'You left from channel {session.channel}')
+            session.channel = 0
         elif list_users_command == command:
             try:
                 channel_index = int(text)
             except ValueError:
                 channel_index = 0
 
-            response = lobby_stub.TryCommand(
-                client_to_agent_pb2.CommandRequest(
-                    index=user_index,
-                    status=client_to_agent_pb2.CommandRequest.Status.LIST_USERS,
-                    channel=channel_index))
+            after = None
+
+            while True:
+                response = await session.list(
+                    client_to_agent_pb2.CommandRequest.Status.LIST_USERS, channel_index, after)
 
-            if response.users:
                 assert len(response.users) == len(response.channels)
 
                 for _user_index, _channel_index in zip(response.users, response.channels):
                     print(f'user:{_user_index} at channel {_channel_index}')
+
+                if not response.HasField('after'):
+                    break
+
+                after = response.after
         elif help_command == command:
             for command, description in helps.items():
                 print(f'{command}: {description}')
@@ -181,77 +244,60 @@ def handle_chat_send(
             assert False
 
 
-def handle_heartbeat(response_iterator: 'typing.Iterator[client_to_agent_pb2.HeartbeatReply]') -> None:
-    for response in response_iterator:
-        logging.debug(response.time)
-
-
-def handle_chat_response(response_iterator: 'typing.Iterator[client_to_agent_pb2.Chat]') -> None:
-    for response in response_iterator:
-        print(f'{response.index}: {response.text}')
-
-
-def handle_status_response(
-        response_iterator: 'typing.Iterator[client_to_agent_pb2.StatusReply]',
-        cancelling_futures = None) -> None:
-    for response in response_iterator:
-        if response.status == client_to_agent_pb2.StatusReply.Status.JOIN_USER:
-            if response.channel:
-                print(f'user {response.index} joined at channel {response.channel}')
-            else:
-                print(f'user {response.index} joined at lobby')
-        elif response.status == client_to_agent_pb2.StatusReply.Status.LEAVE_USER:
-            if response.channel:
-                print(f'user {response.index} left from channel {response.channel}')
-            else:
-                print(f'user {response.index} left from lobby')
-        elif response.status == client_to_agent_pb2.StatusReply.Status.QUIT:
-            print("You're checked by late response")
+def print_status(response: client_to_agent_pb2.StatusReply) -> None:
+    if response.status == client_to_agent_pb2.StatusReply.Status.JOIN_USER:
+        if response.channel:
+            print(f'user {response.index} joined at channel {response.channel}')
         else:
-            assert False
+            print(f'user {response.index} joined at lobby')
+    elif response.status == client_to_agent_pb2.StatusReply.Status.LEAVE_USER:
+        if response.channel:
+            print(f'user {response.index} left from channel {response.channel}')
+        else:
+            print(f'user {response.index} left from lobby')
+    elif response.status == client_to_agent_pb2.StatusReply.Status.MOVE_CHANNEL:
+        print(f'channel {response.channel} moved to {response.address}')
+    elif response.status == client_to_agent_pb2.StatusReply.Status.QUIT:
+        print("You're checked by late response")
+    else:
+        assert False
 
 
-def run() -> None:
+async def run() -> None:
     parser = argparse.ArgumentParser(prog='python console.py', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
-    parser.add_argument('--agent', dest='agent', default='loca'
-                                                         'lhost:50050', help='agent address to connect')
+    parser.add_argument('--agent', dest='agent', default='localhost:50050', help='agent address to connect')
     arguments = parser.parse_args()
 
-    with grpc.insecure_channel(arguments.agent) as agent_channel:
+    async with grpc.aio.insecure_channel(arguments.agent) as agent_channel:
         hostname = socket.gethostname()
         ip_address = socket.gethostbyname(hostname)
 
         agent_stub = client_to_agent_pb2_grpc.AgentStub(agent_channel)
-        agent_response = agent_stub.TryLogin(client_to_agent_pb2.LoginRequest(ip=ip_address))
-
-        print(f'my index is {agent_response.index}')
-
-        with grpc.insecure_channel(agent_response.heartbeat_ip) as heartbeat_channel:
-            heartbeat_stub = client_to_agent_pb2_grpc.HeartbeatStub(heartbeat_channel)
-            heartbeat_response_iterator = heartbeat_stub.TryHeartbeat(
-                client_to_agent_pb2.HeartbeatRequest(index=agent_response.index))
+        agent_response = await agent_stub.TryLogin(client_to_agent_pb2.LoginRequest(ip=ip_address))
 
-            executor = concurrent.futures.ThreadPoolExecutor()
-            f0 = executor.submit(handle_heartbeat, heartbeat_response_iterator)
+    print(f'my index is {agent_response.index}')
 
-            with grpc.insecure_channel(agent_response.lobby_ip) as lobby_channel:
-                lobby_stub = client_to_agent_pb2_grpc.LobbyStub(lobby_channel)
-                lobby_response_iterator = lobby_stub.TryChatReceive(
-                    client_to_agent_pb2.Chat(index=agent_response.index))
-                lobby_status_iterator = lobby_stub.TryStatusRequest(
-                    client_to_agent_pb2.UserRequest(index=agent_response.index))
+    async with grpc.aio.insecure_channel(agent_response.lobby_ip) as lobby_channel:
+        lobby_stub = client_to_agent_pb2_grpc.LobbyStub(lobby_channel)
+        session = Session(lobby_stub.Session(), agent_response.index)
+        await session.login()
 
-                f1 = executor.submit(handle_chat_response, lobby_response_iterator)
-                f2 = executor.submit(handle_chat_send, agent_response.index, lobby_stub, executor)
+        tasks = (
+            asyncio.ensure_future(session.receive()),
+            asyncio.ensure_future(session.keep_alive()),
+            asyncio.ensure_future(session.flush()),
+            asyncio.ensure_future(handle_chat_send(session)))
 
-                cancelling_futures_when_quit = (f0, f1, f2)
-                f3 = executor.submit(handle_status_response, lobby_status_iterator, cancelling_futures_when_quit)
-                futures = cancelling_futures_when_quit + (f3,)
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
 
-                concurrent.futures.wait(futures)
+        for task in tasks:
+            task.cancel()
 
 
 if __name__ == '__main__':
     logging.basicConfig()
 
-    run()
+    try:
+        asyncio.get_event_loop().run_until_complete(run())
+    except KeyboardInterrupt:
+        pass
@@ -19,7 +19,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   syntax='proto3',
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\x15\x63lient_to_agent.proto\"1\n\x04\x43hat\x12\r\n\x05index\x18\x01 \x01(\x05\x12\x11\n\x04text\x18\x02 \x01(\tH\x00\x88\x01\x01\x42\x07\n\x05_text\"\xcd\x01\n\x0e\x43ommandRequest\x12&\n\x06status\x18\x01 \x01(\x0e\x32\x16.CommandRequest.Status\x12\r\n\x05index\x18\x02 \x01(\x05\x12\x14\n\x07\x63hannel\x18\x03 \x01(\x05H\x00\x88\x01\x01\"b\n\x06Status\x12\x11\n\rLIST_CHANNELS\x10\x00\x12\x10\n\x0cMAKE_CHANNEL\x10\x01\x12\x10\n\x0cJOIN_CHANNEL\x10\x02\x12\x11\n\rLEAVE_CHANNEL\x10\x03\x12\x0e\n\nLIST_USERS\x10\x04\x42\n\n\x08_channel\"\xab\x01\n\x0c\x43ommandReply\x12)\n\x06status\x18\x01 \x01(\x0e\x32\x14.CommandReply.StatusH\x00\x88\x01\x01\x12\x14\n\x07\x61\x64\x64ress\x18\x02 \x01(\tH\x01\x88\x01\x01\x12\x10\n\x08\x63hannels\x18\x03 \x03(\x05\x12\r\n\x05users\x18\x04 \x03(\x05\"\"\n\x06Status\x12\x0b\n\x07SUCCESS\x10\x00\x12\x0b\n\x07\x46\x41ILURE\x10\x01\x42\t\n\x07_statusB\n\n\x08_address\"\x07\n\x05\x45mpty\"!\n\x10HeartbeatRequest\x12\r\n\x05index\x18\x01 \x01(\x05\"\x1e\n\x0eHeartbeatReply\x12\x0c\n\x04time\x18\x01 \x01(\x03\"\x1a\n\x0cLoginRequest\x12\n\n\x02ip\x18\x01 \x01(\t\"C\n\nLoginReply\x12\r\n\x05index\x18\x01 \x01(\x05\x12\x14\n\x0cheartbeat_ip\x18\x02 \x01(\t\x12\x10\n\x08lobby_ip\x18\x03 \x01(\t\"\x9e\x01\n\x0bStatusReply\x12#\n\x06status\x18\x01 \x01(\x0e\x32\x13.StatusReply.Status\x12\r\n\x05index\x18\x02 \x01(\x05\x12\x14\n\x07\x63hannel\x18\x03 \x01(\x05H\x00\x88\x01\x01\"9\n\x06Status\x12\x06\n\x02OK\x10\x00\x12\r\n\tJOIN_USER\x10\x01\x12\x0e\n\nLEAVE_USER\x10\x02\x12\x08\n\x04QUIT\x10\x03\x42\n\n\x08_channel\"\x1c\n\x0bUserRequest\x12\r\n\x05index\x18\x01 \x01(\x05\"Y\n\x0eUserLivesReply\x12&\n\x06status\x18\x01 \x01(\x0e\x32\x16.UserLivesReply.Status\"\x1f\n\x06Status\x12\x08\n\x04LIVE\x10\x00\x12\x0b\n\x07UNKNOWN\x10\x01\x32\x31\n\x05\x41gent\x12(\n\x08TryLogin\x12\r.LoginRequest\x1a\x0b.LoginReply\"\x00\x32\x85\x02\n\x05Lobby\x12\x1e\n\x0bTryChatSend\x12\x05.Chat\x1a\x06.Empty\"\x00\x12\"\n\x0eTryChatReceive\x12\x05.Chat\x1a\x05.Chat\"\x00\x30\x01\x12\'\n\rTryUserRemove\x12\x0c.UserRequest\x1a\x06.Empty\"\x00\x12.\n\nTryCommand\x12\x0f.CommandRequest\x1a\r.CommandReply\"\x00\x12+\n\x0bTryUserExit\x12\x0c.UserRequest\x1a\x0c.StatusReply\"\x00\x12\x32\n\x10TryStatusRequest\x12\x0c.UserRequest\x1a\x0c.StatusReply\"\x00\x30\x01\x32\xaa\x01\n\x07\x43hannel\x12\x1e\n\x0bTryChatSend\x12\x05.Chat\x1a\x06.Empty\"\x00\x12\"\n\x0eTryChatReceive\x12\x05.Chat\x1a\x05.Chat\"\x00\x30\x01\x12\'\n\rTryUserRemove\x12\x0c.UserRequest\x1a\x06.Empty\"\x00\x12\x32\n\x10TryStatusRequest\x12\x0c.UserRequest\x1a\x0c.StatusReply\"\x00\x30\x01\x32t\n\tHeartbeat\x12\x36\n\x0cTryHeartbeat\x12\x11.HeartbeatRequest\x1a\x0f.HeartbeatReply\"\x00\x30\x01\x12/\n\x0cTryUserLives\x12\x0c.UserRequest\x1a\x0f.UserLivesReply\"\x00\x62\x06proto3'
+  serialized_pb=b'\n\x15\x63lient_to_agent.proto\"S\n\x04\x43hat\x12\r\n\x05index\x18\x01 \x01(\x05\x12\x11\n\x04text\x18\x02 \x01(\tH\x00\x88\x01\x01\x12\x14\n\x07\x63hannel\x18\x03 \x01(\x05H\x01\x88\x01\x01\x42\x07\n\x05_textB\n\n\x08_channel\"!\n\tChatBatch\x12\x14\n\x05\x63hats\x18\x01 \x03(\x0b\x32\x05.Chat\"\xab\x02\n\x0e\x43ommandRequest\x12&\n\x06status\x18\x01 \x01(\x0e\x32\x16.CommandRequest.Status\x12\r\n\x05index\x18\x02 \x01(\x05\x12\x14\n\x07\x63hannel\x18\x03 \x01(\x05H\x00\x88\x01\x01\x12\x14\n\x07version\x18\x04 \x01(\x04H\x01\x88\x01\x01\x12\x12\n\x05\x61\x66ter\x18\x05 \x01(\x05H\x02\x88\x01\x01\x12\x12\n\x05limit\x18\x06 \x01(\x05H\x03\x88\x01\x01\"b\n\x06Status\x12\x11\n\rLIST_CHANNELS\x10\x00\x12\x10\n\x0cMAKE_CHANNEL\x10\x01\x12\x10\n\x0cJOIN_CHANNEL\x10\x02\x12\x11\n\rLEAVE_CHANNEL\x10\x03\x12\x0e\n\nLIST_USERS\x10\x04\x42\n\n\x08_channelB\n\n\x08_versionB\x08\n\x06_afterB\x08\n\x06_limit\"\xfa\x01\n\x0c\x43ommandReply\x12)\n\x06status\x18\x01 \x01(\x0e\x32\x14.CommandReply.StatusH\x00\x88\x01\x01\x12\x14\n\x07\x61\x64\x64ress\x18\x02 \x01(\tH\x01\x88\x01\x01\x12\x10\n\x08\x63hannels\x18\x03 \x03(\x05\x12\r\n\x05users\x18\x04 \x03(\x05\x12\x14\n\x07version\x18\x05 \x01(\x04H\x02\x88\x01\x01\x12\x12\n\x05\x61\x66ter\x18\x06 \x01(\x05H\x03\x88\x01\x01\"1\n\x06Status\x12\x0b\n\x07SUCCESS\x10\x00\x12\x0b\n\x07\x46\x41ILURE\x10\x01\x12\r\n\tUNCHANGED\x10\x02\x42\t\n\x07_statusB\n\n\x08_addressB\n\n\x08_versionB\x08\n\x06_after\"\x07\n\x05\x45mpty\"!\n\x10HeartbeatRequest\x12\r\n\x05index\x18\x01 \x01(\x05\"\x1e\n\x0eHeartbeatReply\x12\x0c\n\x04time\x18\x01 \x01(\x03\"\x1a\n\x0cLoginRequest\x12\n\n\x02ip\x18\x01 \x01(\t\"C\n\nLoginReply\x12\r\n\x05index\x18\x01 \x01(\x05\x12\x14\n\x0cheartbeat_ip\x18\x02 \x01(\t\x12\x10\n\x08lobby_ip\x18\x03 \x01(\t\"\xd2\x01\n\x0bStatusReply\x12#\n\x06status\x18\x01 \x01(\x0e\x32\x13.StatusReply.Status\x12\r\n\x05index\x18\x02 \x01(\x05\x12\x14\n\x07\x63hannel\x18\x03 \x01(\x05H\x00\x88\x01\x01\x12\x14\n\x07\x61\x64\x64ress\x18\x04 \x01(\tH\x01\x88\x01\x01\"K\n\x06Status\x12\x06\n\x02OK\x10\x00\x12\r\n\tJOIN_USER\x10\x01\x12\x0e\n\nLEAVE_USER\x10\x02\x12\x08\n\x04QUIT\x10\x03\x12\x10\n\x0cMOVE_CHANNEL\x10\x04\x42\n\n\x08_channelB\n\n\x08_address\"\xec\x01\n\x05\x46rame\x12\x1d\n\x05login\x18\x01 \x01(\x0b\x32\x0c.UserRequestH\x00\x12\x15\n\x04\x63hat\x18\x02 \x01(\x0b\x32\x05.ChatH\x00\x12\"\n\x07\x63ommand\x18\x03 \x01(\x0b\x32\x0f.CommandRequestH\x00\x12\x1e\n\x05reply\x18\x04 \x01(\x0b\x32\r.CommandReplyH\x00\x12\x1e\n\x06status\x18\x05 \x01(\x0b\x32\x0c.StatusReplyH\x00\x12$\n\tkeepalive\x18\x06 \x01(\x0b\x32\x0f.HeartbeatReplyH\x00\x12\x1b\n\x05\x63hats\x18\x07 \x01(\x0b\x32\n.ChatBatchH\x00\x42\x06\n\x04\x62ody\"L\n\x08Presence\x12\r\n\x05index\x18\x01 \x01(\x05\x12\x0f\n\x07\x63hannel\x18\x02 \x01(\x05\x12\x0f\n\x07removed\x18\x03 \x01(\x08\x12\x0f\n\x07\x61\x64\x64ress\x18\x04 \x01(\t\">\n\x0cSubscription\x12\x0f\n\x07\x63hannel\x18\x01 \x01(\x05\x12\x0e\n\x06origin\x18\x02 \x01(\t\x12\r\n\x05moved\x18\x03 \x01(\x08\"A\n\tMigration\x12\x0f\n\x07\x63hannel\x18\x01 \x01(\x05\x12\x0e\n\x06source\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65stination\x18\x03 \x01(\t\">\n\x0b\x43hannelLoad\x12\x0f\n\x07\x61\x64\x64ress\x18\x01 \x01(\t\x12\r\n\x05rooms\x18\x02 \x01(\x05\x12\x0f\n\x07streams\x18\x03 \x01(\x05\"7\n\x08Snapshot\x12\r\n\x05shard\x18\x01 \x01(\x05\x12\x1c\n\tpresences\x18\x02 \x03(\x0b\x32\t.Presence\"d\n\x05Relay\x12\x15\n\x04\x63hat\x18\x01 \x01(\x0b\x32\x05.ChatH\x00\x12\x1d\n\x08presence\x18\x02 \x01(\x0b\x32\t.PresenceH\x00\x12\x1d\n\x08snapshot\x18\x03 \x01(\x0b\x32\t.SnapshotH\x00\x42\x06\n\x04\x62ody\">\n\x0bUserRequest\x12\r\n\x05index\x18\x01 \x01(\x05\x12\x14\n\x07\x63hannel\x18\x02 \x01(\x05H\x00\x88\x01\x01\x42\n\n\x08_channel\"Y\n\x0eUserLivesReply\x12&\n\x06status\x18\x01 \x01(\x0e\x32\x16.UserLivesReply.Status\"\x1f\n\x06Status\x12\x08\n\x04LIVE\x10\x00\x12\x0b\n\x07UNKNOWN\x10\x01\"\x1f\n\x0cUsersRequest\x12\x0f\n\x07indexes\x18\x01 \x03(\x05\"L\n\x0fUsersLivesReply\x12\x0f\n\x07indexes\x18\x01 \x03(\x05\x12(\n\x08statuses\x18\x02 \x03(\x0e\x32\x16.UserLivesReply.Status\"H\n\x0eUsersExitReply\x12\x0f\n\x07indexes\x18\x01 \x03(\x05\x12%\n\x08statuses\x18\x02 \x03(\x0e\x32\x13.StatusReply.Status\"\xa7\x01\n\x0e\x44irectoryEntry\x12&\n\x06status\x18\x01 \x01(\x0e\x32\x16.DirectoryEntry.Status\x12\x0f\n\x07\x63hannel\x18\x02 \x01(\x05\x12\r\n\x05index\x18\x03 \x01(\x05\"M\n\x06Status\x12\x0f\n\x0b\x41\x44\x44_CHANNEL\x10\x00\x12\x12\n\x0eREMOVE_CHANNEL\x10\x01\x12\r\n\tMOVE_USER\x10\x02\x12\x0f\n\x0bREMOVE_USER\x10\x03\"P\n\tDirectory\x12 \n\x07\x65ntries\x18\x01 \x03(\x0b\x32\x0f.DirectoryEntry\x12\x0f\n\x07version\x18\x02 \x01(\x04\x12\x10\n\x08snapshot\x18\x03 \x01(\x08\x32\x31\n\x05\x41gent\x12(\n\x08TryLogin\x12\r.LoginRequest\x1a\x0b.LoginReply\"\x00\x32\x8a\x04\n\x05Lobby\x12\x1e\n\x0bTryChatSend\x12\x05.Chat\x1a\x06.Empty\"\x00\x12\'\n\x0eTryChatReceive\x12\x05.Chat\x1a\n.ChatBatch\"\x00\x30\x01\x12\'\n\rTryUserRemove\x12\x0c.UserRequest\x1a\x06.Empty\"\x00\x12.\n\nTryCommand\x12\x0f.CommandRequest\x1a\r.CommandReply\"\x00\x12+\n\x0bTryUserExit\x12\x0c.UserRequest\x1a\x0c.StatusReply\"\x00\x12\x30\n\x0cTryUsersExit\x12\r.UsersRequest\x1a\x0f.UsersExitReply\"\x00\x12\x32\n\x10TryStatusRequest\x12\x0c.UserRequest\x1a\x0c.StatusReply\"\x00\x30\x01\x12\x1f\n\x07Session\x12\x06.Frame\x1a\x06.Frame\"\x00(\x01\x30\x01\x12\x1e\n\x08TryRelay\x12\x06.Relay\x1a\x06.Empty\"\x00(\x01\x12.\n\x12TryChannelRegister\x12\x0c.ChannelLoad\x1a\x06.Empty\"\x00(\x01\x12(\n\x0eWatchDirectory\x12\x06.Empty\x1a\n.Directory\"\x00\x30\x01\x12\x31\n\x0bTryUserList\x12\x0f.CommandRequest\x1a\r.CommandReply\"\x00\x30\x01\x32\xd7\x02\n\x07\x43hannel\x12\x1e\n\x0bTryChatSend\x12\x05.Chat\x1a\x06.Empty\"\x00\x12\'\n\x0eTryChatReceive\x12\x05.Chat\x1a\n.ChatBatch\"\x00\x30\x01\x12\'\n\rTryUserRemove\x12\x0c.UserRequest\x1a\x06.Empty\"\x00\x12\x32\n\x10TryStatusRequest\x12\x0c.UserRequest\x1a\x0c.StatusReply\"\x00\x30\x01\x12-\n\x0cTrySubscribe\x12\r.Subscription\x1a\n.ChatBatch\"\x00\x30\x01\x12(\n\x10TryChatBatchSend\x12\n.ChatBatch\x1a\x06.Empty\"\x00\x12%\n\rTryRoomImport\x12\n.Migration\x1a\x06.Empty\"\x00\x12&\n\rTryRoomExport\x12\n.Migration\x1a\x05.Chat\"\x00\x30\x01\x32\x37\n\x06\x46\x61nout\x12-\n\x0cTrySubscribe\x12\r.Subscription\x1a\n.ChatBatch\"\x00\x30\x01\x32\x8a\x02\n\tHeartbeat\x12\x36\n\x0cTryHeartbeat\x12\x11.HeartbeatRequest\x1a\x0f.HeartbeatReply\"\x00\x30\x01\x12/\n\x0cTryUserLives\x12\x0c.UserRequest\x1a\x0f.UserLivesReply\"\x00\x12\x32\n\rTryUsersLives\x12\r.UsersRequest\x1a\x10.UsersLivesReply\"\x00\x12+\n\x0fTryExpiredUsers\x12\x06.Empty\x1a\x0c.UserRequest\"\x00\x30\x01\x12\x33\n\x12TryHeartbeatReport\x12\x11.HeartbeatRequest\x1a\x06.Empty\"\x00(\x01\x62\x06proto3'
 )
 
 
@@ -59,8 +59,8 @@ _COMMANDREQUEST_STATUS = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=172,
-  serialized_end=270,
+  serialized_start=303,
+  serialized_end=401,
 )
 _sym_db.RegisterEnumDescriptor(_COMMANDREQUEST_STATUS)
 
@@ -81,11 +81,16 @@ _COMMANDREPLY_STATUS = _descriptor.EnumDescriptor(
       serialized_options=None,
       type=None,
       create_key=_descriptor._internal_create_key),
+    _descriptor.EnumValueDescriptor(
+      name='UNCHANGED', index=2, number=2,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=399,
-  serialized_end=433,
+  serialized_start=604,
+  serialized_end=653,
 )
 _sym_db.RegisterEnumDescriptor(_COMMANDREPLY_STATUS)
 
@@ -116,11 +121,16 @@ _STATUSREPLY_STATUS = _descriptor.EnumDescriptor(
       serialized_options=None,
       type=None,
       create_key=_descriptor._internal_create_key),
+    _descriptor.EnumValueDescriptor(
+      name='MOVE_CHANNEL', index=4, number=4,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=721,
-  serialized_end=778,
+  serialized_start=985,
+  serialized_end=1060,
 )
 _sym_db.RegisterEnumDescriptor(_STATUSREPLY_STATUS)
 
@@ -144,11 +154,46 @@ _USERLIVESREPLY_STATUS = _descriptor.EnumDescriptor(
   ],
   containing_type=None,
   serialized_options=None,
-  serialized_start=880,
-  serialized_end=911,
+  serialized_start=1879,
+  serialized_end=1910,
 )
 _sym_db.RegisterEnumDescriptor(_USERLIVESREPLY_STATUS)
 
+_DIRECTORYENTRY_STATUS = _descriptor.EnumDescriptor(
+  name='Status',
+  full_name='DirectoryEntry.Status',
+  filename=None,
+  file=DESCRIPTOR,
+  create_key=_descriptor._internal_create_key,
+  values=[
+    _descriptor.EnumValueDescriptor(
+      name='ADD_CHANNEL', index=0, number=0,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+    _descriptor.EnumValueDescriptor(
+      name='REMOVE_CHANNEL', index=1, number=1,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+    _descriptor.EnumValueDescriptor(
+      name='MOVE_USER', index=2, number=2,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+    _descriptor.EnumValueDescriptor(
+      name='REMOVE_USER', index=3, number=3,
+      serialized_options=None,
+      type=None,
+      create_key=_descriptor._internal_create_key),
+  ],
+  containing_type=None,
+  serialized_options=None,
+  serialized_start=2188,
+  serialized_end=2265,
+)
+_sym_db.RegisterEnumDescriptor(_DIRECTORYENTRY_STATUS)
+
 
 _CHAT = _descriptor.Descriptor(
   name='Chat',
@@ -172,6 +217,13 @@ _CHAT = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='channel', full_name='Chat.channel', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -188,9 +240,46 @@ _CHAT = _descriptor.Descriptor(
       index=0, containing_type=None,
       create_key=_descriptor._internal_create_key,
     fields=[]),
+    _descriptor.OneofDescriptor(
+      name='_channel', full_name='Chat._channel',
+      index=1, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
   ],
   serialized_start=25,
-  serialized_end=74,
+  serialized_end=108,
+)
+
+
+_CHATBATCH = _descriptor.Descriptor(
+  name='ChatBatch',
+  full_name='ChatBatch',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='chats', full_name='ChatBatch.chats', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=110,
+  serialized_end=143,
 )
 
 
@@ -223,6 +312,27 @@ _COMMANDREQUEST = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='version', full_name='CommandRequest.version', index=3,
+      number=4, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='after', full_name='CommandRequest.after', index=4,
+      number=5, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='limit', full_name='CommandRequest.limit', index=5,
+      number=6, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -240,9 +350,24 @@ _COMMANDREQUEST = _descriptor.Descriptor(
       index=0, containing_type=None,
       create_key=_descriptor._internal_create_key,
     fields=[]),
+    _descriptor.OneofDescriptor(
+      name='_version', full_name='CommandRequest._version',
+      index=1, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
+    _descriptor.OneofDescriptor(
+      name='_after', full_name='CommandRequest._after',
+      index=2, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
+    _descriptor.OneofDescriptor(
+      name='_limit', full_name='CommandRequest._limit',
+      index=3, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
   ],
-  serialized_start=77,
-  serialized_end=282,
+  serialized_start=146,
+  serialized_end=445,
 )
 
 
@@ -282,6 +407,20 @@ _COMMANDREPLY = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='version', full_name='CommandReply.version', index=4,
+      number=5, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='after', full_name='CommandReply.after', index=5,
+      number=6, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -304,9 +443,19 @@ _COMMANDREPLY = _descriptor.Descriptor(
       index=1, containing_type=None,
       create_key=_descriptor._internal_create_key,
     fields=[]),
+    _descriptor.OneofDescriptor(
+      name='_version', full_name='CommandReply._version',
+      index=2, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
+    _descriptor.OneofDescriptor(
+      name='_after', full_name='CommandReply._after',
+      index=3, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
   ],
-  serialized_start=285,
-  serialized_end=456,
+  serialized_start=448,
+  serialized_end=698,
 )
 
 
@@ -330,26 +479,599 @@ _EMPTY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=458,
-  serialized_end=465,
+  serialized_start=700,
+  serialized_end=707,
+)
+
+
+_HEARTBEATREQUEST = _descriptor.Descriptor(
+  name='HeartbeatRequest',
+  full_name='HeartbeatRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='index', full_name='HeartbeatRequest.index', index=0,
+      number=1, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=709,
+  serialized_end=742,
+)
+
+
+_HEARTBEATREPLY = _descriptor.Descriptor(
+  name='HeartbeatReply',
+  full_name='HeartbeatReply',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='time', full_name='HeartbeatReply.time', index=0,
+      number=1, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=744,
+  serialized_end=774,
+)
+
+
+_LOGINREQUEST = _descriptor.Descriptor(
+  name='LoginRequest',
+  full_name='LoginRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='ip', full_name='LoginRequest.ip', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=776,
+  serialized_end=802,
+)
+
+
+_LOGINREPLY = _descriptor.Descriptor(
+  name='LoginReply',
+  full_name='LoginReply',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='index', full_name='LoginReply.index', index=0,
+      number=1, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='heartbeat_ip', full_name='LoginReply.heartbeat_ip', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='lobby_ip', full_name='LoginReply.lobby_ip', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=804,
+  serialized_end=871,
+)
+
+
+_STATUSREPLY = _descriptor.Descriptor(
+  name='StatusReply',
+  full_name='StatusReply',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='status', full_name='StatusReply.status', index=0,
+      number=1, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='index', full_name='StatusReply.index', index=1,
+      number=2, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='channel', full_name='StatusReply.channel', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='address', full_name='StatusReply.address', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+    _STATUSREPLY_STATUS,
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+    _descriptor.OneofDescriptor(
+      name='_channel', full_name='StatusReply._channel',
+      index=0, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
+    _descriptor.OneofDescriptor(
+      name='_address', full_name='StatusReply._address',
+      index=1, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
+  ],
+  serialized_start=874,
+  serialized_end=1084,
+)
+
+
+_FRAME = _descriptor.Descriptor(
+  name='Frame',
+  full_name='Frame',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='login', full_name='Frame.login', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='chat', full_name='Frame.chat', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='command', full_name='Frame.command', index=2,
+      number=3, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='reply', full_name='Frame.reply', index=3,
+      number=4, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='status', full_name='Frame.status', index=4,
+      number=5, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='keepalive', full_name='Frame.keepalive', index=5,
+      number=6, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='chats', full_name='Frame.chats', index=6,
+      number=7, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+    _descriptor.OneofDescriptor(
+      name='body', full_name='Frame.body',
+      index=0, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
+  ],
+  serialized_start=1087,
+  serialized_end=1323,
+)
+
+
+_PRESENCE = _descriptor.Descriptor(
+  name='Presence',
+  full_name='Presence',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='index', full_name='Presence.index', index=0,
+      number=1, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='channel', full_name='Presence.channel', index=1,
+      number=2, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='removed', full_name='Presence.removed', index=2,
+      number=3, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='address', full_name='Presence.address', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1325,
+  serialized_end=1401,
+)
+
+
+_SUBSCRIPTION = _descriptor.Descriptor(
+  name='Subscription',
+  full_name='Subscription',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='channel', full_name='Subscription.channel', index=0,
+      number=1, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='origin', full_name='Subscription.origin', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='moved', full_name='Subscription.moved', index=2,
+      number=3, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1403,
+  serialized_end=1465,
+)
+
+
+_MIGRATION = _descriptor.Descriptor(
+  name='Migration',
+  full_name='Migration',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='channel', full_name='Migration.channel', index=0,
+      number=1, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='source', full_name='Migration.source', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='destination', full_name='Migration.destination', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1467,
+  serialized_end=1532,
+)
+
+
+_CHANNELLOAD = _descriptor.Descriptor(
+  name='ChannelLoad',
+  full_name='ChannelLoad',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='address', full_name='ChannelLoad.address', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='rooms', full_name='ChannelLoad.rooms', index=1,
+      number=2, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='streams', full_name='ChannelLoad.streams', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1534,
+  serialized_end=1596,
+)
+
+
+_SNAPSHOT = _descriptor.Descriptor(
+  name='Snapshot',
+  full_name='Snapshot',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='shard', full_name='Snapshot.shard', index=0,
+      number=1, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='presences', full_name='Snapshot.presences', index=1,
+      number=2, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1598,
+  serialized_end=1653,
+)
+
+
+_RELAY = _descriptor.Descriptor(
+  name='Relay',
+  full_name='Relay',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='chat', full_name='Relay.chat', index=0,
+      number=1, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='presence', full_name='Relay.presence', index=1,
+      number=2, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='snapshot', full_name='Relay.snapshot', index=2,
+      number=3, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+    _descriptor.OneofDescriptor(
+      name='body', full_name='Relay.body',
+      index=0, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
+  ],
+  serialized_start=1655,
+  serialized_end=1755,
 )
 
 
-_HEARTBEATREQUEST = _descriptor.Descriptor(
-  name='HeartbeatRequest',
-  full_name='HeartbeatRequest',
+_USERREQUEST = _descriptor.Descriptor(
+  name='UserRequest',
+  full_name='UserRequest',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
-      name='index', full_name='HeartbeatRequest.index', index=0,
+      name='index', full_name='UserRequest.index', index=0,
       number=1, type=5, cpp_type=1, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='channel', full_name='UserRequest.channel', index=1,
+      number=2, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -361,23 +1083,28 @@ _HEARTBEATREQUEST = _descriptor.Descriptor(
   syntax='proto3',
   extension_ranges=[],
   oneofs=[
+    _descriptor.OneofDescriptor(
+      name='_channel', full_name='UserRequest._channel',
+      index=0, containing_type=None,
+      create_key=_descriptor._internal_create_key,
+    fields=[]),
   ],
-  serialized_start=467,
-  serialized_end=500,
+  serialized_start=1757,
+  serialized_end=1819,
 )
 
 
-_HEARTBEATREPLY = _descriptor.Descriptor(
-  name='HeartbeatReply',
-  full_name='HeartbeatReply',
+_USERLIVESREPLY = _descriptor.Descriptor(
+  name='UserLivesReply',
+  full_name='UserLivesReply',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
-      name='time', full_name='HeartbeatReply.time', index=0,
-      number=1, type=3, cpp_type=2, label=1,
+      name='status', full_name='UserLivesReply.status', index=0,
+      number=1, type=14, cpp_type=8, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
@@ -387,6 +1114,7 @@ _HEARTBEATREPLY = _descriptor.Descriptor(
   ],
   nested_types=[],
   enum_types=[
+    _USERLIVESREPLY_STATUS,
   ],
   serialized_options=None,
   is_extendable=False,
@@ -394,23 +1122,23 @@ _HEARTBEATREPLY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=502,
-  serialized_end=532,
+  serialized_start=1821,
+  serialized_end=1910,
 )
 
 
-_LOGINREQUEST = _descriptor.Descriptor(
-  name='LoginRequest',
-  full_name='LoginRequest',
+_USERSREQUEST = _descriptor.Descriptor(
+  name='UsersRequest',
+  full_name='UsersRequest',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
-      name='ip', full_name='LoginRequest.ip', index=0,
-      number=1, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
+      name='indexes', full_name='UsersRequest.indexes', index=0,
+      number=1, type=5, cpp_type=1, label=3,
+      has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
@@ -426,37 +1154,30 @@ _LOGINREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=534,
-  serialized_end=560,
+  serialized_start=1912,
+  serialized_end=1943,
 )
 
 
-_LOGINREPLY = _descriptor.Descriptor(
-  name='LoginReply',
-  full_name='LoginReply',
+_USERSLIVESREPLY = _descriptor.Descriptor(
+  name='UsersLivesReply',
+  full_name='UsersLivesReply',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
-      name='index', full_name='LoginReply.index', index=0,
-      number=1, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='heartbeat_ip', full_name='LoginReply.heartbeat_ip', index=1,
-      number=2, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
+      name='indexes', full_name='UsersLivesReply.indexes', index=0,
+      number=1, type=5, cpp_type=1, label=3,
+      has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='lobby_ip', full_name='LoginReply.lobby_ip', index=2,
-      number=3, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=b"".decode('utf-8'),
+      name='statuses', full_name='UsersLivesReply.statuses', index=1,
+      number=2, type=14, cpp_type=8, label=3,
+      has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
@@ -472,37 +1193,30 @@ _LOGINREPLY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=562,
-  serialized_end=629,
+  serialized_start=1945,
+  serialized_end=2021,
 )
 
 
-_STATUSREPLY = _descriptor.Descriptor(
-  name='StatusReply',
-  full_name='StatusReply',
+_USERSEXITREPLY = _descriptor.Descriptor(
+  name='UsersExitReply',
+  full_name='UsersExitReply',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
-      name='status', full_name='StatusReply.status', index=0,
-      number=1, type=14, cpp_type=8, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
-    _descriptor.FieldDescriptor(
-      name='index', full_name='StatusReply.index', index=1,
-      number=2, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
+      name='indexes', full_name='UsersExitReply.indexes', index=0,
+      number=1, type=5, cpp_type=1, label=3,
+      has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
     _descriptor.FieldDescriptor(
-      name='channel', full_name='StatusReply.channel', index=2,
-      number=3, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
+      name='statuses', full_name='UsersExitReply.statuses', index=1,
+      number=2, type=14, cpp_type=8, label=3,
+      has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
@@ -511,35 +1225,43 @@ _STATUSREPLY = _descriptor.Descriptor(
   ],
   nested_types=[],
   enum_types=[
-    _STATUSREPLY_STATUS,
   ],
   serialized_options=None,
   is_extendable=False,
   syntax='proto3',
   extension_ranges=[],
   oneofs=[
-    _descriptor.OneofDescriptor(
-      name='_channel', full_name='StatusReply._channel',
-      index=0, containing_type=None,
-      create_key=_descriptor._internal_create_key,
-    fields=[]),
   ],
-  serialized_start=632,
-  serialized_end=790,
+  serialized_start=2023,
+  serialized_end=2095,
 )
 
 
-_USERREQUEST = _descriptor.Descriptor(
-  name='UserRequest',
-  full_name='UserRequest',
+_DIRECTORYENTRY = _descriptor.Descriptor(
+  name='DirectoryEntry',
+  full_name='DirectoryEntry',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
-      name='index', full_name='UserRequest.index', index=0,
-      number=1, type=5, cpp_type=1, label=1,
+      name='status', full_name='DirectoryEntry.status', index=0,
+      number=1, type=14, cpp_type=8, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='channel', full_name='DirectoryEntry.channel', index=1,
+      number=2, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='index', full_name='DirectoryEntry.index', index=2,
+      number=3, type=5, cpp_type=1, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
@@ -549,6 +1271,7 @@ _USERREQUEST = _descriptor.Descriptor(
   ],
   nested_types=[],
   enum_types=[
+    _DIRECTORYENTRY_STATUS,
   ],
   serialized_options=None,
   is_extendable=False,
@@ -556,32 +1279,45 @@ _USERREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=792,
-  serialized_end=820,
+  serialized_start=2098,
+  serialized_end=2265,
 )
 
 
-_USERLIVESREPLY = _descriptor.Descriptor(
-  name='UserLivesReply',
-  full_name='UserLivesReply',
+_DIRECTORY = _descriptor.Descriptor(
+  name='Directory',
+  full_name='Directory',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   create_key=_descriptor._internal_create_key,
   fields=[
     _descriptor.FieldDescriptor(
-      name='status', full_name='UserLivesReply.status', index=0,
-      number=1, type=14, cpp_type=8, label=1,
+      name='entries', full_name='Directory.entries', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='version', full_name='Directory.version', index=1,
+      number=2, type=4, cpp_type=4, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='snapshot', full_name='Directory.snapshot', index=2,
+      number=3, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
   nested_types=[],
   enum_types=[
-    _USERLIVESREPLY_STATUS,
   ],
   serialized_options=None,
   is_extendable=False,
@@ -589,18 +1325,31 @@ _USERLIVESREPLY = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=822,
-  serialized_end=911,
+  serialized_start=2267,
+  serialized_end=2347,
 )
 
 _CHAT.oneofs_by_name['_text'].fields.append(
   _CHAT.fields_by_name['text'])
 _CHAT.fields_by_name['text'].containing_oneof = _CHAT.oneofs_by_name['_text']
+_CHAT.oneofs_by_name['_channel'].fields.append(
+  _CHAT.fields_by_name['channel'])
+_CHAT.fields_by_name['channel'].containing_oneof = _CHAT.oneofs_by_name['_channel']
+_CHATBATCH.fields_by_name['chats'].message_type = _CHAT
 _COMMANDREQUEST.fields_by_name['status'].enum_type = _COMMANDREQUEST_STATUS
 _COMMANDREQUEST_STATUS.containing_type = _COMMANDREQUEST
 _COMMANDREQUEST.oneofs_by_name['_channel'].fields.append(
   _COMMANDREQUEST.fields_by_name['channel'])
 _COMMANDREQUEST.fields_by_name['channel'].containing_oneof = _COMMANDREQUEST.oneofs_by_name['_channel']
+_COMMANDREQUEST.oneofs_by_name['_version'].fields.append(
+  _COMMANDREQUEST.fields_by_name['version'])
+_COMMANDREQUEST.fields_by_name['version'].containing_oneof = _COMMANDREQUEST.oneofs_by_name['_version']
+_COMMANDREQUEST.oneofs_by_name['_after'].fields.append(
+  _COMMANDREQUEST.fields_by_name['after'])
+_COMMANDREQUEST.fields_by_name['after'].containing_oneof = _COMMANDREQUEST.oneofs_by_name['_after']
+_COMMANDREQUEST.oneofs_by_name['_limit'].fields.append(
+  _COMMANDREQUEST.fields_by_name['limit'])
+_COMMANDREQUEST.fields_by_name['limit'].containing_oneof = _COMMANDREQUEST.oneofs_by_name['_limit']
 _COMMANDREPLY.fields_by_name['status'].enum_type = _COMMANDREPLY_STATUS
 _COMMANDREPLY_STATUS.containing_type = _COMMANDREPLY
 _COMMANDREPLY.oneofs_by_name['_status'].fields.append(
@@ -609,14 +1358,73 @@ _COMMANDREPLY.fields_by_name['status'].containing_oneof = _COMMANDREPLY.oneofs_b
 _COMMANDREPLY.oneofs_by_name['_address'].fields.append(
   _COMMANDREPLY.fields_by_name['address'])
 _COMMANDREPLY.fields_by_name['address'].containing_oneof = _COMMANDREPLY.oneofs_by_name['_address']
+_COMMANDREPLY.oneofs_by_name['_version'].fields.append(
+  _COMMANDREPLY.fields_by_name['version'])
+_COMMANDREPLY.fields_by_name['version'].containing_oneof = _COMMANDREPLY.oneofs_by_name['_version']
+_COMMANDREPLY.oneofs_by_name['_after'].fields.append(
+  _COMMANDREPLY.fields_by_name['after'])
+_COMMANDREPLY.fields_by_name['after'].containing_oneof = _COMMANDREPLY.oneofs_by_name['_after']
 _STATUSREPLY.fields_by_name['status'].enum_type = _STATUSREPLY_STATUS
 _STATUSREPLY_STATUS.containing_type = _STATUSREPLY
 _STATUSREPLY.oneofs_by_name['_channel'].fields.append(
   _STATUSREPLY.fields_by_name['channel'])
 _STATUSREPLY.fields_by_name['channel'].containing_oneof = _STATUSREPLY.oneofs_by_name['_channel']
+_STATUSREPLY.oneofs_by_name['_address'].fields.append(
+  _STATUSREPLY.fields_by_name['address'])
+_STATUSREPLY.fields_by_name['address'].containing_oneof = _STATUSREPLY.oneofs_by_name['_address']
+_FRAME.fields_by_name['login'].message_type = _USERREQUEST
+_FRAME.fields_by_name['chat'].message_type = _CHAT
+_FRAME.fields_by_name['command'].message_type = _COMMANDREQUEST
+_FRAME.fields_by_name['reply'].message_type = _COMMANDREPLY
+_FRAME.fields_by_name['status'].message_type = _STATUSREPLY
+_FRAME.fields_by_name['keepalive'].message_type = _HEARTBEATREPLY
+_FRAME.fields_by_name['chats'].message_type = _CHATBATCH
+_FRAME.oneofs_by_name['body'].fields.append(
+  _FRAME.fields_by_name['login'])
+_FRAME.fields_by_name['login'].containing_oneof = _FRAME.oneofs_by_name['body']
+_FRAME.oneofs_by_name['body'].fields.append(
+  _FRAME.fields_by_name['chat'])
+_FRAME.fields_by_name['chat'].containing_oneof = _FRAME.oneofs_by_name['body']
+_FRAME.oneofs_by_name['body'].fields.append(
+  _FRAME.fields_by_name['command'])
+_FRAME.fields_by_name['command'].containing_oneof = _FRAME.oneofs_by_name['body']
+_FRAME.oneofs_by_name['body'].fields.append(
+  _FRAME.fields_by_name['reply'])
+_FRAME.fields_by_name['reply'].containing_oneof = _FRAME.oneofs_by_name['body']
+_FRAME.oneofs_by_name['body'].fields.append(
+  _FRAME.fields_by_name['status'])
+_FRAME.fields_by_name['status'].containing_oneof = _FRAME.oneofs_by_name['body']
+_FRAME.oneofs_by_name['body'].fields.append(
+  _FRAME.fields_by_name['keepalive'])
+_FRAME.fields_by_name['keepalive'].containing_oneof = _FRAME.oneofs_by_name['body']
+_FRAME.oneofs_by_name['body'].fields.append(
+  _FRAME.fields_by_name['chats'])
+_FRAME.fields_by_name['chats'].containing_oneof = _FRAME.oneofs_by_name['body']
+_SNAPSHOT.fields_by_name['presences'].message_type = _PRESENCE
+_RELAY.fields_by_name['chat'].message_type = _CHAT
+_RELAY.fields_by_name['presence'].message_type = _PRESENCE
+_RELAY.fields_by_name['snapshot'].message_type = _SNAPSHOT
+_RELAY.oneofs_by_name['body'].fields.append(
+  _RELAY.fields_by_name['chat'])
+_RELAY.fields_by_name['chat'].containing_oneof = _RELAY.oneofs_by_name['body']
+_RELAY.oneofs_by_name['body'].fields.append(
+  _RELAY.fields_by_name['presence'])
+_RELAY.fields_by_name['presence'].containing_oneof = _RELAY.oneofs_by_name['body']
+_RELAY.oneofs_by_name['body'].fields.append(
+  _RELAY.fields_by_name['snapshot'])
+_RELAY.fields_by_name['snapshot'].containing_oneof = _RELAY.oneofs_by_name['body']
+_USERREQUEST.oneofs_by_name['_channel'].fields.append(
+  _USERREQUEST.fields_by_name['channel'])
+_USERREQUEST.fields_by_name['channel'].containing_oneof = _USERREQUEST.oneofs_by_name['_channel']
 _USERLIVESREPLY.fields_by_name['status'].enum_type = _USERLIVESREPLY_STATUS
 _USERLIVESREPLY_STATUS.containing_type = _USERLIVESREPLY
+_USERSLIVESREPLY.fields_by_name['statuses'].enum_type = _USERLIVESREPLY_STATUS
+_USERSEXITREPLY.fields_by_name['statuses'].enum_type = _STATUSREPLY_STATUS
+_DIRECTORYENTRY.fields_by_name['status'].enum_type = _DIRECTORYENTRY_STATUS
+_DIRECTORYENTRY_STATUS.containing_type = _DIRECTORYENTRY
+_DIRECTORY.fields_by_name['entries'].message_type = _DIRECTORYENTRY
 DESCRIPTOR.message_types_by_name['Chat'] = _CHAT
+DESCRIPTOR.message_types_by_name['ChatBatch'] = _CHATBATCH
 DESCRIPTOR.message_types_by_name['CommandRequest'] = _COMMANDREQUEST
 DESCRIPTOR.message_types_by_name['CommandReply'] = _COMMANDREPLY
 DESCRIPTOR.message_types_by_name['Empty'] = _EMPTY
@@ -625,8 +1433,20 @@ DESCRIPTOR.message_types_by_name['HeartbeatReply'] = _HEARTBEATREPLY
 DESCRIPTOR.message_types_by_name['LoginRequest'] = _LOGINREQUEST
 DESCRIPTOR.message_types_by_name['LoginReply'] = _LOGINREPLY
 DESCRIPTOR.message_types_by_name['StatusReply'] = _STATUSREPLY
+DESCRIPTOR.message_types_by_name['Frame'] = _FRAME
+DESCRIPTOR.message_types_by_name['Presence'] = _PRESENCE
+DESCRIPTOR.message_types_by_name['Subscription'] = _SUBSCRIPTION
+DESCRIPTOR.message_types_by_name['Migration'] = _MIGRATION
+DESCRIPTOR.message_types_by_name['ChannelLoad'] = _CHANNELLOAD
+DESCRIPTOR.message_types_by_name['Snapshot'] = _SNAPSHOT
+DESCRIPTOR.message_types_by_name['Relay'] = _RELAY
 DESCRIPTOR.message_types_by_name['UserRequest'] = _USERREQUEST
 DESCRIPTOR.message_types_by_name['UserLivesReply'] = _USERLIVESREPLY
+DESCRIPTOR.message_types_by_name['UsersRequest'] = _USERSREQUEST
+DESCRIPTOR.message_types_by_name['UsersLivesReply'] = _USERSLIVESREPLY
+DESCRIPTOR.message_types_by_name['UsersExitReply'] = _USERSEXITREPLY
+DESCRIPTOR.message_types_by_name['DirectoryEntry'] = _DIRECTORYENTRY
+DESCRIPTOR.message_types_by_name['Directory'] = _DIRECTORY
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 Chat = _reflection.GeneratedProtocolMessageType('Chat', (_message.Message,), {
@@ -636,6 +1456,13 @@ Chat = _reflection.GeneratedProtocolMessageType('Chat', (_message.Message,), {
   })
 _sym_db.RegisterMessage(Chat)
 
+ChatBatch = _reflection.GeneratedProtocolMessageType('ChatBatch', (_message.Message,), {
+  'DESCRIPTOR' : _CHATBATCH,
+  '__module__' : 'client_to_agent_pb2'
+  # @@protoc_insertion_point(class_scope:ChatBatch)
+  })
+_sym_db.RegisterMessage(ChatBatch)
+
 CommandRequest = _reflection.GeneratedProtocolMessageType('CommandRequest', (_message.Message,), {
   'DESCRIPTOR' : _COMMANDREQUEST,
   '__module__' : 'client_to_agent_pb2'
@@ -692,6 +1519,55 @@ StatusReply = _reflection.GeneratedProtocolMessageType('StatusReply', (_message.
   })
 _sym_db.RegisterMessage(StatusReply)
 
+Frame = _reflection.GeneratedProtocolMessageType('Frame', (_message.Message,), {
+  'DESCRIPTOR' : _FRAME,
+  '__module__' : 'client_to_agent_pb2'
+  # @@protoc_insertion_point(class_scope:Frame)
+  })
+_sym_db.RegisterMessage(Frame)
+
+Presence = _reflection.GeneratedProtocolMessageType('Presence', (_message.Message,), {
+  'DESCRIPTOR' : _PRESENCE,
+  '__module__' : 'client_to_agent_pb2'
+  # @@protoc_insertion_point(class_scope:Presence)
+  })
+_sym_db.RegisterMessage(Presence)
+
+Subscription = _reflection.GeneratedProtocolMessageType('Subscription', (_message.Message,), {
+  'DESCRIPTOR' : _SUBSCRIPTION,
+  '__module__' : 'client_to_agent_pb2'
+  # @@protoc_insertion_point(class_scope:Subscription)
+  })
+_sym_db.RegisterMessage(Subscription)
+
+Migration = _reflection.GeneratedProtocolMessageType('Migration', (_message.Message,), {
+  'DESCRIPTOR' : _MIGRATION,
+  '__module__' : 'client_to_agent_pb2'
+  # @@protoc_insertion_point(class_scope:Migration)
+  })
+_sym_db.RegisterMessage(Migration)
+
+ChannelLoad = _reflection.GeneratedProtocolMessageType('ChannelLoad', (_message.Message,), {
+  'DESCRIPTOR' : _CHANNELLOAD,
+  '__module__' : 'client_to_agent_pb2'
+  # @@protoc_insertion_point(class_scope:ChannelLoad)
+  })
+_sym_db.RegisterMessage(ChannelLoad)
+
+Snapshot = _reflection.GeneratedProtocolMessageType('Snapshot', (_message.Message,), {
+  'DESCRIPTOR' : _SNAPSHOT,
+  '__module__' : 'client_to_agent_pb2'
+  # @@protoc_insertion_point(class_scope:Snapshot)
+  })
+_sym_db.RegisterMessage(Snapshot)
+
+Relay = _reflection.GeneratedProtocolMessageType('Relay', (_message.Message,), {
+  'DESCRIPTOR' : _RELAY,
+  '__module__' : 'client_to_agent_pb2'
+  # @@protoc_insertion_point(class_scope:Relay)
+  })
+_sym_db.RegisterMessage(Relay)
+
 UserRequest = _reflection.GeneratedProtocolMessageType('UserRequest', (_message.Message,), {
   'DESCRIPTOR' : _USERREQUEST,
   '__module__' : 'client_to_agent_pb2'
@@ -706,6 +1582,41 @@ UserLivesReply = _reflection.GeneratedProtocolMessageType('UserLivesReply', (_me
   })
 _sym_db.RegisterMessage(UserLivesReply)
 
+UsersRequest = _reflection.GeneratedProtocolMessageType('UsersRequest', (_message.Message,), {
+  'DESCRIPTOR' : _USERSREQUEST,
+  '__module__' : 'client_to_agent_pb2'
+  # @@protoc_insertion_point(class_scope:UsersRequest)
+  })
+_sym_db.RegisterMessage(UsersRequest)
+
+UsersLivesReply = _reflection.GeneratedProtocolMessageType('UsersLivesReply', (_message.Message,), {
+  'DESCRIPTOR' : _USERSLIVESREPLY,
+  '__module__' : 'client_to_agent_pb2'
+  # @@protoc_insertion_point(class_scope:UsersLivesReply)
+  })
+_sym_db.RegisterMessage(UsersLivesReply)
+
+UsersExitReply = _reflection.GeneratedProtocolMessageType('UsersExitReply', (_message.Message,), {
+  'DESCRIPTOR' : _USERSEXITREPLY,
+  '__module__' : 'client_to_agent_pb2'
+  # @@protoc_insertion_point(class_scope:UsersExitReply)
+  })
+_sym_db.RegisterMessage(UsersExitReply)
+
+DirectoryEntry = _reflection.GeneratedProtocolMessageType('DirectoryEntry', (_message.Message,), {
+  'DESCRIPTOR' : _DIRECTORYENTRY,
+  '__module__' : 'client_to_agent_pb2'
+  # @@protoc_insertion_point(class_scope:DirectoryEntry)
+  })
+_sym_db.RegisterMessage(DirectoryEntry)
+
+Directory = _reflection.GeneratedProtocolMessageType('Directory', (_message.Message,), {
+  'DESCRIPTOR' : _DIRECTORY,
+  '__module__' : 'client_to_agent_pb2'
+  # @@protoc_insertion_point(class_scope:Directory)
+  })
+_sym_db.RegisterMessage(Directory)
+
 
 
 _AGENT = _descriptor.ServiceDescriptor(
@@ -715,8 +1626,8 @@ _AGENT = _descriptor.ServiceDescriptor(
   index=0,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=913,
-  serialized_end=962,
+  serialized_start=2349,
+  serialized_end=2398,
   methods=[
   _descriptor.MethodDescriptor(
     name='TryLogin',
@@ -741,8 +1652,8 @@ _LOBBY = _descriptor.ServiceDescriptor(
   index=1,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=965,
-  serialized_end=1226,
+  serialized_start=2401,
+  serialized_end=2923,
   methods=[
   _descriptor.MethodDescriptor(
     name='TryChatSend',
@@ -760,7 +1671,7 @@ _LOBBY = _descriptor.ServiceDescriptor(
     index=1,
     containing_service=None,
     input_type=_CHAT,
-    output_type=_CHAT,
+    output_type=_CHATBATCH,
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
   ),
@@ -794,16 +1705,76 @@ _LOBBY = _descriptor.ServiceDescriptor(
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
   ),
+  _descriptor.MethodDescriptor(
+    name='TryUsersExit',
+    full_name='Lobby.TryUsersExit',
+    index=5,
+    containing_service=None,
+    input_type=_USERSREQUEST,
+    output_type=_USERSEXITREPLY,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
   _descriptor.MethodDescriptor(
     name='TryStatusRequest',
     full_name='Lobby.TryStatusRequest',
-    index=5,
+    index=6,
     containing_service=None,
     input_type=_USERREQUEST,
     output_type=_STATUSREPLY,
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
   ),
+  _descriptor.MethodDescriptor(
+    name='Session',
+    full_name='Lobby.Session',
+    index=7,
+    containing_service=None,
+    input_type=_FRAME,
+    output_type=_FRAME,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='TryRelay',
+    full_name='Lobby.TryRelay',
+    index=8,
+    containing_service=None,
+    input_type=_RELAY,
+    output_type=_EMPTY,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='TryChannelRegister',
+    full_name='Lobby.TryChannelRegister',
+    index=9,
+    containing_service=None,
+    input_type=_CHANNELLOAD,
+    output_type=_EMPTY,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='WatchDirectory',
+    full_name='Lobby.WatchDirectory',
+    index=10,
+    containing_service=None,
+    input_type=_EMPTY,
+    output_type=_DIRECTORY,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='TryUserList',
+    full_name='Lobby.TryUserList',
+    index=11,
+    containing_service=None,
+    input_type=_COMMANDREQUEST,
+    output_type=_COMMANDREPLY,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_LOBBY)
 
@@ -817,8 +1788,8 @@ _CHANNEL = _descriptor.ServiceDescriptor(
   index=2,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=1229,
-  serialized_end=1399,
+  serialized_start=2926,
+  serialized_end=3269,
   methods=[
   _descriptor.MethodDescriptor(
     name='TryChatSend',
@@ -836,7 +1807,7 @@ _CHANNEL = _descriptor.ServiceDescriptor(
     index=1,
     containing_service=None,
     input_type=_CHAT,
-    output_type=_CHAT,
+    output_type=_CHATBATCH,
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
   ),
@@ -860,21 +1831,87 @@ _CHANNEL = _descriptor.ServiceDescriptor(
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
   ),
+  _descriptor.MethodDescriptor(
+    name='TrySubscribe',
+    full_name='Channel.TrySubscribe',
+    index=4,
+    containing_service=None,
+    input_type=_SUBSCRIPTION,
+    output_type=_CHATBATCH,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='TryChatBatchSend',
+    full_name='Channel.TryChatBatchSend',
+    index=5,
+    containing_service=None,
+    input_type=_CHATBATCH,
+    output_type=_EMPTY,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='TryRoomImport',
+    full_name='Channel.TryRoomImport',
+    index=6,
+    containing_service=None,
+    input_type=_MIGRATION,
+    output_type=_EMPTY,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='TryRoomExport',
+    full_name='Channel.TryRoomExport',
+    index=7,
+    containing_service=None,
+    input_type=_MIGRATION,
+    output_type=_CHAT,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_CHANNEL)
 
 DESCRIPTOR.services_by_name['Channel'] = _CHANNEL
 
 
+_FANOUT = _descriptor.ServiceDescriptor(
+  name='Fanout',
+  full_name='Fanout',
+  file=DESCRIPTOR,
+  index=3,
+  serialized_options=None,
+  create_key=_descriptor._internal_create_key,
+  serialized_start=3271,
+  serialized_end=3326,
+  methods=[
+  _descriptor.MethodDescriptor(
+    name='TrySubscribe',
+    full_name='Fanout.TrySubscribe',
+    index=0,
+    containing_service=None,
+    input_type=_SUBSCRIPTION,
+    output_type=_CHATBATCH,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+])
+_sym_db.RegisterServiceDescriptor(_FANOUT)
+
+DESCRIPTOR.services_by_name['Fanout'] = _FANOUT
+
+
 _HEARTBEAT = _descriptor.ServiceDescriptor(
   name='Heartbeat',
   full_name='Heartbeat',
   file=DESCRIPTOR,
-  index=3,
+  index=4,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=1401,
-  serialized_end=1517,
+  serialized_start=3329,
+  serialized_end=3595,
   methods=[
   _descriptor.MethodDescriptor(
     name='TryHeartbeat',
@@ -896,6 +1933,36 @@ _HEARTBEAT = _descriptor.ServiceDescriptor(
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
   ),
+  _descriptor.MethodDescriptor(
+    name='TryUsersLives',
+    full_name='Heartbeat.TryUsersLives',
+    index=2,
+    containing_service=None,
+    input_type=_USERSREQUEST,
+    output_type=_USERSLIVESREPLY,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='TryExpiredUsers',
+    full_name='Heartbeat.TryExpiredUsers',
+    index=3,
+    containing_service=None,
+    input_type=_EMPTY,
+    output_type=_USERREQUEST,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='TryHeartbeatReport',
+    full_name='Heartbeat.TryHeartbeatReport',
+    index=4,
+    containing_service=None,
+    input_type=_HEARTBEATREQUEST,
+    output_type=_EMPTY,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_HEARTBEAT)
 
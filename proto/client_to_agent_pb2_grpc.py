@@ -83,7 +83,7 @@ class LobbyStub(object):
         self.TryChatReceive = channel.unary_stream(
                 '/Lobby/TryChatReceive',
                 request_serializer=client__to__agent__pb2.Chat.SerializeToString,
-                response_deserializer=client__to__agent__pb2.Chat.FromString,
+                response_deserializer=client__to__agent__pb2.ChatBatch.FromString,
                 )
         self.TryUserRemove = channel.unary_unary(
                 '/Lobby/TryUserRemove',
@@ -100,11 +100,41 @@ class LobbyStub(object):
                 request_serializer=client__to__agent__pb2.UserRequest.SerializeToString,
                 response_deserializer=client__to__agent__pb2.StatusReply.FromString,
                 )
+        self.TryUsersExit = channel.unary_unary(
+                '/Lobby/TryUsersExit',
+                request_serializer=client__to__agent__pb2.UsersRequest.SerializeToString,
+                response_deserializer=client__to__agent__pb2.UsersExitReply.FromString,
+                )
         self.TryStatusRequest = channel.unary_stream(
                 '/Lobby/TryStatusRequest',
                 request_serializer=client__to__agent__pb2.UserRequest.SerializeToString,
                 response_deserializer=client__to__agent__pb2.StatusReply.FromString,
                 )
+        self.Session = channel.stream_stream(
+                '/Lobby/Session',
+                request_serializer=client__to__agent__pb2.Frame.SerializeToString,
+                response_deserializer=client__to__agent__pb2.Frame.FromString,
+                )
+        self.TryRelay = channel.stream_unary(
+                '/Lobby/TryRelay',
+                request_serializer=client__to__agent__pb2.Relay.SerializeToString,
+                response_deserializer=client__to__agent__pb2.Empty.FromString,
+                )
+        self.TryChannelRegister = channel.stream_unary(
+                '/Lobby/TryChannelRegister',
+                request_serializer=client__to__agent__pb2.ChannelLoad.SerializeToString,
+                response_deserializer=client__to__agent__pb2.Empty.FromString,
+                )
+        self.WatchDirectory = channel.unary_stream(
+                '/Lobby/WatchDirectory',
+                request_serializer=client__to__agent__pb2.Empty.SerializeToString,
+                response_deserializer=client__to__agent__pb2.Directory.FromString,
+                )
+        self.TryUserList = channel.unary_stream(
+                '/Lobby/TryUserList',
+                request_serializer=client__to__agent__pb2.CommandRequest.SerializeToString,
+                response_deserializer=client__to__agent__pb2.CommandReply.FromString,
+                )
 
 
 class LobbyServicer(object):
@@ -140,12 +170,48 @@ class LobbyServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def TryUsersExit(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def TryStatusRequest(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def Session(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TryRelay(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TryChannelRegister(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchDirectory(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TryUserList(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_LobbyServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -157,7 +223,7 @@ def add_LobbyServicer_to_server(servicer, server):
             'TryChatReceive': grpc.unary_stream_rpc_method_handler(
                     servicer.TryChatReceive,
                     request_deserializer=client__to__agent__pb2.Chat.FromString,
-                    response_serializer=client__to__agent__pb2.Chat.SerializeToString,
+                    response_serializer=client__to__agent__pb2.ChatBatch.SerializeToString,
             ),
             'TryUserRemove': grpc.unary_unary_rpc_method_handler(
                     servicer.TryUserRemove,
@@ -174,11 +240,41 @@ def add_LobbyServicer_to_server(servicer, server):
                     request_deserializer=client__to__agent__pb2.UserRequest.FromString,
                     response_serializer=client__to__agent__pb2.StatusReply.SerializeToString,
             ),
+            'TryUsersExit': grpc.unary_unary_rpc_method_handler(
+                    servicer.TryUsersExit,
+                    request_deserializer=client__to__agent__pb2.UsersRequest.FromString,
+                    response_serializer=client__to__agent__pb2.UsersExitReply.SerializeToString,
+            ),
             'TryStatusRequest': grpc.unary_stream_rpc_method_handler(
                     servicer.TryStatusRequest,
                     request_deserializer=client__to__agent__pb2.UserRequest.FromString,
                     response_serializer=client__to__agent__pb2.StatusReply.SerializeToString,
             ),
+            'Session': grpc.stream_stream_rpc_method_handler(
+                    servicer.Session,
+                    request_deserializer=client__to__agent__pb2.Frame.FromString,
+                    response_serializer=client__to__agent__pb2.Frame.SerializeToString,
+            ),
+            'TryRelay': grpc.stream_unary_rpc_method_handler(
+                    servicer.TryRelay,
+                    request_deserializer=client__to__agent__pb2.Relay.FromString,
+                    response_serializer=client__to__agent__pb2.Empty.SerializeToString,
+            ),
+            'TryChannelRegister': grpc.stream_unary_rpc_method_handler(
+                    servicer.TryChannelRegister,
+                    request_deserializer=client__to__agent__pb2.ChannelLoad.FromString,
+                    response_serializer=client__to__agent__pb2.Empty.SerializeToString,
+            ),
+            'WatchDirectory': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchDirectory,
+                    request_deserializer=client__to__agent__pb2.Empty.FromString,
+                    response_serializer=client__to__agent__pb2.Directory.SerializeToString,
+            ),
+            'TryUserList': grpc.unary_stream_rpc_method_handler(
+                    servicer.TryUserList,
+                    request_deserializer=client__to__agent__pb2.CommandRequest.FromString,
+                    response_serializer=client__to__agent__pb2.CommandReply.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'Lobby', rpc_method_handlers)
@@ -219,7 +315,7 @@ class Lobby(object):
             metadata=None):
         return grpc.experimental.unary_stream(request, target, '/Lobby/TryChatReceive',
             client__to__agent__pb2.Chat.SerializeToString,
-            client__to__agent__pb2.Chat.FromString,
+            client__to__agent__pb2.ChatBatch.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
@@ -274,6 +370,23 @@ class Lobby(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def TryUsersExit(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Lobby/TryUsersExit',
+            client__to__agent__pb2.UsersRequest.SerializeToString,
+            client__to__agent__pb2.UsersExitReply.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
     @staticmethod
     def TryStatusRequest(request,
             target,
@@ -291,6 +404,91 @@ class Lobby(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def Session(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/Lobby/Session',
+            client__to__agent__pb2.Frame.SerializeToString,
+            client__to__agent__pb2.Frame.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def TryRelay(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/Lobby/TryRelay',
+            client__to__agent__pb2.Relay.SerializeToString,
+            client__to__agent__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def TryChannelRegister(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/Lobby/TryChannelRegister',
+            client__to__agent__pb2.ChannelLoad.SerializeToString,
+            client__to__agent__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def WatchDirectory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/Lobby/WatchDirectory',
+            client__to__agent__pb2.Empty.SerializeToString,
+            client__to__agent__pb2.Directory.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def TryUserList(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/Lobby/TryUserList',
+            client__to__agent__pb2.CommandRequest.SerializeToString,
+            client__to__agent__pb2.CommandReply.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
 
 class ChannelStub(object):
     """Missing associated documentation comment in .proto file."""
@@ -309,7 +507,7 @@ class ChannelStub(object):
         self.TryChatReceive = channel.unary_stream(
                 '/Channel/TryChatReceive',
                 request_serializer=client__to__agent__pb2.Chat.SerializeToString,
-                response_deserializer=client__to__agent__pb2.Chat.FromString,
+                response_deserializer=client__to__agent__pb2.ChatBatch.FromString,
                 )
         self.TryUserRemove = channel.unary_unary(
                 '/Channel/TryUserRemove',
@@ -321,6 +519,26 @@ class ChannelStub(object):
                 request_serializer=client__to__agent__pb2.UserRequest.SerializeToString,
                 response_deserializer=client__to__agent__pb2.StatusReply.FromString,
                 )
+        self.TrySubscribe = channel.unary_stream(
+                '/Channel/TrySubscribe',
+                request_serializer=client__to__agent__pb2.Subscription.SerializeToString,
+                response_deserializer=client__to__agent__pb2.ChatBatch.FromString,
+                )
+        self.TryChatBatchSend = channel.unary_unary(
+                '/Channel/TryChatBatchSend',
+                request_serializer=client__to__agent__pb2.ChatBatch.SerializeToString,
+                response_deserializer=client__to__agent__pb2.Empty.FromString,
+                )
+        self.TryRoomImport = channel.unary_unary(
+                '/Channel/TryRoomImport',
+                request_serializer=client__to__agent__pb2.Migration.SerializeToString,
+                response_deserializer=client__to__agent__pb2.Empty.FromString,
+                )
+        self.TryRoomExport = channel.unary_stream(
+                '/Channel/TryRoomExport',
+                request_serializer=client__to__agent__pb2.Migration.SerializeToString,
+                response_deserializer=client__to__agent__pb2.Chat.FromString,
+                )
 
 
 class ChannelServicer(object):
@@ -350,6 +568,30 @@ class ChannelServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def TrySubscribe(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TryChatBatchSend(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TryRoomImport(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TryRoomExport(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ChannelServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -361,7 +603,7 @@ def add_ChannelServicer_to_server(servicer, server):
             'TryChatReceive': grpc.unary_stream_rpc_method_handler(
                     servicer.TryChatReceive,
                     request_deserializer=client__to__agent__pb2.Chat.FromString,
-                    response_serializer=client__to__agent__pb2.Chat.SerializeToString,
+                    response_serializer=client__to__agent__pb2.ChatBatch.SerializeToString,
             ),
             'TryUserRemove': grpc.unary_unary_rpc_method_handler(
                     servicer.TryUserRemove,
@@ -373,6 +615,26 @@ def add_ChannelServicer_to_server(servicer, server):
                     request_deserializer=client__to__agent__pb2.UserRequest.FromString,
                     response_serializer=client__to__agent__pb2.StatusReply.SerializeToString,
             ),
+            'TrySubscribe': grpc.unary_stream_rpc_method_handler(
+                    servicer.TrySubscribe,
+                    request_deserializer=client__to__agent__pb2.Subscription.FromString,
+                    response_serializer=client__to__agent__pb2.ChatBatch.SerializeToString,
+            ),
+            'TryChatBatchSend': grpc.unary_unary_rpc_method_handler(
+                    servicer.TryChatBatchSend,
+                    request_deserializer=client__to__agent__pb2.ChatBatch.FromString,
+                    response_serializer=client__to__agent__pb2.Empty.SerializeToString,
+            ),
+            'TryRoomImport': grpc.unary_unary_rpc_method_handler(
+                    servicer.TryRoomImport,
+                    request_deserializer=client__to__agent__pb2.Migration.FromString,
+                    response_serializer=client__to__agent__pb2.Empty.SerializeToString,
+            ),
+            'TryRoomExport': grpc.unary_stream_rpc_method_handler(
+                    servicer.TryRoomExport,
+                    request_deserializer=client__to__agent__pb2.Migration.FromString,
+                    response_serializer=client__to__agent__pb2.Chat.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'Channel', rpc_method_handlers)
@@ -413,7 +675,7 @@ class Channel(object):
             metadata=None):
         return grpc.experimental.unary_stream(request, target, '/Channel/TryChatReceive',
             client__to__agent__pb2.Chat.SerializeToString,
-            client__to__agent__pb2.Chat.FromString,
+            client__to__agent__pb2.ChatBatch.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
@@ -451,6 +713,135 @@ class Channel(object):
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
 
+    @staticmethod
+    def TrySubscribe(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/Channel/TrySubscribe',
+            client__to__agent__pb2.Subscription.SerializeToString,
+            client__to__agent__pb2.ChatBatch.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def TryChatBatchSend(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Channel/TryChatBatchSend',
+            client__to__agent__pb2.ChatBatch.SerializeToString,
+            client__to__agent__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def TryRoomImport(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Channel/TryRoomImport',
+            client__to__agent__pb2.Migration.SerializeToString,
+            client__to__agent__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def TryRoomExport(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/Channel/TryRoomExport',
+            client__to__agent__pb2.Migration.SerializeToString,
+            client__to__agent__pb2.Chat.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+
+class FanoutStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.TrySubscribe = channel.unary_stream(
+                '/Fanout/TrySubscribe',
+                request_serializer=client__to__agent__pb2.Subscription.SerializeToString,
+                response_deserializer=client__to__agent__pb2.ChatBatch.FromString,
+                )
+
+
+class FanoutServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def TrySubscribe(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_FanoutServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'TrySubscribe': grpc.unary_stream_rpc_method_handler(
+                    servicer.TrySubscribe,
+                    request_deserializer=client__to__agent__pb2.Subscription.FromString,
+                    response_serializer=client__to__agent__pb2.ChatBatch.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'Fanout', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Fanout(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def TrySubscribe(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/Fanout/TrySubscribe',
+            client__to__agent__pb2.Subscription.SerializeToString,
+            client__to__agent__pb2.ChatBatch.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
 
 class HeartbeatStub(object):
     """Missing associated documentation comment in .proto file."""
@@ -471,6 +862,21 @@ class HeartbeatStub(object):
                 request_serializer=client__to__agent__pb2.UserRequest.SerializeToString,
                 response_deserializer=client__to__agent__pb2.UserLivesReply.FromString,
                 )
+        self.TryUsersLives = channel.unary_unary(
+                '/Heartbeat/TryUsersLives',
+                request_serializer=client__to__agent__pb2.UsersRequest.SerializeToString,
+                response_deserializer=client__to__agent__pb2.UsersLivesReply.FromString,
+                )
+        self.TryExpiredUsers = channel.unary_stream(
+                '/Heartbeat/TryExpiredUsers',
+                request_serializer=client__to__agent__pb2.Empty.SerializeToString,
+                response_deserializer=client__to__agent__pb2.UserRequest.FromString,
+                )
+        self.TryHeartbeatReport = channel.stream_unary(
+                '/Heartbeat/TryHeartbeatReport',
+                request_serializer=client__to__agent__pb2.HeartbeatRequest.SerializeToString,
+                response_deserializer=client__to__agent__pb2.Empty.FromString,
+                )
 
 
 class HeartbeatServicer(object):
@@ -488,6 +894,24 @@ class HeartbeatServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def TryUsersLives(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TryExpiredUsers(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TryHeartbeatReport(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_HeartbeatServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -501,6 +925,21 @@ def add_HeartbeatServicer_to_server(servicer, server):
                     request_deserializer=client__to__agent__pb2.UserRequest.FromString,
                     response_serializer=client__to__agent__pb2.UserLivesReply.SerializeToString,
             ),
+            'TryUsersLives': grpc.unary_unary_rpc_method_handler(
+                    servicer.TryUsersLives,
+                    request_deserializer=client__to__agent__pb2.UsersRequest.FromString,
+                    response_serializer=client__to__agent__pb2.UsersLivesReply.SerializeToString,
+            ),
+            'TryExpiredUsers': grpc.unary_stream_rpc_method_handler(
+                    servicer.TryExpiredUsers,
+                    request_deserializer=client__to__agent__pb2.Empty.FromString,
+                    response_serializer=client__to__agent__pb2.UserRequest.SerializeToString,
+            ),
+            'TryHeartbeatReport': grpc.stream_unary_rpc_method_handler(
+                    servicer.TryHeartbeatReport,
+                    request_deserializer=client__to__agent__pb2.HeartbeatRequest.FromString,
+                    response_serializer=client__to__agent__pb2.Empty.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'Heartbeat', rpc_method_handlers)
@@ -544,3 +983,54 @@ class Heartbeat(object):
             client__to__agent__pb2.UserLivesReply.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def TryUsersLives(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/Heartbeat/TryUsersLives',
+            client__to__agent__pb2.UsersRequest.SerializeToString,
+            client__to__agent__pb2.UsersLivesReply.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def TryExpiredUsers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/Heartbeat/TryExpiredUsers',
+            client__to__agent__pb2.Empty.SerializeToString,
+            client__to__agent__pb2.UserRequest.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def TryHeartbeatReport(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/Heartbeat/TryHeartbeatReport',
+            client__to__agent__pb2.HeartbeatRequest.SerializeToString,
+            client__to__agent__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -5,8 +5,16 @@ import logging
 import threading
 
 from server.agent import Agent
+from server.broadcast import Limit
+from server.broadcast import Overflow
+from server.bus import get_bus_address
+from server.channel import Channel
+from server.fanout import Fanout
 from server.heartbeat import Heartbeat
 from server.lobby import Lobby
+from server.supervisor import Service
+from server.supervisor import Supervisor
+from server.supervisor import get_cpus
 
 
 async def launch_sync(service_type, *arguments, **keywords) -> None:
@@ -14,32 +22,85 @@ async def launch_sync(service_type, *arguments, **keywords) -> None:
     await service.run()
 
 
+def get_services(arguments: argparse.Namespace) -> 'list[Service]':
+    limit = Limit(arguments.capacity, arguments.overflow)
+    bus_addresses = tuple(map(get_bus_address, arguments.lobby)) if 1 < len(arguments.lobby) else ()
+    services = [
+        Service('heartbeat', Heartbeat, (arguments.heartbeat,), ()),
+        Service('agent', Agent, (arguments.agent, arguments.heartbeat, *arguments.lobby), ()),
+    ]
+
+    if arguments.single:
+        services.append(Service(
+            'lobby', Lobby, (arguments.lobby[0], arguments.channel[0], limit, arguments.heartbeat), ()))
+
+        return services
+
+    for shard, lobby_address in enumerate(arguments.lobby):
+        services.append(Service(
+            f'lobby-{shard}', Lobby,
+            (lobby_address, '', limit, arguments.heartbeat, shard, bus_addresses, tuple(arguments.fanout)), ()))
+
+    for number, channel_address in enumerate(arguments.channel):
+        services.append(Service(
+            f'channel-{number}', Channel, (channel_address, limit, tuple(arguments.lobby)), ()))
+
+    for number, fanout_address in enumerate(arguments.fanout):
+        services.append(Service(f'fanout-{number}', Fanout, (fanout_address,), ()))
+
+    if arguments.pin:
+        cpus = get_cpus()
+        services = [service._replace(CPUs=(cpus[i % len(cpus)],)) for i, service in enumerate(services)]
+
+    return services
+
+
 def main() -> None:
     logging.basicConfig(level=logging.DEBUG)
 
     parser = argparse.ArgumentParser(prog='python -m server', formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     parser.add_argument('--agent', dest='agent', help='agent address', type=str, default='localhost:50050')
     parser.add_argument('--heartbeat', dest='heartbeat', help='heartbeat address', type=str, default='localhost:50051')
-    parser.add_argument('--lobby', dest='lobby', help='lobby address', type=str, default='localhost:50052')
-    parser.add_argument('--channel', dest='channel', help='channel ip', type=str, default='localhost')
     parser.add_argument(
-        '--ports', dest='ports', help='available ports for channel', nargs='*', type=int,
-        default=(50054, 50055, 50056, 50057))
+        '--lobby', dest='lobby', help='lobby addresses, one shard per address', type=str, nargs='+',
+        default=['localhost:50052'])
+    parser.add_argument(
+        '--channel', dest='channel', help='channel host addresses, one process per address', type=str, nargs='+',
+        default=['localhost:50053'])
+    parser.add_argument(
+        '--fanout', dest='fanout', help='fanout relays between channel hosts and lobbies', type=str, nargs='*',
+        default=[])
+    parser.add_argument(
+        '--capacity', dest='capacity', help='pending statuses per stream, 0 is unbounded', type=int, default=64)
+    parser.add_argument(
+        '--overflow', dest='overflow', help='policy for a slow stream', type=Overflow,
+        choices=tuple(Overflow), default=Overflow.COALESCE)
+    parser.add_argument('--pin', dest='pin', help='pin each process to its own cpu', action='store_true')
+    parser.add_argument(
+        '--single', dest='single', help='run every service in this process', action='store_true')
 
     arguments = parser.parse_args()
 
-    agent = Agent(arguments.agent, arguments.heartbeat, arguments.lobby)
-    heartbeat = Heartbeat(arguments.heartbeat)
-    lobby = Lobby(arguments.lobby, arguments.channel, arguments.ports)
+    if arguments.single and (1 < len(arguments.lobby) or 1 < len(arguments.channel) or arguments.fanout):
+        parser.error('lobby shards, channel hosts and fanout relays need their own processes')
+
+    services = get_services(arguments)
+
+    if arguments.single:
+        servers = asyncio.gather(*(launch_sync(service.Type, *service.Arguments) for service in services))
+    else:
+        servers = Supervisor(services).run()
 
-    servers = asyncio.gather(
-        *(agent.run(), heartbeat.run(), lobby.run()))
     loop = asyncio.get_event_loop()
     loop.set_debug(True)
-    loop.run_until_complete(servers)
+
+    try:
+        loop.run_until_complete(servers)
+    except KeyboardInterrupt:
+        pass
 
     loop.close()
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
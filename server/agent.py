@@ -1,6 +1,10 @@
+import asyncio
 import collections
+import heapq
 import logging
+import os
 import socket
+import tempfile
 import time
 
 import grpc
@@ -17,16 +21,28 @@ RemoteProcedureCall = collections.namedtuple(
 )
 
 
+def get_index_path(agent_address: str) -> str:
+    name = agent_address.replace(':', '-')
+
+    return os.path.join(tempfile.gettempdir(), f'agent-{name}.index')
+
+
 class Agent(client_to_agent_pb2_grpc.Agent):
-    __index = 0
+    __index_block = 1024
     __heartbeat_rpc = None
-    __lobby_rpc = None
+    __lobby_rpcs = ()
 
-    def __init__(self, agent_address: str, heartbeat_address: str, lobby_address: str):
-        self.__users = []
+    def __init__(self, agent_address: str, heartbeat_address: str, *lobby_addresses: str):
+        assert lobby_addresses
+
+        self.__users = {}
+        self.__deadlines = []
+        self.__tracked_users = set()
         self.__address = agent_address
         self.__heartbeat_address = heartbeat_address
-        self.__lobby_address = lobby_address
+        self.__lobby_addresses = lobby_addresses
+        self.__index_path = get_index_path(agent_address)
+        self.__index = self.__index_limit = self.__load_index()
         self.__server = self.__create_server(agent_address)
 
     async def TryLogin(
@@ -34,22 +50,31 @@ class Agent(client_to_agent_pb2_grpc.Agent):
             context: grpc.aio.ServicerContext) -> client_to_agent_pb2.LoginReply:
         self.__index += 1
 
+        if self.__index_limit < self.__index:
+            self.__reserve_indexes()
+
         self.__add_user(request.ip, self.__index)
 
         return client_to_agent_pb2.LoginReply(
-            index=self.__index, heartbeat_ip=self.__heartbeat_address, lobby_ip=self.__lobby_address)
+            index=self.__index, heartbeat_ip=self.__heartbeat_address,
+            lobby_ip=self.__lobby_addresses[self.__index % len(self.__lobby_addresses)])
 
     async def run(self) -> None:
+        self.__heartbeat_rpc = self.__create_heartbeat_rpc()
+        self.__lobby_rpcs = tuple(map(self.__create_lobby_rpc, self.__lobby_addresses))
+
         await self.__server.start()
         logging.info('Starting Agent on %s', self.__address)
 
+        asyncio.ensure_future(self.__watch_expired_users())
+
         while True:
             try:
                 await self.__server.wait_for_termination(timeout=1)
             except KeyboardInterrupt:
                 await self.__server.stop(0)
 
-            await self.__check_user()
+            await self.__check_users()
 
     def __create_server(self, address: str) -> grpc.aio.server:
         server = grpc.aio.server()
@@ -59,64 +84,145 @@ class Agent(client_to_agent_pb2_grpc.Agent):
 
         return server
 
+    def __load_index(self) -> int:
+        try:
+            with open(self.__index_path) as index_file:
+                return int(index_file.read())
+        except (OSError, ValueError):
+            return 0
+
+    def __reserve_indexes(self) -> None:
+        self.__index_limit = self.__index + self.__index_block - 1
+        path = f'{self.__index_path}.{os.getpid()}'
+
+        with open(path, 'w') as index_file:
+            index_file.write(str(self.__index_limit))
+
+        os.replace(path, self.__index_path)
+
     def __add_user(self, ip: str, index: int) -> None:
-        assert ip not in self.__users
+        assert index not in self.__users
 
-        time_stamp = self.__get_next_time_stamp()
-        self.__users.append(User(ip, index, time_stamp))
+        self.__schedule_user(User(ip, index, self.__get_next_time_stamp()))
 
         logging.debug(f'User connected {ip} {index}')
 
-        if self.__heartbeat_rpc is None:
-            assert self.__lobby_rpc is None
+    def __schedule_user(self, user: User) -> None:
+        self.__users[user.Index] = user
+        heapq.heappush(self.__deadlines, (user.TimeStamp, user.Index))
 
-            self.__heartbeat_rpc = self.__create_heartbeat_rpc()
-            self.__lobby_rpc = self.__create_lobby_rpc()
-        else:
-            assert isinstance(self.__heartbeat_rpc, RemoteProcedureCall)
-            assert isinstance(self.__lobby_rpc, RemoteProcedureCall)
+    async def __check_users(self) -> None:
+        time_stamp = self.__get_time_stamp()
+        users = []
 
-    async def __check_user(self) -> None:
-        if not self.__users:
-            return
+        while self.__deadlines and self.__deadlines[0][0] <= time_stamp:
+            deadline, index = heapq.heappop(self.__deadlines)
+            user = self.__users.get(index)
 
-        user = self.__users.pop(0)
+            if user is not None and user.TimeStamp == deadline:
+                users.append(user)
 
-        if user.TimeStamp > self.__get_time_stamp():
-            self.__users.append(user)
+        if not users:
             return
 
-        request = client_to_agent_pb2.UserRequest(index=user.Index)
-        response = await self.__heartbeat_rpc.Stub.TryUserLives(request)
+        indexes = tuple(user.Index for user in users if user.Index not in self.__tracked_users)
+
+        if indexes:
+            request = client_to_agent_pb2.UsersRequest(indexes=indexes)
+
+            try:
+                response = await self.__heartbeat_rpc.Stub.TryUsersLives(request)
+            except grpc.aio.AioRpcError as error:
+                logging.info(f'Users are not checked at heartbeat: {error.code()}')
+                self.__reschedule_users(users)
+
+                return
+
+            for index, status in zip(response.indexes, response.statuses):
+                if client_to_agent_pb2.UserLivesReply.Status.LIVE == status:
+                    self.__tracked_users.add(index)
+                else:
+                    await self.__remove_user(index)
+
+        shards = collections.defaultdict(list)
 
-        if response.Status.LIVE == response.status:
-            logging.debug(f'User lives: {user.IP}, {user.Index}')
+        for user in users:
+            if user.Index in self.__users:
+                shards[user.Index % len(self.__lobby_rpcs)].append(user)
 
-            response = await self.__lobby_rpc.Stub.TryUserExit(request)
+        await asyncio.gather(*(self.__check_shard_users(users) for users in shards.values()))
 
-            if client_to_agent_pb2.StatusReply.Status.OK == response.status:
-                self.__users.append(User(user.IP, user.Index, self.__get_next_time_stamp()))
+    async def __check_shard_users(self, users: 'list[User]') -> None:
+        request = client_to_agent_pb2.UsersRequest(indexes=tuple(user.Index for user in users))
+
+        logging.debug(f'Users live: {len(users)} at lobby {users[0].Index % len(self.__lobby_rpcs)}')
+
+        try:
+            response = await self.__get_lobby_stub(users[0].Index).TryUsersExit(request)
+        except grpc.aio.AioRpcError as error:
+            logging.info(f'Users are not checked at lobby {users[0].Index % len(self.__lobby_rpcs)}: {error.code()}')
+            self.__reschedule_users(users)
+
+            return
+
+        for user, status in zip(users, response.statuses):
+            if user.Index not in self.__users:
+                continue
+            elif client_to_agent_pb2.StatusReply.Status.OK == status:
+                self.__schedule_user(User(user.IP, user.Index, self.__get_next_time_stamp()))
             else:
-                assert client_to_agent_pb2.StatusReply.Status.QUIT == response.status
-        else:
-            assert response.Status.UNKNOWN == response.status
+                assert client_to_agent_pb2.StatusReply.Status.QUIT == status
+
+                del self.__users[user.Index]
+                self.__tracked_users.discard(user.Index)
+
+    def __reschedule_users(self, users: 'list[User]') -> None:
+        for user in users:
+            if self.__users.get(user.Index) is user:
+                heapq.heappush(self.__deadlines, (user.TimeStamp, user.Index))
+
+    async def __remove_user(self, index: int) -> None:
+        user = self.__users.pop(index, None)
+        self.__tracked_users.discard(index)
 
-            await self.__lobby_rpc.Stub.TryUserRemove(request)
+        if user is None:
+            return
 
+        try:
+            await self.__get_lobby_stub(index).TryUserRemove(client_to_agent_pb2.UserRequest(index=index))
+        except grpc.aio.AioRpcError as error:
+            logging.info(f'User is not removed at lobby: {index}, {error.code()}')
+        else:
             logging.debug(f'User removed: {user.IP}, {user.Index}')
 
+    async def __watch_expired_users(self) -> None:
+        while True:
+            try:
+                async for request in self.__heartbeat_rpc.Stub.TryExpiredUsers(client_to_agent_pb2.Empty()):
+                    await self.__remove_user(request.index)
+            except grpc.aio.AioRpcError as error:
+                logging.debug(f'Expired users are not watched: {error.code()}')
+
+            self.__tracked_users.clear()
+
+            await asyncio.sleep(1)
+
     def __create_heartbeat_rpc(self) -> RemoteProcedureCall:
         channel = grpc.aio.insecure_channel(self.__heartbeat_address)
         stub = client_to_agent_pb2_grpc.HeartbeatStub(channel)
 
         return RemoteProcedureCall(channel, stub)
 
-    def __create_lobby_rpc(self) -> RemoteProcedureCall:
-        channel = grpc.aio.insecure_channel(self.__lobby_address)
+    @staticmethod
+    def __create_lobby_rpc(address: str) -> RemoteProcedureCall:
+        channel = grpc.aio.insecure_channel(address)
         stub = client_to_agent_pb2_grpc.LobbyStub(channel)
 
         return RemoteProcedureCall(channel, stub)
 
+    def __get_lobby_stub(self, index: int) -> client_to_agent_pb2_grpc.LobbyStub:
+        return self.__lobby_rpcs[index % len(self.__lobby_rpcs)].Stub
+
     @staticmethod
     def __get_time_stamp() -> int:
         return int(time.time())
@@ -0,0 +1,426 @@
+import asyncio
+import collections
+import enum
+
+import grpc
+
+
+class Overflow(enum.Enum):
+    DROP_OLDEST = 'drop'
+    COALESCE = 'coalesce'
+    DISCONNECT = 'disconnect'
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class Overflowed(Exception):
+    pass
+
+
+class Statistics:
+    def __init__(self):
+        self.dropped = 0
+        self.evicted = 0
+
+    def __str__(self) -> str:
+        return f'{self.dropped} dropped, {self.evicted} evicted'
+
+
+Limit = collections.namedtuple('Limit', ('Capacity', 'Overflow'))
+UNLIMITED = Limit(0, Overflow.DROP_OLDEST)
+BATCH_SIZE = 64 * 1024
+
+
+class Mailbox:
+    __slots__ = ('__items', '__waiter', '__listener', '__limit', '__statistics', '__key', '__overflowed')
+
+    def __init__(self, limit: Limit = UNLIMITED, statistics: Statistics = None, key=None):
+        self.__items = None
+        self.__waiter = None
+        self.__listener = None
+        self.__limit = limit
+        self.__statistics = statistics
+        self.__key = key
+        self.__overflowed = False
+
+    def append(self, item) -> None:
+        if self.__overflowed:
+            return
+
+        if self.__items is None:
+            self.__items = [item]
+        elif self.__limit.Capacity and len(self.__items) >= self.__limit.Capacity:
+            self.__overflow(item)
+        else:
+            self.__items.append(item)
+
+        if self.__waiter is not None and not self.__waiter.done():
+            self.__waiter.set_result(None)
+
+        if self.__listener is not None:
+            self.__listener.wake()
+
+    async def receive(self) -> list:
+        while not self.__items:
+            if self.__overflowed:
+                raise Overflowed()
+
+            self.__waiter = asyncio.get_event_loop().create_future()
+
+            try:
+                await self.__waiter
+            finally:
+                self.__waiter = None
+
+        return self.poll()
+
+    def poll(self) -> list:
+        if self.__overflowed:
+            raise Overflowed()
+
+        items = self.__items or []
+        self.__items = None
+
+        return items
+
+    def listen(self, listener) -> None:
+        self.__listener = listener
+
+    def unlisten(self, listener) -> None:
+        if self.__listener is listener:
+            self.__listener = None
+
+    def __overflow(self, item) -> None:
+        overflow = self.__limit.Overflow
+
+        if Overflow.DISCONNECT == overflow:
+            self.__overflowed = True
+            self.__items.clear()
+
+            if self.__statistics is not None:
+                self.__statistics.evicted += 1
+
+            return
+
+        position = 0
+
+        if Overflow.COALESCE == overflow and self.__key is not None:
+            key = self.__key(item)
+            position = next((i for i, other in enumerate(self.__items) if self.__key(other) == key), 0)
+
+        del self.__items[position]
+        self.__items.append(item)
+
+        if self.__statistics is not None:
+            self.__statistics.dropped += 1
+
+    def __bool__(self) -> bool:
+        return bool(self.__items)
+
+    def __len__(self) -> int:
+        return len(self.__items) if self.__items else 0
+
+
+class MessageLog:
+    __slots__ = ('__messages', '__capacity', '__sequence', '__event', '__listeners')
+
+    def __init__(self, capacity: int = 1024):
+        assert 0 < capacity
+
+        self.__messages = None
+        self.__capacity = capacity
+        self.__sequence = 0
+        self.__event = None
+        self.__listeners = None
+
+    def append(self, message) -> int:
+        if self.__messages is None:
+            self.__messages = [None] * self.__capacity
+
+        sequence = self.__sequence
+        self.__messages[sequence % self.__capacity] = message
+        self.__sequence = sequence + 1
+
+        if self.__event is not None:
+            self.__event.set()
+            self.__event = None
+
+        if self.__listeners:
+            for listener in self.__listeners:
+                listener.wake()
+
+        return sequence
+
+    def read(self, offset: int) -> 'tuple[list, int]':
+        if self.__messages is None:
+            return [], self.__sequence
+
+        capacity = self.__capacity
+        offset = max(offset, self.__sequence - capacity)
+        messages = [self.__messages[sequence % capacity] for sequence in range(offset, self.__sequence)]
+
+        return messages, self.__sequence
+
+    async def wait(self, offset: int) -> None:
+        while self.__sequence <= offset:
+            if self.__event is None:
+                self.__event = asyncio.Event()
+
+            await self.__event.wait()
+
+    def listen(self, listener) -> None:
+        if self.__listeners is None:
+            self.__listeners = set()
+
+        self.__listeners.add(listener)
+
+    def unlisten(self, listener) -> None:
+        if self.__listeners is not None:
+            self.__listeners.discard(listener)
+
+    @property
+    def sequence(self) -> int:
+        return self.__sequence
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+
+class Cursor:
+    __slots__ = ('__log', '__offset', '__overflow', '__statistics')
+
+    def __init__(
+            self, log: MessageLog, overflow: Overflow = Overflow.DROP_OLDEST, statistics: Statistics = None,
+            offset: int = None):
+        self.__log = log
+        self.__offset = log.sequence if offset is None else offset
+        self.__overflow = overflow
+        self.__statistics = statistics
+
+    async def receive(self) -> list:
+        await self.__log.wait(self.__offset)
+
+        return self.poll()
+
+    def poll(self) -> list:
+        lag = self.__log.sequence - self.__log.capacity - self.__offset
+
+        if 0 < lag:
+            if Overflow.DISCONNECT == self.__overflow:
+                if self.__statistics is not None:
+                    self.__statistics.evicted += 1
+
+                raise Overflowed()
+            elif self.__statistics is not None:
+                self.__statistics.dropped += lag
+
+        messages, self.__offset = self.__log.read(self.__offset)
+
+        return messages
+
+    def listen(self, listener) -> None:
+        self.__log.listen(listener)
+
+    def unlisten(self, listener) -> None:
+        self.__log.unlisten(listener)
+
+    @property
+    def offset(self) -> int:
+        return self.__offset
+
+    def __bool__(self) -> bool:
+        return self.__offset < self.__log.sequence
+
+    def __len__(self) -> int:
+        return self.__log.sequence - self.__offset
+
+
+class Coalescer:
+    __slots__ = ('__source', '__delay')
+    __min_delay = 0.0005
+    __max_delay = 0.005
+
+    def __init__(self, source):
+        self.__source = source
+        self.__delay = 0.0
+
+    async def receive(self) -> list:
+        loop = asyncio.get_event_loop()
+        start_time = loop.time()
+        items = await self.__source.receive()
+
+        if self.__max_delay < loop.time() - start_time:
+            self.__delay = 0.0
+
+            return items
+
+        self.__delay = min(self.__max_delay, self.__delay * 2 or self.__min_delay)
+        await asyncio.sleep(self.__delay)
+
+        if self.__source:
+            items.extend(await self.__source.receive())
+
+        return items
+
+    def poll(self) -> list:
+        return self.__source.poll()
+
+    def listen(self, listener) -> None:
+        self.__source.listen(listener)
+
+    def unlisten(self, listener) -> None:
+        self.__source.unlisten(listener)
+
+    @property
+    def delay(self) -> float:
+        return self.__delay
+
+    def __bool__(self) -> bool:
+        return bool(self.__source)
+
+    def __len__(self) -> int:
+        return len(self.__source)
+
+
+class Selector:
+    __slots__ = ('__sources', '__wakeup', '__delay')
+    __min_delay = 0.0005
+    __max_delay = 0.005
+
+    def __init__(self):
+        self.__sources = {}
+        self.__wakeup = None
+        self.__delay = 0.0
+
+    def add(self, source, convert) -> None:
+        self.__sources[source] = convert
+        source.listen(self)
+        self.wake()
+
+    def remove(self, source) -> None:
+        if self.__sources.pop(source, None) is not None:
+            source.unlisten(self)
+
+    def close(self) -> None:
+        for source in self.__sources:
+            source.unlisten(self)
+
+        self.__sources.clear()
+
+    def wake(self) -> None:
+        if self.__wakeup is not None and not self.__wakeup.done():
+            self.__wakeup.set_result(None)
+
+    async def receive(self) -> list:
+        loop = asyncio.get_event_loop()
+        start_time = loop.time()
+        items = self.__poll()
+
+        while not items:
+            self.__wakeup = loop.create_future()
+
+            try:
+                await self.__wakeup
+            finally:
+                self.__wakeup = None
+
+            items = self.__poll()
+
+        if self.__max_delay < loop.time() - start_time:
+            self.__delay = 0.0
+
+            return items
+
+        self.__delay = min(self.__max_delay, self.__delay * 2 or self.__min_delay)
+        await asyncio.sleep(self.__delay)
+        items.extend(self.__poll())
+
+        return items
+
+    def __poll(self) -> list:
+        items = []
+
+        for source, convert in tuple(self.__sources.items()):
+            polled = source.poll()
+
+            if polled:
+                items.extend(convert(polled))
+
+        return items
+
+
+def encode_varint(value: int) -> bytes:
+    data = bytearray()
+
+    while value > 0x7f:
+        data.append(value & 0x7f | 0x80)
+        value >>= 7
+
+    data.append(value)
+
+    return bytes(data)
+
+
+def encode_field(number: int, payload: bytes) -> bytes:
+    return encode_varint(number << 3 | 2) + encode_varint(len(payload)) + payload
+
+
+def pack(payloads: 'collections.Iterable[bytes]', size: int = BATCH_SIZE) -> 'list[bytes]':
+    batches = []
+    batch = []
+    length = 0
+
+    for payload in payloads:
+        if batch and size < length + len(payload):
+            batches.append(b''.join(batch))
+            batch = []
+            length = 0
+
+        batch.append(payload)
+        length += len(payload)
+
+    if batch:
+        batches.append(b''.join(batch))
+
+    return batches
+
+
+def serialize(message) -> bytes:
+    if isinstance(message, bytes):
+        return message
+    else:
+        return message.SerializeToString()
+
+
+def add_encoded_stream_handler(
+        server: grpc.aio.Server, service: str, method: str, behavior, request_deserializer,
+        method_handler=grpc.unary_stream_rpc_method_handler) -> None:
+    handler = method_handler(behavior, request_deserializer=request_deserializer, response_serializer=serialize)
+
+    server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(service, {method: handler}),))
+
+
+async def write_stream(call: grpc.aio.StreamUnaryCall, source: Mailbox, convert=None) -> None:
+    await call.wait_for_connection()
+    closing = asyncio.ensure_future(call)
+
+    try:
+        while True:
+            receiving = asyncio.ensure_future(source.receive())
+            await asyncio.wait((receiving, closing), return_when=asyncio.FIRST_COMPLETED)
+
+            if closing.done():
+                receiving.cancel()
+                await closing
+                return
+
+            for item in receiving.result():
+                if call.done():
+                    await closing
+                    return
+
+                await call.write(item if convert is None else convert(item))
+    finally:
+        closing.cancel()
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import os
+import tempfile
+
+import grpc
+
+from proto import client_to_agent_pb2
+from server.broadcast import Limit
+from server.broadcast import Mailbox
+from server.broadcast import Overflow
+from server.broadcast import serialize
+from server.broadcast import write_stream
+
+
+def get_bus_address(lobby_address: str) -> str:
+    name = lobby_address.replace(':', '-')
+
+    return f'unix:{os.path.join(tempfile.gettempdir(), f"lobby-{name}.sock")}'
+
+
+class Bus:
+    __capacity = 4096
+
+    def __init__(self, shard: int = 0, addresses: 'tuple[str]' = (), get_presences=tuple):
+        self.__shard = shard
+        self.__get_presences = get_presences
+        self.__shard_count = max(1, len(addresses))
+        self.__peers = tuple(
+            (address, Mailbox(Limit(self.__capacity, Overflow.DROP_OLDEST)))
+            for index, address in enumerate(addresses) if index != shard)
+
+    def publish(self, relay: client_to_agent_pb2.Relay) -> None:
+        if not self.__peers:
+            return
+
+        data = relay.SerializeToString()
+
+        for _, outbox in self.__peers:
+            outbox.append(data)
+
+    async def run(self) -> None:
+        await asyncio.gather(*(self.__send(address, outbox) for address, outbox in self.__peers))
+
+    @property
+    def shard(self) -> int:
+        return self.__shard
+
+    @property
+    def shard_count(self) -> int:
+        return self.__shard_count
+
+    async def __send(self, address: str, outbox: Mailbox) -> None:
+        while True:
+            try:
+                async with grpc.aio.insecure_channel(address) as channel:
+                    send = channel.stream_unary(
+                        '/Lobby/TryRelay',
+                        request_serializer=serialize,
+                        response_deserializer=client_to_agent_pb2.Empty.FromString)
+                    call = send()
+                    await call.wait_for_connection()
+                    await call.write(client_to_agent_pb2.Relay(snapshot=client_to_agent_pb2.Snapshot(
+                        shard=self.__shard, presences=self.__get_presences())))
+                    await write_stream(call, outbox)
+            except grpc.aio.AioRpcError as error:
+                logging.debug(f'Relays are not sent to {address}: {error.code()}')
+
+            await asyncio.sleep(1)
@@ -1,141 +1,391 @@
 import asyncio
 import collections
 import logging
-import weakref
+import operator
 
 import grpc
 
 from proto import client_to_agent_pb2
 from proto import client_to_agent_pb2_grpc
+from server.broadcast import Coalescer
+from server.broadcast import Cursor
+from server.broadcast import Limit
+from server.broadcast import Mailbox
+from server.broadcast import MessageLog
+from server.broadcast import Overflow
+from server.broadcast import Overflowed
+from server.broadcast import Statistics
+from server.broadcast import add_encoded_stream_handler
+from server.broadcast import encode_field
+from server.broadcast import pack
 
 
-Status = collections.namedtuple('Status', ('Status', 'Index', 'Channel'))
+STATUS_LIMIT = Limit(64, Overflow.COALESCE)
+
+get_status_key = operator.attrgetter('index', 'channel')
 
 
 class User:
-    def __init__(self):
-        self.chats = []
-        self.statuses = []
+    __slots__ = ('chats', 'statuses', 'streams')
 
+    def __init__(self, chats: MessageLog, limit: Limit = STATUS_LIMIT, statistics: Statistics = None):
+        self.chats = Coalescer(Cursor(chats, limit.Overflow, statistics))
+        self.statuses = Mailbox(limit, statistics, get_status_key)
+        self.streams = 0
 
-class Handler(client_to_agent_pb2_grpc.Channel):
-    def __init__(self, channel_index: int):
-        self.__users = collections.defaultdict(User)
+
+class Room:
+    __chat_capacity = 256
+
+    def __init__(self, channel_index: int, limit: Limit = STATUS_LIMIT, statistics: Statistics = None):
+        self.__users = {}
+        self.__chats = MessageLog(self.__chat_capacity)
+        self.__arrival = 0
+        self.__subscriptions = 0
         self.__channel_index = channel_index
+        self.__limit = limit
+        self.__statistics = Statistics() if statistics is None else statistics
+
+    def send(self, request: client_to_agent_pb2.Chat) -> None:
+        self.__chats.append((request.index, request.SerializeToString()))
+
+    def subscribe(self, moved: bool = False) -> Coalescer:
+        self.__subscriptions += 1
+        offset = self.__arrival if moved else None
+
+        return Coalescer(Cursor(self.__chats, Overflow.DROP_OLDEST, self.__statistics, offset))
+
+    def settle(self) -> None:
+        self.__arrival = self.__chats.sequence
+
+    def unsubscribe(self) -> None:
+        self.__subscriptions -= 1
+
+    def join(self, index: int) -> None:
+        self.add_status(
+            client_to_agent_pb2.StatusReply(
+                status=client_to_agent_pb2.StatusReply.Status.JOIN_USER,
+                index=index,
+                channel=self.__channel_index))
+
+    def remove_user(self, index: int) -> None:
+        self.__users.pop(index, None)
+        self.add_status(
+            client_to_agent_pb2.StatusReply(
+                status=client_to_agent_pb2.StatusReply.Status.LEAVE_USER,
+                index=index,
+                channel=self.__channel_index))
+
+    def is_empty(self) -> bool:
+        return not self.__users
+
+    def is_subscribed(self) -> bool:
+        return 0 < self.__subscriptions
+
+    def move(self, address: str) -> None:
+        self.add_status(
+            client_to_agent_pb2.StatusReply(
+                status=client_to_agent_pb2.StatusReply.Status.MOVE_CHANNEL,
+                channel=self.__channel_index,
+                address=address))
+
+    def add_status(self, response: client_to_agent_pb2.StatusReply) -> None:
+        for user in self.__users.values():
+            user.statuses.append(response)
+
+    def release_user(self, index: int, user: User) -> None:
+        if self.__users.get(index) is user:
+            del self.__users[index]
+
+    def get_user(self, index: int) -> User:
+        if index in self.__users:
+            return self.__users[index]
+        else:
+            self.__users[index] = user = User(self.__chats, self.__limit, self.__statistics)
+            return user
+
+    @property
+    def index(self) -> int:
+        return self.__channel_index
+
+    @property
+    def backlog(self) -> 'list[bytes]':
+        chats, _ = self.__chats.read(0)
+
+        return [chat for _, chat in chats]
+
+    @property
+    def users(self) -> 'collections.Iterable[int]':
+        return self.__users.keys()
+
+
+class Handler(client_to_agent_pb2_grpc.Channel):
+    __import_seconds = 5
+
+    def __init__(self, limit: Limit = STATUS_LIMIT):
+        self.__rooms = {}
+        self.__imports = {}
+        self.__stream_count = 0
+        self.__statistics = Statistics()
+        self.__limit = limit
 
     async def TryChatSend(
             self, request: client_to_agent_pb2.Chat,
             context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Empty:
-        if request.text:
-            for index in self.__users.keys() - {request.index}:
-                self.__users[index].chats.append(request)
+        await self.__wait_import(request.channel)
+        room = self.__rooms.get(request.channel)
+
+        if room is not None and request.text:
+            room.send(request)
+
+        return client_to_agent_pb2.Empty()
+
+    async def TryChatBatchSend(
+            self, request: client_to_agent_pb2.ChatBatch,
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Empty:
+        for chat in request.chats:
+            await self.TryChatSend(chat, context)
 
         return client_to_agent_pb2.Empty()
 
     async def TryChatReceive(
             self, request: client_to_agent_pb2.Chat,
-            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Chat:
-        user = self.__users[request.index]
-        chats = user.chats
-
-        while True:
-            if chats:
-                for chat in chats:
-                    yield chat
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.ChatBatch:
+        room = await self.__get_room(request.channel, context)
+        user = self.__open_stream(room, request.index)
 
-                chats.clear()
+        try:
+            while True:
+                chats = await user.chats.receive()
 
-            await asyncio.sleep(1)
+                for batch in pack(encode_field(1, chat) for index, chat in chats if index != request.index):
+                    yield batch
+        except Overflowed:
+            await self.__evict(room, request.index, context)
+        finally:
+            self.__close_stream(room, request.index, user)
 
     async def TryUserRemove(
             self, request: client_to_agent_pb2.UserRequest,
             context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Empty:
-        assert request.index in self.__users
+        room = await self.__get_room(request.channel, context)
+        assert request.index in room.users
 
-        for user in self.__users.values():
-            user.statuses.append(client_to_agent_pb2.StatusReply(
-                status=client_to_agent_pb2.StatusReply.Status.LEAVE_USER,
-                index=request.index,
-                channel=self.__channel_index))
-
-        del self.__users[request.index]
+        room.remove_user(request.index)
 
         return client_to_agent_pb2.Empty()
 
     async def TryStatusRequest(
             self, request: client_to_agent_pb2.UserRequest,
             context: grpc.aio.ServicerContext) -> client_to_agent_pb2.StatusReply:
-        user = self.__users[request.index]
-        statuses = user.statuses
+        room = await self.__get_room(request.channel, context)
+        user = self.__open_stream(room, request.index)
 
-        self.__add_status(
-            client_to_agent_pb2.StatusReply(
-                status=client_to_agent_pb2.StatusReply.Status.JOIN_USER,
-                index=request.index,
-                channel=self.__channel_index))
+        room.join(request.index)
 
-        while True:
-            if statuses:
-                for status in statuses:
+        try:
+            while True:
+                for status in await user.statuses.receive():
                     yield status
+        except Overflowed:
+            await self.__evict(room, request.index, context)
+        finally:
+            self.__close_stream(room, request.index, user)
+
+    async def TrySubscribe(
+            self, request: client_to_agent_pb2.Subscription,
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.ChatBatch:
+        await self.__wait_import(request.channel)
+        room = self.__rooms.get(request.channel) or self.make_room(request.channel)
+        chats = room.subscribe(request.moved)
+        self.__stream_count += 1
+
+        try:
+            await context.send_initial_metadata(())
+
+            while True:
+                for batch in pack(encode_field(1, chat) for _, chat in await chats.receive()):
+                    yield batch
+        finally:
+            room.unsubscribe()
+            self.__stream_count -= 1
+
+            if not room.is_subscribed() and self.__rooms.get(room.index) is room:
+                self.remove_room(room.index)
+
+            logging.debug(f'Subscription closed: channel {room.index}, {self.__stream_count} streams live')
+
+    async def TryRoomImport(
+            self, request: client_to_agent_pb2.Migration,
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Empty:
+        importing = self.__imports.get(request.channel)
 
-                statuses.clear()
+        if importing is None and request.channel not in self.__rooms:
+            room = self.make_room(request.channel)
+            self.__imports[room.index] = importing = asyncio.ensure_future(self.__import_room(room, request))
 
-            await asyncio.sleep(1)
+        if importing is not None:
+            await asyncio.shield(importing)
 
-    def remove_user(self, index: int) -> None:
-        self.__users.pop(index, None)
+        return client_to_agent_pb2.Empty()
 
-        self.__add_status(
-            client_to_agent_pb2.StatusReply(
-                status=client_to_agent_pb2.StatusReply.Status.LEAVE_USER,
-                index=index,
-                channel=self.__channel_index))
+    async def TryRoomExport(
+            self, request: client_to_agent_pb2.Migration,
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Chat:
+        room = self.__rooms.get(request.channel)
 
-    def is_empty(self) -> bool:
-        return not self.__users
+        if room is None:
+            return
+
+        room.move(request.destination)
+
+        for chat in room.backlog:
+            yield chat
+
+    def make_room(self, index: int) -> Room:
+        assert index not in self.__rooms
+
+        self.__rooms[index] = room = Room(index, self.__limit, self.__statistics)
+
+        return room
+
+    def remove_room(self, index: int) -> None:
+        self.__rooms.pop(index, None)
 
     @property
-    def users(self) -> 'collections.Iterable[int]':
-        return self.__users.keys()
+    def rooms(self) -> int:
+        return len(self.__rooms)
 
-    def __add_status(self, response: client_to_agent_pb2.StatusReply) -> None:
-        for user in self.__users.values():
-            user.statuses.append(response)
+    @property
+    def streams(self) -> int:
+        return self.__stream_count
+
+    @property
+    def statistics(self) -> Statistics:
+        return self.__statistics
+
+    def __open_stream(self, room: Room, index: int) -> User:
+        user = room.get_user(index)
+        user.streams += 1
+        self.__stream_count += 1
+
+        return user
+
+    def __close_stream(self, room: Room, index: int, user: User) -> None:
+        user.streams -= 1
+        self.__stream_count -= 1
+
+        if not user.streams:
+            room.release_user(index, user)
+
+        logging.debug(
+            f'Stream closed: {index} at channel {room.index}, {self.__stream_count} streams live, {self.__statistics}')
+
+    async def __evict(self, room: Room, index: int, context: grpc.aio.ServicerContext) -> None:
+        room.remove_user(index)
+
+        logging.info(f'Slow consumer is evicted: {index} at channel {room.index}, {self.__statistics}')
+
+        await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, 'too many messages are pending')
+
+    async def __import_room(self, room: Room, request: client_to_agent_pb2.Migration) -> None:
+        try:
+            async with grpc.aio.insecure_channel(request.source) as channel:
+                stub = client_to_agent_pb2_grpc.ChannelStub(channel)
+
+                async for chat in stub.TryRoomExport(request, timeout=self.__import_seconds):
+                    room.send(chat)
+        except grpc.aio.AioRpcError as error:
+            logging.info(f'Channel {room.index} is not imported from {request.source}: {error.code()}')
+        else:
+            logging.info(f'Channel {room.index} is imported from {request.source}')
+        finally:
+            room.settle()
+            del self.__imports[room.index]
+
+    async def __wait_import(self, index: int) -> None:
+        importing = self.__imports.get(index)
+
+        if importing is not None:
+            await asyncio.shield(importing)
+
+    async def __get_room(self, index: int, context: grpc.aio.ServicerContext) -> Room:
+        await self.__wait_import(index)
+        room = self.__rooms.get(index)
+
+        if room is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, f'channel is not: {index}')
+
+        return room
 
 
 class Channel:
-    def __init__(self, ip: str, port: int):
-        self.__address = address = f'{ip}:{port}'
+    __report_seconds = 1
+
+    def __init__(self, address: str, limit: Limit = STATUS_LIMIT, lobby_addresses: 'tuple[str]' = ()):
+        self.__address = address
+        self.__lobby_addresses = lobby_addresses
         self.__server = server = grpc.aio.server()
         server.add_insecure_port(address)
 
-        handler = Handler(port)
-        self.__handler = weakref.proxy(handler)
+        self.__handler = handler = Handler(limit)
+        add_encoded_stream_handler(
+            server, 'Channel', 'TryChatReceive', handler.TryChatReceive, client_to_agent_pb2.Chat.FromString)
+        add_encoded_stream_handler(
+            server, 'Channel', 'TrySubscribe', handler.TrySubscribe, client_to_agent_pb2.Subscription.FromString)
+        add_encoded_stream_handler(
+            server, 'Channel', 'TryRoomExport', handler.TryRoomExport, client_to_agent_pb2.Migration.FromString)
         client_to_agent_pb2_grpc.add_ChannelServicer_to_server(handler, server)
 
-    def __del__(self):
-        logging.debug('Closing Channel on %s', self.__address)
-
-    async def run(self) -> None:
+    async def start(self) -> None:
         await self.__server.start()
-        await self.__server.wait_for_termination(1)
 
         logging.info('Starting Channel on %s', self.__address)
 
+    async def run(self) -> None:
+        await self.start()
+        await asyncio.gather(
+            self.__server.wait_for_termination(),
+            *(self.__register(address) for address in self.__lobby_addresses))
+
     async def stop(self) -> None:
         await self.__server.stop(0)
 
-    def remove_user(self, index: int) -> None:
-        self.__handler.remove_user(index)
+    def make_room(self, index: int) -> Room:
+        return self.__handler.make_room(index)
 
-    def is_empty(self) -> bool:
-        return self.__handler.is_empty()
+    def remove_room(self, index: int) -> None:
+        self.__handler.remove_room(index)
+
+    @property
+    def streams(self) -> int:
+        return self.__handler.streams
+
+    @property
+    def statistics(self) -> Statistics:
+        return self.__handler.statistics
 
     @property
     def address(self) -> str:
         return self.__address
 
-    @property
-    def users(self) -> 'collections.Iterable[int]':
-        return self.__handler.users
+    async def __register(self, lobby_address: str) -> None:
+        while True:
+            try:
+                async with grpc.aio.insecure_channel(lobby_address) as channel:
+                    stub = client_to_agent_pb2_grpc.LobbyStub(channel)
+                    await self.__send_beats(stub.TryChannelRegister())
+            except grpc.aio.AioRpcError as error:
+                logging.debug(f'Channel is not registered at {lobby_address}: {error.code()}')
+
+            await asyncio.sleep(self.__report_seconds)
+
+    async def __send_beats(self, call: grpc.aio.StreamUnaryCall) -> None:
+        await call.wait_for_connection()
+
+        while not call.done():
+            await call.write(client_to_agent_pb2.ChannelLoad(
+                address=self.__address, rooms=self.__handler.rooms, streams=self.__handler.streams))
+            await asyncio.sleep(self.__report_seconds)
+
+        await call
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+
+import grpc
+
+from proto import client_to_agent_pb2
+from proto import client_to_agent_pb2_grpc
+from server.broadcast import Coalescer
+from server.broadcast import Cursor
+from server.broadcast import MessageLog
+from server.broadcast import Overflow
+from server.broadcast import Statistics
+from server.broadcast import add_encoded_stream_handler
+from server.broadcast import pack
+
+
+class Feed:
+    def __init__(self, capacity: int):
+        self.chats = MessageLog(capacity)
+        self.subscriptions = 0
+        self.forwarding = None
+        self.forwarded = asyncio.Event()
+
+
+class Fanout(client_to_agent_pb2_grpc.Fanout):
+    __chat_capacity = 256
+
+    def __init__(self, address: str):
+        self.__feeds = {}
+        self.__origins = {}
+        self.__stream_count = 0
+        self.__statistics = Statistics()
+        self.__address = address
+        self.__server = server = grpc.aio.server()
+
+        add_encoded_stream_handler(
+            server, 'Fanout', 'TrySubscribe', self.TrySubscribe, client_to_agent_pb2.Subscription.FromString)
+        client_to_agent_pb2_grpc.add_FanoutServicer_to_server(self, server)
+        server.add_insecure_port(address)
+
+    async def TrySubscribe(
+            self, request: client_to_agent_pb2.Subscription,
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.ChatBatch:
+        key = (request.origin, request.channel)
+        feed = self.__feeds.get(key)
+
+        if feed is None:
+            self.__feeds[key] = feed = Feed(self.__chat_capacity)
+            feed.forwarding = asyncio.ensure_future(self.__forward(request, feed))
+
+        chats = Coalescer(Cursor(feed.chats, Overflow.DROP_OLDEST, self.__statistics, 0 if request.moved else None))
+        feed.subscriptions += 1
+        self.__stream_count += 1
+
+        try:
+            await feed.forwarded.wait()
+            await context.send_initial_metadata(())
+
+            while True:
+                for batch in pack(await chats.receive()):
+                    yield batch
+        finally:
+            feed.subscriptions -= 1
+            self.__stream_count -= 1
+
+            if not feed.subscriptions:
+                feed.forwarding.cancel()
+                del self.__feeds[key]
+
+            logging.debug(
+                f'Subscription closed: channel {request.channel} at {request.origin}, '
+                f'{self.__stream_count} streams live, {self.__statistics}')
+
+    async def run(self) -> None:
+        await self.__server.start()
+        logging.info('Starting Fanout on %s', self.__address)
+
+        while True:
+            try:
+                await self.__server.wait_for_termination(timeout=1)
+            except KeyboardInterrupt:
+                await self.__server.stop(0)
+
+    @property
+    def streams(self) -> int:
+        return self.__stream_count
+
+    @property
+    def statistics(self) -> Statistics:
+        return self.__statistics
+
+    async def __forward(self, request: client_to_agent_pb2.Subscription, feed: Feed) -> None:
+        upstream = client_to_agent_pb2.Subscription(channel=request.channel, moved=request.moved)
+
+        while True:
+            try:
+                batches = self.__get_origin(request.origin)(upstream)
+                await batches.initial_metadata()
+
+                if not batches.done():
+                    feed.forwarded.set()
+                    upstream.moved = False
+
+                async for batch in batches:
+                    feed.chats.append(batch)
+            except grpc.aio.AioRpcError as error:
+                logging.debug(f'Channel {request.channel} is not forwarded from {request.origin}: {error.code()}')
+
+            await asyncio.sleep(1)
+
+    def __get_origin(self, address: str) -> grpc.aio.UnaryStreamMultiCallable:
+        if address not in self.__origins:
+            channel = grpc.aio.insecure_channel(address)
+            self.__origins[address] = channel.unary_stream(
+                '/Channel/TrySubscribe', request_serializer=client_to_agent_pb2.Subscription.SerializeToString)
+
+        return self.__origins[address]
@@ -1,12 +1,91 @@
-import asyncio
+import array
+import bisect
+import itertools
 import logging
+import random
 import socket
+import sys
 import time
+import typing
 
 import grpc
 
 from proto import client_to_agent_pb2
 from proto import client_to_agent_pb2_grpc
+from server.broadcast import Cursor
+from server.broadcast import Limit
+from server.broadcast import Mailbox
+from server.broadcast import MessageLog
+from server.broadcast import Overflow
+from server.broadcast import add_encoded_stream_handler
+
+
+class Deadlines:
+    def __init__(self):
+        self.__indexes = array.array('i')
+        self.__deadlines = array.array('q')
+
+    def __contains__(self, index: int) -> bool:
+        return self.__find(index) is not None
+
+    def __getitem__(self, index: int) -> int:
+        position = self.__find(index)
+
+        if position is None:
+            raise KeyError(index)
+
+        return self.__deadlines[position]
+
+    def __setitem__(self, index: int, deadline: int) -> None:
+        position = bisect.bisect_left(self.__indexes, index)
+
+        if position < len(self.__indexes) and self.__indexes[position] == index:
+            self.__deadlines[position] = deadline
+        else:
+            self.__indexes.insert(position, index)
+            self.__deadlines.insert(position, deadline)
+
+    def __delitem__(self, index: int) -> None:
+        position = self.__find(index)
+
+        if position is None:
+            raise KeyError(index)
+
+        del self.__indexes[position]
+        del self.__deadlines[position]
+
+    def __len__(self) -> int:
+        return len(self.__indexes)
+
+    def __iter__(self):
+        return iter(self.__indexes)
+
+    def pop_expired(self, time_stamp: int) -> 'list[int]':
+        expired = list(map(time_stamp.__gt__, self.__deadlines))
+
+        if not any(expired):
+            return []
+
+        indexes = list(itertools.compress(self.__indexes, expired))
+        living = list(map(time_stamp.__le__, self.__deadlines))
+        self.__indexes = array.array('i', itertools.compress(self.__indexes, living))
+        self.__deadlines = array.array('q', itertools.compress(self.__deadlines, living))
+
+        return indexes
+
+    @property
+    def memory_per_user(self) -> float:
+        size = sys.getsizeof(self.__indexes) + sys.getsizeof(self.__deadlines)
+
+        return size / max(len(self.__indexes), 1)
+
+    def __find(self, index: int) -> 'int | None':
+        position = bisect.bisect_left(self.__indexes, index)
+
+        if position < len(self.__indexes) and self.__indexes[position] == index:
+            return position
+        else:
+            return None
 
 
 class Heartbeat(client_to_agent_pb2_grpc.Heartbeat):
@@ -16,12 +95,19 @@ class Heartbeat(client_to_agent_pb2_grpc.Heartbeat):
     __users = None
     __any_messages = None
     __live_seconds = 5
+    __cohort_count = 5
+    __expiration_capacity = 4096
 
     def __init__(self, address: str):
-        self.__users = {}
+        self.__users = Deadlines()
+        self.__expirations = MessageLog(self.__expiration_capacity)
+        self.__cohorts = tuple({} for _ in range(self.__cohort_count))
+        self.__tick = 0
         self.__address = address
         self.__server = server = grpc.aio.server()
 
+        add_encoded_stream_handler(
+            server, 'Heartbeat', 'TryHeartbeat', self.TryHeartbeat, client_to_agent_pb2.HeartbeatRequest.FromString)
         client_to_agent_pb2_grpc.add_HeartbeatServicer_to_server(self, server)
 
         server.add_insecure_port(address)
@@ -31,39 +117,111 @@ class Heartbeat(client_to_agent_pb2_grpc.Heartbeat):
             context: grpc.aio.ServicerContext) -> client_to_agent_pb2.HeartbeatReply:
         assert request.index not in self.__users
 
-        while True:
-            time_stamp = self.__get_time_stamp()
-            self.__users[request.index] = time_stamp + self.__live_seconds
+        time_stamp = self.__get_time_stamp()
+        self.__users[request.index] = time_stamp + self.__live_seconds * 2
+
+        yield client_to_agent_pb2.HeartbeatReply(time=time_stamp).SerializeToString()
 
-            yield client_to_agent_pb2.HeartbeatReply(time=time_stamp)
+        cohort = random.choice(self.__cohorts)
+        cohort[request.index] = replies = Mailbox(Limit(1, Overflow.DROP_OLDEST))
 
-            await asyncio.sleep(self.__live_seconds)
+        try:
+            while True:
+                for reply in await replies.receive():
+                    yield reply
+        finally:
+            del cohort[request.index]
+
+            if request.index in self.__users:
+                del self.__users[request.index]
+                self.__expirations.append(request.index)
+
+            logging.debug(f'Stream closed: {request.index}, {self.streams} streams live')
+
+    @property
+    def streams(self) -> int:
+        return sum(map(len, self.__cohorts))
 
     async def TryUserLives(
             self, request: client_to_agent_pb2.UserRequest,
             context: grpc.aio.ServicerContext) -> client_to_agent_pb2.UserLivesReply:
-        if request.index not in self.__users:
-            return client_to_agent_pb2.UserLivesReply(status=client_to_agent_pb2.UserLivesReply.Status.UNKNOWN)
+        return client_to_agent_pb2.UserLivesReply(status=self.__get_status(request.index))
 
-        time_stamp = self.__users[request.index]
+    async def TryUsersLives(
+            self, request: client_to_agent_pb2.UsersRequest,
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.UsersLivesReply:
+        statuses = tuple(self.__get_status(index) for index in request.indexes)
 
-        if self.__get_time_stamp() > time_stamp:
-            status = client_to_agent_pb2.UserLivesReply.Status.UNKNOWN
+        return client_to_agent_pb2.UsersLivesReply(indexes=request.indexes, statuses=statuses)
 
-            del self.__users[request.index]
-        else:
-            status = client_to_agent_pb2.UserLivesReply.Status.LIVE
+    async def TryExpiredUsers(
+            self, request: client_to_agent_pb2.Empty,
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.UserRequest:
+        expirations = Cursor(self.__expirations)
 
-        return client_to_agent_pb2.UserLivesReply(status=status)
+        while True:
+            for index in await expirations.receive():
+                yield client_to_agent_pb2.UserRequest(index=index)
+
+    async def TryHeartbeatReport(
+            self, request_iterator: 'typing.AsyncIterator[client_to_agent_pb2.HeartbeatRequest]',
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Empty:
+        async for request in request_iterator:
+            self.__users[request.index] = self.__get_time_stamp() + self.__live_seconds * 2
+
+        return client_to_agent_pb2.Empty()
 
     async def run(self) -> None:
         await self.__server.start()
         logging.info('Starting Heartbeat on %s', self.__address)
 
-        try:
-            await self.__server.wait_for_termination()
-        except KeyboardInterrupt:
-            await self.__server.stop(0)
+        while True:
+            try:
+                await self.__server.wait_for_termination(timeout=1)
+            except KeyboardInterrupt:
+                await self.__server.stop(0)
+
+            self.__beat()
+            self.__expire_users()
+
+    def __get_status(self, index: int) -> client_to_agent_pb2.UserLivesReply.Status:
+        if index not in self.__users:
+            return client_to_agent_pb2.UserLivesReply.Status.UNKNOWN
+
+        time_stamp = self.__users[index]
+
+        if self.__get_time_stamp() > time_stamp:
+            del self.__users[index]
+
+            return client_to_agent_pb2.UserLivesReply.Status.UNKNOWN
+        else:
+            return client_to_agent_pb2.UserLivesReply.Status.LIVE
+
+    def __beat(self) -> None:
+        cohort = self.__cohorts[self.__tick % len(self.__cohorts)]
+        self.__tick += 1
+
+        if not cohort:
+            return
+
+        time_stamp = self.__get_time_stamp()
+        deadline = time_stamp + self.__live_seconds * 2
+        reply = client_to_agent_pb2.HeartbeatReply(time=time_stamp).SerializeToString()
+
+        for index, replies in cohort.items():
+            self.__users[index] = deadline
+            replies.append(reply)
+
+    def __expire_users(self) -> None:
+        indexes = self.__users.pop_expired(self.__get_time_stamp())
+
+        for index in indexes:
+            self.__expirations.append(index)
+
+        if indexes:
+            logging.debug(
+                f'Users expired: {indexes}, tracking {len(self.__users)} users '
+                f'at {self.__users.memory_per_user:.1f} bytes per user')
 
     @staticmethod
     def __get_time_stamp() -> int:
@@ -1,24 +1,49 @@
 import asyncio
+import bisect
 import collections
 import logging
 import time
+import typing
 
 import grpc
 
 from proto import client_to_agent_pb2
 from proto import client_to_agent_pb2_grpc
+from server.broadcast import Coalescer
+from server.broadcast import Cursor
+from server.broadcast import Limit
+from server.broadcast import Mailbox
+from server.broadcast import MessageLog
+from server.broadcast import Overflow
+from server.broadcast import Overflowed
+from server.broadcast import Selector
+from server.broadcast import Statistics
+from server.broadcast import add_encoded_stream_handler
+from server.broadcast import encode_field
+from server.broadcast import pack
+from server.broadcast import write_stream
+from server.bus import Bus
+from server.channel import STATUS_LIMIT
 from server.channel import Channel
+from server.channel import Room
+from server.presence import PresenceIndex
+from server.ring import Ring
+from server.channel import get_status_key
 
 
 class User:
-    __time_stamp = 0
+    __slots__ = ('index', 'chats', 'channel', 'statuses', 'streams', 'room', 'member', '__time_stamp')
     __validating_time = 60
 
-    def __init__(self, index: int):
+    def __init__(self, index: int, chats: MessageLog, limit: Limit = STATUS_LIMIT, statistics: Statistics = None):
+        self.__time_stamp = 0
         self.index = index
-        self.chats = []
+        self.chats = Coalescer(Cursor(chats, limit.Overflow, statistics))
         self.channel = 0
-        self.statuses = []
+        self.statuses = Mailbox(limit, statistics, get_status_key)
+        self.streams = 0
+        self.room = None
+        self.member = None
 
     def validate(self):
         self.__time_stamp = time.time() + self.__validating_time
@@ -28,48 +53,95 @@ class User:
 
 
 class Lobby(client_to_agent_pb2_grpc.Lobby):
-    def __init__(self, lobby_address: str, channel_ip: str, channel_ports:'tuple[int]'):
+    __chat_capacity = 1024
+    __directory_capacity = 1024
+    __page_size = 1024
+    __listing_capacity = 256
+    __reply_capacity = 64
+    __heartbeat_capacity = 4096
+    __subscribe_seconds = 5
+    __listing_statuses = (
+        client_to_agent_pb2.CommandRequest.Status.LIST_CHANNELS,
+        client_to_agent_pb2.CommandRequest.Status.LIST_USERS,
+    )
+
+    def __init__(
+            self, lobby_address: str, channel_address: str, limit: Limit = STATUS_LIMIT,
+            heartbeat_address: str = '', shard: int = 0, bus_addresses: 'tuple[str]' = (),
+            fanout_addresses: 'tuple[str]' = ()):
         self.__channels = collections.OrderedDict()
+        self.__channel_index = 0
         self.__users = {}
+        self.__presence = PresenceIndex()
+        self.__hosts = {}
+        self.__loads = {}
+        self.__ring = Ring()
+        self.__host_stubs = {}
+        self.__fanout_stubs = tuple(
+            client_to_agent_pb2_grpc.FanoutStub(grpc.aio.insecure_channel(address)) for address in fanout_addresses)
+        self.__placements = {}
+        self.__subscriptions = {}
+        self.__subscribed = {}
+        self.__version = 0
+        self.__listings = {}
+        self.__directory = MessageLog(self.__directory_capacity)
+        self.__chats = MessageLog(self.__chat_capacity)
+        self.__stream_count = 0
+        self.__statistics = Statistics()
+        self.__limit = limit
+        self.__heartbeats = Mailbox(Limit(self.__heartbeat_capacity, Overflow.DROP_OLDEST), self.__statistics)
+        self.__heartbeat_address = heartbeat_address
         self.__address = lobby_address
-        self.__channel_ports = list(channel_ports)
-        self.__channel_ip = channel_ip
+        self.__peer_streams = collections.Counter()
+        self.__bus = Bus(shard, bus_addresses, self.__get_presences)
+        self.__channel = Channel(channel_address, limit) if channel_address else None
         self.__server = server = grpc.aio.server()
 
+        add_encoded_stream_handler(
+            server, 'Lobby', 'TryChatReceive', self.TryChatReceive, client_to_agent_pb2.Chat.FromString)
+        add_encoded_stream_handler(
+            server, 'Lobby', 'Session', self.Session, client_to_agent_pb2.Frame.FromString,
+            grpc.stream_stream_rpc_method_handler)
+        add_encoded_stream_handler(
+            server, 'Lobby', 'TryCommand', self.__try_command, client_to_agent_pb2.CommandRequest.FromString,
+            grpc.unary_unary_rpc_method_handler)
         client_to_agent_pb2_grpc.add_LobbyServicer_to_server(self, server)
         server.add_insecure_port(self.__address)
 
+        if bus_addresses and bus_addresses[shard] != lobby_address:
+            server.add_insecure_port(bus_addresses[shard])
+
     async def TryChatSend(
             self, request: client_to_agent_pb2.Chat,
             context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Empty:
         if request.text:
-            for index in self.__users.keys() - {request.index}:
-                self.__users[index].chats.append(request)
-
+            self.__chats.append((request.index, request.SerializeToString()))
             self.__get_user(request.index).validate()
+            self.__publish_chat(request)
 
         return client_to_agent_pb2.Empty()
 
     async def TryChatReceive(
             self, request: client_to_agent_pb2.Chat,
-            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Chat:
-        user = self.__get_user(request.index)
-
-        while True:
-            if user.chats:
-                for chat in user.chats:
-                    yield chat
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.ChatBatch:
+        user = self.__open_stream(request.index)
 
-                user.chats.clear()
+        try:
+            while True:
+                chats = await user.chats.receive()
 
-            await asyncio.sleep(1)
+                for batch in pack(encode_field(1, chat) for index, chat in chats if index != request.index):
+                    yield batch
+        except Overflowed:
+            await self.__evict(user, context)
+        finally:
+            self.__close_stream(user)
 
     async def TryUserRemove(
             self, request: client_to_agent_pb2.UserRequest,
             context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Empty:
         if request.index in self.__users:
-            user = self.__users.pop(request.index)
-            await self.__remove_user_from_channel(user.index, user.channel)
+            self.__remove_user(self.__users[request.index])
 
         return client_to_agent_pb2.Empty()
 
@@ -87,30 +159,32 @@ class Lobby(client_to_agent_pb2_grpc.Lobby):
         else:
             user.validate()
 
-        if status.LIST_CHANNELS == request.status:
-            channels = tuple(self.__channels)
-
-            return client_to_agent_pb2.CommandReply(channels=channels)
+        if request.status in self.__listing_statuses:
+            return client_to_agent_pb2.CommandReply.FromString(self.__list(request))
         elif status.MAKE_CHANNEL == request.status:
-            if not self.__channel_ports:
+            index = (self.__channel_index + 1) * self.__bus.shard_count + self.__bus.shard
+            channel_address = self.__place_room(index)
+
+            if not channel_address:
+                logging.info('There is no channel host to place a room')
+
                 return client_to_agent_pb2.CommandReply(status=client_to_agent_pb2.CommandReply.Status.FAILURE)
 
-            port = self.__channel_ports.pop(0)
-            channel = Channel(self.__channel_ip, port)
-            self.__channels[port] = channel
-            user.channel = port
+            self.__channel_index += 1
 
-            await channel.run()
+            self.__set_channel(user, index, channel_address)
+            await self.__wait_subscribed(index)
 
             return client_to_agent_pb2.CommandReply(
                 status=client_to_agent_pb2.CommandReply.Status.SUCCESS,
-                address=f'{self.__channel_ip}:{port}',
-                channels=(port,))
+                address=channel_address,
+                channels=(index,))
         elif status.JOIN_CHANNEL == request.status:
             channel_address = await self.__join_channel(request.index, request.channel)
 
             if channel_address:
-                user.channel = request.channel
+                self.__set_channel(user, request.channel)
+                await self.__wait_subscribed(request.channel)
 
                 return client_to_agent_pb2.CommandReply(
                     status=client_to_agent_pb2.CommandReply.Status.SUCCESS,
@@ -119,26 +193,134 @@ class Lobby(client_to_agent_pb2_grpc.Lobby):
                 return client_to_agent_pb2.CommandReply(
                     status=client_to_agent_pb2.CommandReply.Status.FAILURE)
         elif status.LEAVE_CHANNEL == request.status:
-            await self.__remove_user_from_channel(request.index, user.channel)
-            self.__users[request.index].channel = 0
+            self.__set_channel(user, 0)
 
             return client_to_agent_pb2.CommandReply(
                 status=client_to_agent_pb2.CommandReply.Status.SUCCESS)
-        elif status.LIST_USERS == request.status:
-            users = await self.__get_users(request.channel)
-            channels = tuple(self.__users[index].channel for index in users)
-
-            return client_to_agent_pb2.CommandReply(
-                status=client_to_agent_pb2.CommandReply.Status.SUCCESS,
-                users=users,
-                channels=channels)
         else:
             assert False
 
+    async def Session(
+            self, request_iterator: 'typing.AsyncIterator[client_to_agent_pb2.Frame]',
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Frame:
+        requests = request_iterator.__aiter__()
+        login = (await requests.__anext__()).login
+        user = self.__open_stream(login.index)
+        replies = Mailbox(Limit(self.__reply_capacity, Overflow.DISCONNECT), self.__statistics)
+        selector = Selector()
+        selector.add(user.chats, lambda chats: self.__get_chat_frames(user.index, chats))
+        selector.add(user.statuses, self.__get_status_frames)
+        selector.add(replies, list)
+        reading = asyncio.ensure_future(self.__read_session(user, requests, selector, replies, context))
+
+        try:
+            while True:
+                for frame in await selector.receive():
+                    if frame is None:
+                        return
+
+                    yield frame
+        except Overflowed:
+            await self.__evict(user, context)
+        finally:
+            reading.cancel()
+            selector.close()
+            self.__leave_room(user, selector)
+            self.__close_stream(user)
+
+    async def TryRelay(
+            self, request_iterator: 'typing.AsyncIterator[client_to_agent_pb2.Relay]',
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Empty:
+        shard = None
+
+        try:
+            async for relay in request_iterator:
+                body = relay.WhichOneof('body')
+
+                if 'chat' == body:
+                    self.__receive_chat(relay.chat)
+                elif 'presence' == body:
+                    self.__receive_presence(relay.presence)
+                elif 'snapshot' == body:
+                    if shard is None:
+                        shard = relay.snapshot.shard
+                        self.__peer_streams[shard] += 1
+
+                    self.__receive_snapshot(relay.snapshot)
+        finally:
+            if shard is not None:
+                self.__peer_streams[shard] -= 1
+
+                if not self.__peer_streams[shard]:
+                    del self.__peer_streams[shard]
+                    self.__drop_shard_users(shard, ())
+
+        return client_to_agent_pb2.Empty()
+
+    async def TryChannelRegister(
+            self, request_iterator: 'typing.AsyncIterator[client_to_agent_pb2.ChannelLoad]',
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Empty:
+        address = ''
+
+        try:
+            async for load in request_iterator:
+                if not address:
+                    address = load.address
+                    self.__add_host(address)
+
+                if self.__loads.get(address) != load:
+                    logging.debug(f'Channel host {address} has {load.rooms} rooms, {load.streams} streams')
+
+                    self.__loads[address] = load
+        finally:
+            if address:
+                self.__remove_host(address)
+
+        return client_to_agent_pb2.Empty()
+
+    async def WatchDirectory(
+            self, request: client_to_agent_pb2.Empty,
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Directory:
+        while True:
+            entries = Coalescer(Cursor(self.__directory, Overflow.DISCONNECT))
+
+            yield self.__get_snapshot()
+
+            try:
+                while True:
+                    yield client_to_agent_pb2.Directory(entries=await entries.receive(), version=self.__version)
+            except Overflowed:
+                logging.debug('Directory watcher is behind, sending a snapshot')
+
+    async def TryUserList(
+            self, request: client_to_agent_pb2.CommandRequest,
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.CommandReply:
+        channel = request.channel if request.channel in self.__channels else 0
+        after = request.after if request.HasField('after') else None
+        limit = self.__get_page_size(request)
+
+        while True:
+            reply = self.__get_page(channel, after, limit)
+
+            yield reply
+
+            if not reply.HasField('after'):
+                break
+
+            after = reply.after
+
     async def run(self) -> None:
+        if self.__channel is not None:
+            await self.__channel.start()
+
         await self.__server.start()
         logging.info('Starting Lobby on %s', self.__address)
 
+        asyncio.ensure_future(self.__bus.run())
+
+        if self.__heartbeat_address:
+            asyncio.ensure_future(self.__report_heartbeats())
+
         while True:
             try:
                 await self.__server.wait_for_termination(timeout=1)
@@ -147,66 +329,517 @@ class Lobby(client_to_agent_pb2_grpc.Lobby):
 
     async def TryUserExit(
             self, request: client_to_agent_pb2.UserRequest,
-            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.Empty:
-        user = self.__users.get(request.index)
-
-        if user is not None:
-            if user.is_invalidated():
-                response = client_to_agent_pb2.StatusReply(
-                    index=user.index,
-                    status=client_to_agent_pb2.StatusReply.Status.QUIT)
-
-                user.statuses.append(response)
-                return response
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.StatusReply:
+        return client_to_agent_pb2.StatusReply(index=request.index, status=self.__exit_user(request.index))
 
-        return client_to_agent_pb2.StatusReply(
-            index=user.index,
-            status=client_to_agent_pb2.StatusReply.Status.OK)
+    async def TryUsersExit(
+            self, request: client_to_agent_pb2.UsersRequest,
+            context: grpc.aio.ServicerContext) -> client_to_agent_pb2.UsersExitReply:
+        return client_to_agent_pb2.UsersExitReply(
+            indexes=request.indexes,
+            statuses=tuple(self.__exit_user(index) for index in request.indexes))
 
     async def TryStatusRequest(
             self, request: client_to_agent_pb2.UserRequest,
             context: grpc.aio.ServicerContext) -> client_to_agent_pb2.StatusReply:
-        statuses = self.__get_user(request.index).statuses
+        user = self.__open_stream(request.index)
 
-        while True:
-            if statuses:
-                for status in statuses:
+        try:
+            while True:
+                for status in await user.statuses.receive():
                     yield status
+        except Overflowed:
+            await self.__evict(user, context)
+        finally:
+            self.__close_stream(user)
+
+    @property
+    def streams(self) -> int:
+        return self.__stream_count
+
+    @property
+    def statistics(self) -> Statistics:
+        return self.__statistics
+
+    @property
+    def loads(self) -> 'dict[str, client_to_agent_pb2.ChannelLoad]':
+        return self.__loads
+
+    def __open_stream(self, index: int) -> User:
+        user = self.__get_user(index)
+        user.streams += 1
+        self.__stream_count += 1
+
+        return user
+
+    def __close_stream(self, user: User) -> None:
+        user.streams -= 1
+        self.__stream_count -= 1
+
+        if not user.streams:
+            self.__remove_user(user)
+
+        logging.debug(f'Stream closed: {user.index}, {self.__stream_count} streams live, {self.__statistics}')
+
+    async def __read_session(
+            self, user: User, requests: 'typing.AsyncIterator[client_to_agent_pb2.Frame]', selector: Selector,
+            replies: Mailbox, context: grpc.aio.ServicerContext) -> None:
+        try:
+            async for frame in requests:
+                body = frame.WhichOneof('body')
+
+                if 'chat' == body:
+                    await self.__send_session_chats(user, (frame.chat,), context)
+                elif 'chats' == body:
+                    await self.__send_session_chats(user, frame.chats.chats, context)
+                elif 'command' == body:
+                    frame.command.index = user.index
+
+                    if frame.command.status in self.__listing_statuses:
+                        user.validate()
+                        replies.append(encode_field(4, self.__list(frame.command)))
+                        continue
+
+                    reply = await self.TryCommand(frame.command, context)
+
+                    if user.room is None or user.room.index != user.channel:
+                        self.__leave_room(user, selector)
+                        self.__enter_room(user, selector)
+
+                    replies.append(client_to_agent_pb2.Frame(reply=reply))
+                elif 'keepalive' == body:
+                    if self.__heartbeat_address:
+                        self.__heartbeats.append(user.index)
+
+                    replies.append(client_to_agent_pb2.Frame(
+                        keepalive=client_to_agent_pb2.HeartbeatReply(time=int(time.time()))))
+        finally:
+            replies.append(None)
+
+    async def __send_session_chats(
+            self, user: User, chats: 'collections.Iterable[client_to_agent_pb2.Chat]',
+            context: grpc.aio.ServicerContext) -> None:
+        room_chats = []
+
+        for chat in chats:
+            chat.index = user.index
+
+            if not chat.channel:
+                await self.TryChatSend(chat, context)
+            elif user.room is not None and user.room.index == chat.channel and chat.text:
+                room_chats.append(chat)
 
-                statuses.clear()
+        if room_chats:
+            await self.__send_room_chats(user.room, room_chats)
 
-            await asyncio.sleep(5)
+    def __enter_room(self, user: User, selector: Selector) -> None:
+        room = self.__channels.get(user.channel)
 
-    async def __remove_user_from_channel(self, user_index: int, port: int) -> None:
-        if port not in self.__channels:
+        if room is None:
             return
 
-        channel = self.__channels[port]
-        channel.remove_user(user_index)
+        user.room = room
+        user.member = member = room.get_user(user.index)
+        room.join(user.index)
+
+        selector.add(member.chats, lambda chats: self.__get_chat_frames(user.index, chats))
+        selector.add(member.statuses, self.__get_status_frames)
+
+    def __leave_room(self, user: User, selector: Selector) -> None:
+        if user.room is None:
+            return
+
+        selector.remove(user.member.chats)
+        selector.remove(user.member.statuses)
+        user.room.release_user(user.index, user.member)
+
+        user.room = user.member = None
+
+    async def __report_heartbeats(self) -> None:
+        while True:
+            try:
+                async with grpc.aio.insecure_channel(self.__heartbeat_address) as channel:
+                    stub = client_to_agent_pb2_grpc.HeartbeatStub(channel)
+                    await write_stream(
+                        stub.TryHeartbeatReport(), self.__heartbeats,
+                        lambda index: client_to_agent_pb2.HeartbeatRequest(index=index))
+            except grpc.aio.AioRpcError as error:
+                logging.debug(f'Heartbeats are not reported: {error.code()}')
+
+            await asyncio.sleep(1)
+
+    @staticmethod
+    def __get_chat_frames(user_index: int, chats: 'list[tuple[int, bytes]]') -> 'typing.Iterator[bytes]':
+        chats = [chat for index, chat in chats if index != user_index]
+
+        if 1 == len(chats):
+            return (encode_field(2, chats[0]),)
+        else:
+            return (encode_field(7, batch) for batch in pack(encode_field(1, chat) for chat in chats))
+
+    @staticmethod
+    def __get_status_frames(
+            statuses: 'list[client_to_agent_pb2.StatusReply]') -> 'typing.Iterator[client_to_agent_pb2.Frame]':
+        return (client_to_agent_pb2.Frame(status=status) for status in statuses)
+
+    async def __evict(self, user: User, context: grpc.aio.ServicerContext) -> None:
+        self.__remove_user(user)
+
+        logging.info(f'Slow consumer is evicted: {user.index}, {self.__statistics}')
+
+        await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, 'too many messages are pending')
+
+    def __exit_user(self, index: int) -> int:
+        user = self.__users.get(index)
+
+        if user is not None and user.is_invalidated():
+            user.statuses.append(client_to_agent_pb2.StatusReply(
+                index=user.index,
+                status=client_to_agent_pb2.StatusReply.Status.QUIT))
+
+            return client_to_agent_pb2.StatusReply.Status.QUIT
+
+        return client_to_agent_pb2.StatusReply.Status.OK
+
+    def __remove_user(self, user: User) -> None:
+        if self.__users.get(user.index) is user:
+            del self.__users[user.index]
+            self.__move_user(user.index, 0, '')
+            self.__presence.remove(user.index)
+            self.__change(client_to_agent_pb2.DirectoryEntry.Status.REMOVE_USER, index=user.index)
+            self.__bus.publish(client_to_agent_pb2.Relay(
+                presence=client_to_agent_pb2.Presence(index=user.index, removed=True)))
+
+    def __set_channel(self, user: User, channel_index: int, channel_address: str = '') -> None:
+        channel_address = channel_address or self.__placements.get(channel_index, '')
+        self.__move_user(user.index, channel_index, channel_address)
+        user.channel = channel_index
+
+        self.__bus.publish(client_to_agent_pb2.Relay(presence=client_to_agent_pb2.Presence(
+            index=user.index, channel=channel_index, address=channel_address)))
+
+    async def __try_command(
+            self, request: client_to_agent_pb2.CommandRequest, context: grpc.aio.ServicerContext) -> bytes:
+        if request.status in self.__listing_statuses and request.index in self.__users:
+            self.__users[request.index].validate()
+
+            return self.__list(request)
+
+        return (await self.TryCommand(request, context)).SerializeToString()
+
+    def __list(self, request: client_to_agent_pb2.CommandRequest) -> bytes:
+        if request.HasField('version') and request.version == self.__version:
+            return client_to_agent_pb2.CommandReply(
+                status=client_to_agent_pb2.CommandReply.Status.UNCHANGED,
+                version=self.__version).SerializeToString()
+
+        if client_to_agent_pb2.CommandRequest.Status.LIST_CHANNELS == request.status:
+            key = (request.status, 0, None, 0)
+        else:
+            key = (
+                request.status,
+                request.channel if request.channel in self.__channels else 0,
+                request.after if request.HasField('after') else None,
+                self.__get_page_size(request))
+
+        if key not in self.__listings:
+            if self.__listing_capacity <= len(self.__listings):
+                del self.__listings[next(iter(self.__listings))]
+
+            self.__listings[key] = self.__make_listing(*key).SerializeToString()
+
+        return self.__listings[key]
+
+    def __make_listing(
+            self, status: int, channel: int, after: typing.Optional[int],
+            limit: int) -> client_to_agent_pb2.CommandReply:
+        if client_to_agent_pb2.CommandRequest.Status.LIST_CHANNELS == status:
+            return client_to_agent_pb2.CommandReply(channels=tuple(self.__channels), version=self.__version)
+
+        return self.__get_page(channel, after, limit)
+
+    def __get_page(self, channel: int, after: typing.Optional[int], limit: int) -> client_to_agent_pb2.CommandReply:
+        members = self.__get_users(channel)
+        start = 0 if after is None else bisect.bisect(members, after)
+        end = start + limit
+        users = members[start:end]
+        reply = client_to_agent_pb2.CommandReply(
+            status=client_to_agent_pb2.CommandReply.Status.SUCCESS,
+            users=users,
+            channels=[self.__presence.get_channel(index) for index in users],
+            version=self.__version)
+
+        if end < len(members):
+            reply.after = users[-1]
+
+        return reply
+
+    def __get_page_size(self, request: client_to_agent_pb2.CommandRequest) -> int:
+        if 0 < request.limit:
+            return min(request.limit, self.__page_size)
+        else:
+            return self.__page_size
+
+    def __get_snapshot(self) -> client_to_agent_pb2.Directory:
+        status = client_to_agent_pb2.DirectoryEntry.Status
+        entries = [client_to_agent_pb2.DirectoryEntry(status=status.ADD_CHANNEL, channel=index)
+                   for index in self.__channels]
+        entries.extend(client_to_agent_pb2.DirectoryEntry(status=status.MOVE_USER, index=index, channel=channel)
+                       for index, channel in self.__presence.items())
+
+        return client_to_agent_pb2.Directory(entries=entries, version=self.__version, snapshot=True)
+
+    def __change(self, status: int, channel: int = 0, index: int = 0) -> None:
+        self.__version += 1
+        self.__listings.clear()
+        self.__directory.append(client_to_agent_pb2.DirectoryEntry(status=status, channel=channel, index=index))
+
+    def __move_user(self, user_index: int, channel_index: int, channel_address: str) -> None:
+        previous_index = self.__presence.move(user_index, channel_index)
+
+        if previous_index == channel_index:
+            return
+
+        if previous_index in self.__channels:
+            self.__channels[previous_index].remove_user(user_index)
+
+            if not self.__presence.count(previous_index):
+                self.__remove_room(previous_index)
+
+        if channel_index and channel_index not in self.__channels:
+            self.__make_room(channel_index, channel_address)
+
+        self.__change(client_to_agent_pb2.DirectoryEntry.Status.MOVE_USER, channel_index, user_index)
+
+    def __add_host(self, address: str) -> None:
+        stream_count = self.__hosts.get(address, 0)
+        self.__hosts[address] = stream_count + 1
+
+        if not stream_count:
+            logging.info(f'Channel host is registered: {address}')
+
+            self.__ring.add(address)
+            self.__rebalance()
+
+    def __remove_host(self, address: str) -> None:
+        self.__hosts[address] -= 1
+
+        if not self.__hosts[address]:
+            del self.__hosts[address]
+            self.__loads.pop(address, None)
+
+            logging.info(f'Channel host is unregistered: {address}')
+
+            self.__ring.remove(address)
+            self.__rebalance()
+
+    def __place_room(self, index: int) -> str:
+        if self.__ring:
+            return self.__ring.get(index)
+        elif self.__channel is not None:
+            return self.__channel.address
+        else:
+            return ''
+
+    def __make_room(self, index: int, address: str) -> None:
+        self.__placements[index] = address
+        self.__change(client_to_agent_pb2.DirectoryEntry.Status.ADD_CHANNEL, index)
+
+        if self.__is_local(address):
+            self.__channels[index] = self.__channel.make_room(index)
+        else:
+            self.__channels[index] = room = Room(index, self.__limit, self.__statistics)
+
+            if address:
+                self.__subscribed[index] = subscribed = asyncio.Event()
+                self.__subscriptions[index] = asyncio.ensure_future(self.__subscribe(room, address, subscribed))
+
+    def __remove_room(self, index: int) -> None:
+        del self.__channels[index]
+        address = self.__placements.pop(index)
+        subscription = self.__subscriptions.pop(index, None)
+        self.__subscribed.pop(index, None)
+
+        if subscription is not None:
+            subscription.cancel()
+
+        if self.__is_local(address):
+            self.__channel.remove_room(index)
+
+        self.__change(client_to_agent_pb2.DirectoryEntry.Status.REMOVE_CHANNEL, index)
+
+    def __rebalance(self) -> None:
+        if not self.__ring:
+            return
+
+        for index, address in tuple(self.__placements.items()):
+            destination = self.__ring.get(index)
+
+            if address != destination and not self.__is_local(address):
+                self.__migrate(self.__channels[index], address, destination)
+
+    def __migrate(self, room: Room, source: str, destination: str) -> None:
+        self.__placements[room.index] = destination
+        subscription = self.__subscriptions.pop(room.index, None)
+
+        if subscription is not None:
+            subscription.cancel()
+
+        self.__subscribed[room.index] = subscribed = asyncio.Event()
+        self.__subscriptions[room.index] = asyncio.ensure_future(
+            self.__move_room(room, source, destination, subscribed))
+        room.move(destination)
+
+        logging.info(f'Channel {room.index} moves from {source} to {destination}')
+
+    async def __move_room(self, room: Room, source: str, destination: str, subscribed: asyncio.Event) -> None:
+        if source:
+            migration = client_to_agent_pb2.Migration(channel=room.index, source=source, destination=destination)
+
+            try:
+                await self.__get_host_stub(destination).TryRoomImport(migration)
+            except grpc.aio.AioRpcError as error:
+                logging.info(f'Channel {room.index} is not moved to {destination}: {error.code()}')
+
+        await self.__subscribe(room, destination, subscribed, True)
+
+    def __is_local(self, address: str) -> bool:
+        return self.__channel is not None and self.__channel.address == address
+
+    async def __subscribe(self, room: Room, address: str, subscribed: asyncio.Event, moved: bool = False) -> None:
+        while True:
+            try:
+                chats = self.__get_chats(room.index, address, moved)
+                await chats.initial_metadata()
+
+                if not chats.done():
+                    subscribed.set()
+                    moved = False
+
+                async for batch in chats:
+                    for chat in batch.chats:
+                        room.send(chat)
+            except grpc.aio.AioRpcError as error:
+                logging.debug(f'Channel {room.index} is not subscribed at {address}: {error.code()}')
+
+            await asyncio.sleep(1)
+
+    async def __wait_subscribed(self, index: int) -> None:
+        subscribed = self.__subscribed.get(index)
+
+        if subscribed is None:
+            return
+
+        try:
+            await asyncio.wait_for(subscribed.wait(), self.__subscribe_seconds)
+        except asyncio.TimeoutError:
+            logging.info(f'Channel {index} is not subscribed at {self.__placements.get(index, "")} yet')
+
+    async def __send_room_chats(self, room: Room, chats: 'list[client_to_agent_pb2.Chat]') -> None:
+        await self.__wait_subscribed(room.index)
+        address = self.__placements.get(room.index, '')
+
+        if not address or self.__is_local(address):
+            for chat in chats:
+                room.send(chat)
+
+            return
+
+        try:
+            await self.__get_host_stub(address).TryChatBatchSend(client_to_agent_pb2.ChatBatch(chats=chats))
+        except grpc.aio.AioRpcError as error:
+            logging.info(f'Chat is not sent to channel {room.index} at {address}: {error.code()}')
+
+    def __get_chats(self, index: int, address: str, moved: bool) -> grpc.aio.UnaryStreamCall:
+        subscription = client_to_agent_pb2.Subscription(channel=index, origin=address, moved=moved)
+
+        if self.__fanout_stubs:
+            stub = self.__fanout_stubs[(index + self.__bus.shard) % len(self.__fanout_stubs)]
+        else:
+            stub = self.__get_host_stub(address)
+
+        return stub.TrySubscribe(subscription)
+
+    def __get_host_stub(self, address: str) -> client_to_agent_pb2_grpc.ChannelStub:
+        if address not in self.__host_stubs:
+            self.__host_stubs[address] = client_to_agent_pb2_grpc.ChannelStub(grpc.aio.insecure_channel(address))
+
+        return self.__host_stubs[address]
+
+    def __publish_chat(self, request: client_to_agent_pb2.Chat) -> None:
+        self.__bus.publish(client_to_agent_pb2.Relay(chat=request))
+
+    def __receive_chat(self, request: client_to_agent_pb2.Chat) -> None:
+        self.__chats.append((request.index, request.SerializeToString()))
+
+    def __receive_presence(self, presence: client_to_agent_pb2.Presence) -> None:
+        status = client_to_agent_pb2.DirectoryEntry.Status
+        known = presence.index in self.__presence
+        previous_index = self.__presence.get_channel(presence.index)
+        channel_index = 0 if presence.removed else presence.channel
+
+        if presence.removed and not known:
+            return
+
+        self.__move_user(presence.index, channel_index, presence.address)
+
+        if presence.removed:
+            self.__presence.remove(presence.index)
+            self.__change(status.REMOVE_USER, index=presence.index)
+        elif not known and not channel_index:
+            self.__change(status.MOVE_USER, index=presence.index)
+
+        if channel_index != previous_index and channel_index in self.__channels:
+            self.__channels[channel_index].join(presence.index)
+
+        if channel_index % self.__bus.shard_count == self.__bus.shard:
+            self.__channel_index = max(self.__channel_index, channel_index // self.__bus.shard_count)
+
+    def __receive_snapshot(self, snapshot: client_to_agent_pb2.Snapshot) -> None:
+        self.__drop_shard_users(snapshot.shard, {presence.index for presence in snapshot.presences})
+
+        for presence in snapshot.presences:
+            self.__receive_presence(presence)
+
+        logging.info(f'Shard {snapshot.shard} is synchronized: {len(snapshot.presences)} users')
+
+    def __drop_shard_users(self, shard: int, kept: 'collections.abc.Container[int]') -> None:
+        indexes = tuple(
+            index for index, _ in self.__presence.items()
+            if index % self.__bus.shard_count == shard and index not in self.__users and index not in kept)
+
+        for index in indexes:
+            self.__receive_presence(client_to_agent_pb2.Presence(index=index, removed=True))
+
+    def __get_presences(self) -> 'list[client_to_agent_pb2.Presence]':
+        presences = []
 
-        if channel.is_empty():
-            del self.__channels[port]
-            await channel.stop()
-            del channel
+        for index in self.__users:
+            channel_index = self.__presence.get_channel(index)
+            presences.append(client_to_agent_pb2.Presence(
+                index=index, channel=channel_index, address=self.__placements.get(channel_index, '')))
 
-            self.__channel_ports.insert(0, port)
+        return presences
 
     async def __join_channel(self, index: int, channel: collections.Hashable) -> str:
         if channel in self.__channels:
-            return self.__channels[channel].address
+            return self.__placements.get(channel, '')
         else:
             return ''
 
-    async def __get_users(self, channel: collections.Hashable) -> 'tuple[int]':
+    def __get_users(self, channel: collections.Hashable) -> 'collections.abc.Sequence[int]':
         if channel in self.__channels:
-            return tuple(self.__channels[channel].users)
+            return self.__presence.get_members(channel)
         else:
-            return tuple(self.__users)
+            return self.__presence.get_users()
 
     def __get_user(self, index: collections.Hashable) -> User:
         if index in self.__users:
             return self.__users[index]
         else:
-            self.__users[index] = user = User(index)
+            self.__users[index] = user = User(index, self.__chats, self.__limit, self.__statistics)
             user.validate()
-            return user
\ No newline at end of file
+            self.__presence.move(index)
+            self.__change(client_to_agent_pb2.DirectoryEntry.Status.MOVE_USER, index=index)
+            self.__bus.publish(client_to_agent_pb2.Relay(presence=client_to_agent_pb2.Presence(index=index)))
+            return user
@@ -0,0 +1,81 @@
+import array
+import bisect
+
+
+class PresenceIndex:
+    def __init__(self):
+        self.__channels = {}
+        self.__members = {}
+        self.__users = array.array('i')
+
+    def move(self, user: int, channel: int = 0) -> int:
+        previous = self.__channels.get(user)
+
+        if previous == channel:
+            return previous
+
+        if previous is None:
+            self.__users.insert(bisect.bisect(self.__users, user), user)
+        else:
+            self.__leave(user, previous)
+
+        self.__channels[user] = channel
+        self.__join(user, channel)
+
+        return previous or 0
+
+    def remove(self, user: int) -> int:
+        previous = self.__channels.pop(user, None)
+
+        if previous is None:
+            return 0
+
+        del self.__users[bisect.bisect_left(self.__users, user)]
+        self.__leave(user, previous)
+
+        return previous
+
+    def get_channel(self, user: int) -> int:
+        return self.__channels.get(user, 0)
+
+    def get_members(self, channel: int) -> 'collections.abc.Sequence[int]':
+        return self.__members.get(channel, ())
+
+    def count(self, channel: int) -> int:
+        return len(self.__members.get(channel, ()))
+
+    def get_users(self) -> 'collections.abc.Sequence[int]':
+        return self.__users
+
+    def items(self) -> 'collections.abc.Iterator[tuple[int, int]]':
+        return iter(self.__channels.items())
+
+    def __join(self, user: int, channel: int) -> None:
+        if not channel:
+            return
+
+        members = self.__members.get(channel)
+
+        if members is None:
+            self.__members[channel] = members = array.array('i')
+
+        members.insert(bisect.bisect(members, user), user)
+
+    def __leave(self, user: int, channel: int) -> None:
+        if not channel:
+            return
+
+        members = self.__members[channel]
+        del members[bisect.bisect_left(members, user)]
+
+        if not members:
+            del self.__members[channel]
+
+    def __contains__(self, user: int) -> bool:
+        return user in self.__channels
+
+    def __iter__(self) -> 'collections.abc.Iterator[int]':
+        return iter(self.__users)
+
+    def __len__(self) -> int:
+        return len(self.__channels)
@@ -0,0 +1,50 @@
+import bisect
+import hashlib
+
+
+def get_hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+class Ring:
+    __replicas = 64
+
+    def __init__(self):
+        self.__hashes = []
+        self.__nodes = []
+        self.__members = set()
+
+    def add(self, node: str) -> None:
+        if node in self.__members:
+            return
+
+        self.__members.add(node)
+
+        for replica in range(self.__replicas):
+            key = get_hash(f'{node}#{replica}')
+            position = bisect.bisect(self.__hashes, key)
+            self.__hashes.insert(position, key)
+            self.__nodes.insert(position, node)
+
+    def remove(self, node: str) -> None:
+        if node not in self.__members:
+            return
+
+        self.__members.discard(node)
+
+        points = [(key, other) for key, other in zip(self.__hashes, self.__nodes) if other != node]
+        self.__hashes = [key for key, _ in points]
+        self.__nodes = [other for _, other in points]
+
+    def get(self, key) -> str:
+        assert self.__hashes
+
+        position = bisect.bisect(self.__hashes, get_hash(str(key)))
+
+        return self.__nodes[position % len(self.__nodes)]
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.__members
+
+    def __len__(self) -> int:
+        return len(self.__members)
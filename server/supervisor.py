@@ -0,0 +1,163 @@
+import asyncio
+import collections
+import logging
+import mmap
+import multiprocessing
+import os
+import time
+
+
+Service = collections.namedtuple(
+    'Service', ('Name', 'Type', 'Arguments', 'CPUs')
+)
+Usage = collections.namedtuple(
+    'Usage', ('CPU', 'RSS')
+)
+
+
+def launch(service: Service) -> None:
+    logging.basicConfig(level=logging.DEBUG)
+
+    if service.CPUs and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, service.CPUs)
+
+    try:
+        instance = service.Type(*service.Arguments)
+        asyncio.get_event_loop().run_until_complete(instance.run())
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        logging.exception(f'Process failed: {service.Name}')
+        logging.shutdown()
+        os._exit(1)
+
+
+def get_usage(pid: int) -> Usage:
+    try:
+        with open(f'/proc/{pid}/stat') as stat, open(f'/proc/{pid}/statm') as statm:
+            fields = stat.read().rsplit(')', 1)[1].split()
+            pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+    ticks = os.sysconf('SC_CLK_TCK')
+
+    return Usage((int(fields[11]) + int(fields[12])) / ticks, pages * mmap.PAGESIZE)
+
+
+def get_cpus() -> 'tuple[int]':
+    if hasattr(os, 'sched_getaffinity'):
+        return tuple(sorted(os.sched_getaffinity(0)))
+    else:
+        return tuple(range(os.cpu_count() or 1))
+
+
+class Worker:
+    def __init__(self, service: Service):
+        self.service = service
+        self.process = None
+        self.restarts = 0
+        self.failures = 0
+        self.start_time = 0
+        self.retry_time = 0
+        self.usage = None
+        self.usage_time = 0
+
+
+class Supervisor:
+    __check_seconds = 1
+    __report_seconds = 30
+    __stable_seconds = 10
+    __max_backoff_seconds = 30
+
+    def __init__(self, services: 'collections.Iterable[Service]'):
+        self.__context = multiprocessing.get_context('spawn')
+        self.__workers = tuple(Worker(service) for service in services)
+
+    def start(self) -> None:
+        for worker in self.__workers:
+            self.__start(worker)
+
+    def stop(self) -> None:
+        for worker in self.__workers:
+            if worker.process is not None and worker.process.is_alive():
+                worker.process.terminate()
+
+        for worker in self.__workers:
+            if worker.process is not None:
+                worker.process.join()
+
+    async def run(self) -> None:
+        self.start()
+        report_time = time.time() + self.__report_seconds
+
+        try:
+            while True:
+                await asyncio.sleep(self.__check_seconds)
+
+                self.__check()
+
+                if report_time <= time.time():
+                    self.__report()
+                    report_time = time.time() + self.__report_seconds
+        finally:
+            self.stop()
+
+    @property
+    def workers(self) -> 'tuple[Worker]':
+        return self.__workers
+
+    def __start(self, worker: Worker) -> None:
+        worker.process = self.__context.Process(
+            target=launch, args=(worker.service,), name=worker.service.Name, daemon=True)
+        worker.process.start()
+        worker.start_time = time.time()
+        worker.usage = None
+        worker.usage_time = 0
+
+        logging.info(f'Process started: {worker.service.Name} {worker.process.pid}')
+
+    def __check(self) -> None:
+        now = time.time()
+
+        for worker in self.__workers:
+            if worker.process.is_alive():
+                continue
+
+            if not worker.retry_time:
+                if self.__stable_seconds <= now - worker.start_time:
+                    worker.failures = 0
+
+                backoff = min(2 ** worker.failures - 1, self.__max_backoff_seconds)
+                worker.failures += 1
+                worker.retry_time = now + backoff
+
+                logging.warning(
+                    f'Process exited: {worker.service.Name} {worker.process.pid} '
+                    f'with {worker.process.exitcode}, restart in {backoff}s')
+
+            if worker.retry_time <= now:
+                worker.restarts += 1
+                worker.retry_time = 0
+                self.__start(worker)
+
+    def __report(self) -> None:
+        now = time.time()
+
+        for worker in self.__workers:
+            usage = get_usage(worker.process.pid)
+
+            if usage is None:
+                continue
+
+            cpu = 0.0
+
+            if worker.usage is not None and worker.usage_time < now:
+                cpu = (usage.CPU - worker.usage.CPU) / (now - worker.usage_time) * 100
+
+            worker.usage = usage
+            worker.usage_time = now
+
+            logging.info(
+                f'Process usage: {worker.service.Name} {worker.process.pid} '
+                f'cpu {cpu:.1f}%, rss {usage.RSS / 2 ** 20:.1f}MiB, restarts {worker.restarts}')
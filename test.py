@@ -1,4 +1,6 @@
 import asyncio
+import os
+import time
 
 import grpc
 import mock
@@ -6,19 +8,41 @@ import pytest
 
 from proto.client_to_agent_pb2 import *
 from server.agent import Agent
+from server.agent import RemoteProcedureCall
+from server.broadcast import Coalescer
+from server.broadcast import Cursor
+from server.broadcast import Limit
+from server.broadcast import Mailbox
+from server.broadcast import MessageLog
+from server.broadcast import Overflow
+from server.broadcast import Overflowed
+from server.broadcast import Selector
+from server.broadcast import Statistics
+from server.broadcast import encode_field
+from server.broadcast import pack
+from server.fanout import Fanout
+from server.heartbeat import Deadlines
 from server.heartbeat import Heartbeat
+from server.presence import PresenceIndex
+from server.ring import Ring
+from server.supervisor import Service
+from server.supervisor import Supervisor
+from server.supervisor import get_usage
 import server.channel as channel
 import server.lobby as lobby
 
 
 LOBBY_IP = 'localhost:50052'
 HEARTBEAT_IP = 'localhost:50051'
+CHANNEL_IP = 'localhost:50053'
 
 
 @pytest.mark.asyncio
-async def test_agent() -> None:
+async def test_agent(tmp_path) -> None:
     agent_ip = 'localhost:50050'
-    service = Agent(agent_ip, HEARTBEAT_IP, LOBBY_IP)
+
+    with mock.patch('tempfile.gettempdir', return_value=str(tmp_path)):
+        service = Agent(agent_ip, HEARTBEAT_IP, LOBBY_IP)
 
     message = LoginRequest()
     mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
@@ -26,33 +50,123 @@ async def test_agent() -> None:
     assert response.index == 1
 
 
+@pytest.mark.asyncio
+async def test_agent_continues_indexes_after_restart(tmp_path) -> None:
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+
+    with mock.patch('tempfile.gettempdir', return_value=str(tmp_path)):
+        indexes = [(await Agent('localhost:50050', HEARTBEAT_IP, LOBBY_IP).TryLogin(
+            LoginRequest(), mock_context)).index for _ in range(2)]
+
+    assert indexes[0] < indexes[1]
+
+
+@pytest.mark.asyncio
+async def test_agent_checks_every_due_user(tmp_path) -> None:
+    with mock.patch('tempfile.gettempdir', return_value=str(tmp_path)):
+        service = Agent('localhost:50050', HEARTBEAT_IP, LOBBY_IP)
+
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+
+    for _ in range(3):
+        await service.TryLogin(LoginRequest(), mock_context)
+
+    heartbeat_stub = mock.Mock()
+    heartbeat_stub.TryUsersLives = mock.AsyncMock(side_effect=lambda request: UsersLivesReply(
+        indexes=request.indexes,
+        statuses=tuple(
+            UserLivesReply.Status.LIVE if index == 1 else UserLivesReply.Status.UNKNOWN
+            for index in request.indexes)))
+    lobby_stub = mock.Mock()
+    lobby_stub.TryUsersExit = mock.AsyncMock(side_effect=lambda request: UsersExitReply(
+        indexes=request.indexes, statuses=tuple(StatusReply.Status.OK for _ in request.indexes)))
+    lobby_stub.TryUserRemove = mock.AsyncMock(return_value=Empty())
+    service._Agent__heartbeat_rpc = RemoteProcedureCall(None, heartbeat_stub)
+    service._Agent__lobby_rpcs = (RemoteProcedureCall(None, lobby_stub),)
+
+    with mock.patch('time.time', return_value=time.time() + 60):
+        await service._Agent__check_users()
+
+    assert heartbeat_stub.TryUsersLives.await_count == 1
+    assert lobby_stub.TryUserRemove.await_count == 2
+    assert lobby_stub.TryUsersExit.await_count == 1
+    assert list(service._Agent__users) == [1]
+    assert len(service._Agent__deadlines) == 1
+
+
+@pytest.mark.asyncio
+async def test_agent_reschedules_users_on_failure(tmp_path) -> None:
+    with mock.patch('tempfile.gettempdir', return_value=str(tmp_path)):
+        service = Agent('localhost:50050', HEARTBEAT_IP, LOBBY_IP)
+
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+
+    for _ in range(2):
+        await service.TryLogin(LoginRequest(), mock_context)
+
+    error = grpc.aio.AioRpcError(grpc.StatusCode.UNAVAILABLE, grpc.aio.Metadata(), grpc.aio.Metadata())
+    heartbeat_stub = mock.Mock()
+    heartbeat_stub.TryUsersLives = mock.AsyncMock(side_effect=error)
+    lobby_stub = mock.Mock()
+    lobby_stub.TryUsersExit = mock.AsyncMock(side_effect=error)
+    service._Agent__heartbeat_rpc = RemoteProcedureCall(None, heartbeat_stub)
+    service._Agent__lobby_rpcs = (RemoteProcedureCall(None, lobby_stub),)
+
+    with mock.patch('time.time', return_value=time.time() + 60):
+        await service._Agent__check_users()
+        assert len(service._Agent__deadlines) == 2
+
+        service._Agent__tracked_users.update(service._Agent__users)
+        await service._Agent__check_users()
+
+    assert lobby_stub.TryUsersExit.await_count == 1
+    assert len(service._Agent__deadlines) == 2
+    assert len(service._Agent__users) == 2
+
+
+@pytest.mark.asyncio
+async def test_lobby_exits_idle_users() -> None:
+    service = lobby.Lobby(LOBBY_IP, CHANNEL_IP)
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    chats = service._Lobby__chats
+
+    for index in (1, 2):
+        service._Lobby__users[index] = lobby.User(index, chats)
+
+    service._Lobby__users[1].validate()
+    response = await service.TryUsersExit(UsersRequest(indexes=(1, 2, 3)), mock_context)
+    assert tuple(response.statuses) == (StatusReply.Status.OK, StatusReply.Status.QUIT, StatusReply.Status.OK)
+    assert (await service._Lobby__users[2].statuses.receive())[0].status == StatusReply.Status.QUIT
+
+
 @pytest.mark.asyncio
 async def test_lobby() -> None:
-    channel_port = 50053
-    service = lobby.Lobby(LOBBY_IP, 'localhost', (channel_port,))
+    service = lobby.Lobby(LOBBY_IP, CHANNEL_IP)
     user_index = 0
     test_message = 'Hello, world'
     message = Chat(index=user_index)
 
     mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
-    service._Lobby__users[user_index] = user = lobby.User(user_index)
-    user.chats.append(Chat(index=1, text=test_message))
+    chats = service._Lobby__chats
+    service._Lobby__users[user_index] = user = lobby.User(user_index, chats)
+    chats.append((1, Chat(index=1, text=test_message).SerializeToString()))
 
     response_iterator = service.TryChatReceive(message, mock_context)
     response = await response_iterator.__anext__()
-    assert response.text == test_message
+    assert ChatBatch.FromString(response).chats[0].text == test_message
 
     message = Chat(index=2, text=test_message)
     await service.TryChatSend(message, mock_context)
 
     response = await response_iterator.__anext__()
-    assert response.text == test_message
+    assert ChatBatch.FromString(response).chats[0].text == test_message
 
-    await service.TryCommand(
+    response = await service.TryCommand(
         CommandRequest(index=user_index, status=CommandRequest.Status.MAKE_CHANNEL),
         mock_context)
+    assert response.address == CHANNEL_IP
     assert service._Lobby__channels
-    assert user.channel == channel_port
+    assert user.channel == response.channels[0]
 
     response = await service.TryCommand(
         CommandRequest(index=user_index, status=CommandRequest.Status.LIST_CHANNELS),
@@ -64,12 +178,397 @@ async def test_lobby() -> None:
         mock_context)
     assert response.users and response.channels
 
+    version = response.version
+    response = await service.TryCommand(
+        CommandRequest(index=user_index, status=CommandRequest.Status.LIST_USERS, version=version),
+        mock_context)
+    assert response.status == CommandReply.Status.UNCHANGED
+    assert not response.users
+
     await service.TryCommand(
         CommandRequest(index=user_index, status=CommandRequest.Status.LEAVE_CHANNEL),
         mock_context)
     assert not service._Lobby__channels
     assert not user.channel
 
+    response = await service.TryCommand(
+        CommandRequest(index=user_index, status=CommandRequest.Status.LIST_CHANNELS, version=version),
+        mock_context)
+    assert response.status != CommandReply.Status.UNCHANGED
+    assert response.version > version
+    assert not response.channels
+
+
+@pytest.mark.asyncio
+async def test_lobby_wakes_receiver_on_send() -> None:
+    service = lobby.Lobby(LOBBY_IP, CHANNEL_IP)
+    user_index = 0
+    test_message = 'Hello, world'
+
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    response_iterator = service.TryChatReceive(Chat(index=user_index), mock_context)
+    receiving = asyncio.ensure_future(response_iterator.__anext__())
+
+    await asyncio.sleep(0)
+    assert not receiving.done()
+
+    await service.TryChatSend(Chat(index=1, text=test_message), mock_context)
+
+    response = await asyncio.wait_for(receiving, 0.1)
+    assert ChatBatch.FromString(response).chats[0].text == test_message
+
+
+@pytest.mark.asyncio
+async def test_lobby_drops_user_when_streams_close() -> None:
+    service = lobby.Lobby(LOBBY_IP, CHANNEL_IP)
+    user_index = 1
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    chat_iterator = service.TryChatReceive(Chat(index=user_index), mock_context)
+    status_iterator = service.TryStatusRequest(UserRequest(index=user_index), mock_context)
+
+    receivings = tuple(asyncio.ensure_future(iterator.__anext__()) for iterator in (chat_iterator, status_iterator))
+    await asyncio.sleep(0)
+    assert service.streams == 2
+
+    await service.TryChatSend(Chat(index=2, text='Hello, world'), mock_context)
+    await receivings[0]
+    await chat_iterator.aclose()
+    assert user_index in service._Lobby__users
+
+    receivings[1].cancel()
+    await asyncio.sleep(0)
+    assert user_index not in service._Lobby__users
+    assert service.streams == 0
+
+
+@pytest.mark.asyncio
+async def test_lobby_relays_between_shards() -> None:
+    service = lobby.Lobby(LOBBY_IP, CHANNEL_IP, shard=0, bus_addresses=(LOBBY_IP, 'localhost:50054'))
+    outbox = service._Lobby__bus._Bus__peers[0][1]
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    response_iterator = service.TryChatReceive(Chat(index=2), mock_context)
+    receiving = asyncio.ensure_future(response_iterator.__anext__())
+    await asyncio.sleep(0)
+
+    response = await service.TryCommand(
+        CommandRequest(index=2, status=CommandRequest.Status.MAKE_CHANNEL), mock_context)
+    channel_index = response.channels[0]
+    assert channel_index % 2 == 0
+
+    async def relay():
+        yield Relay(presence=Presence(index=1))
+        yield Relay(presence=Presence(index=1, channel=channel_index))
+        yield Relay(chat=Chat(index=1, text='from other shard'))
+
+    await service.TryRelay(relay(), mock_context)
+
+    response = await asyncio.wait_for(receiving, 0.1)
+    assert ChatBatch.FromString(response).chats[0].text == 'from other shard'
+
+    response = await service.TryCommand(
+        CommandRequest(index=2, status=CommandRequest.Status.LIST_USERS, channel=channel_index), mock_context)
+    assert tuple(response.users) == (1, 2)
+
+    relays = [Relay.FromString(data) for data in await outbox.receive()]
+    assert [relay.presence.channel for relay in relays] == [0, channel_index]
+
+    async def remove():
+        yield Relay(presence=Presence(index=1, removed=True))
+
+    await service.TryRelay(remove(), mock_context)
+    await service.TryCommand(
+        CommandRequest(index=2, status=CommandRequest.Status.LEAVE_CHANNEL), mock_context)
+    assert not service._Lobby__channels
+
+
+@pytest.mark.asyncio
+async def test_lobby_resynchronizes_shards() -> None:
+    service = lobby.Lobby(LOBBY_IP, CHANNEL_IP, shard=0, bus_addresses=(LOBBY_IP, 'localhost:50054'))
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    service._Lobby__get_user(2)
+    presence = service._Lobby__presence
+
+    async def relay():
+        yield Relay(presence=Presence(index=1))
+        yield Relay(presence=Presence(index=3))
+
+    await service.TryRelay(relay(), mock_context)
+    assert list(presence) == [1, 2, 3]
+
+    connected = asyncio.Event()
+
+    async def reconnect():
+        yield Relay(snapshot=Snapshot(shard=1, presences=(Presence(index=3, channel=4, address=CHANNEL_IP),)))
+        connected.set()
+        await asyncio.Event().wait()
+
+    relaying = asyncio.ensure_future(service.TryRelay(reconnect(), mock_context))
+    await connected.wait()
+    assert list(presence) == [2, 3]
+    assert 4 in service._Lobby__channels
+    assert service._Lobby__channel_index == 2
+
+    assert [(relayed.index, relayed.channel) for relayed in service._Lobby__get_presences()] == [(2, 0)]
+
+    relaying.cancel()
+    await asyncio.sleep(0)
+    assert list(presence) == [2]
+    assert not service._Lobby__channels
+
+
+@pytest.mark.asyncio
+async def test_lobby_watches_directory() -> None:
+    service = lobby.Lobby(LOBBY_IP, CHANNEL_IP)
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    response_iterator = service.TryChatReceive(Chat(index=1), mock_context)
+    receiving = asyncio.ensure_future(response_iterator.__anext__())
+    await asyncio.sleep(0)
+
+    watching = service.WatchDirectory(Empty(), mock_context)
+    snapshot = await watching.__anext__()
+    assert snapshot.snapshot
+    assert [(entry.status, entry.index) for entry in snapshot.entries] == [(DirectoryEntry.Status.MOVE_USER, 1)]
+
+    response = await service.TryCommand(
+        CommandRequest(index=1, status=CommandRequest.Status.MAKE_CHANNEL), mock_context)
+    channel_index = response.channels[0]
+
+    directory = await asyncio.wait_for(watching.__anext__(), 0.1)
+    assert not directory.snapshot
+    assert [(entry.status, entry.channel) for entry in directory.entries] == [
+        (DirectoryEntry.Status.ADD_CHANNEL, channel_index), (DirectoryEntry.Status.MOVE_USER, channel_index)]
+    assert directory.version > snapshot.version
+
+    capacity = service._Lobby__directory.capacity
+
+    async def relay():
+        for index in range(capacity + 1):
+            yield Relay(presence=Presence(index=100 + index))
+
+    await service.TryRelay(relay(), mock_context)
+
+    directory = await asyncio.wait_for(watching.__anext__(), 0.1)
+    assert directory.snapshot
+    assert len(directory.entries) == 1 + 1 + capacity + 1
+
+    await watching.aclose()
+    receiving.cancel()
+
+
+@pytest.mark.asyncio
+async def test_lobby_pages_users() -> None:
+    service = lobby.Lobby(LOBBY_IP, CHANNEL_IP)
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    response_iterator = service.TryChatReceive(Chat(index=1), mock_context)
+    receiving = asyncio.ensure_future(response_iterator.__anext__())
+    await asyncio.sleep(0)
+
+    async def relay():
+        for index in (7, 3, 5, 9, 2):
+            yield Relay(presence=Presence(index=index))
+
+    await service.TryRelay(relay(), mock_context)
+
+    users = []
+    request = CommandRequest(index=1, status=CommandRequest.Status.LIST_USERS, limit=2)
+
+    with mock.patch.object(lobby.Lobby, '_Lobby__listing_capacity', 2):
+        while True:
+            response = await service.TryCommand(request, mock_context)
+            users.extend(response.users)
+
+            if not response.HasField('after'):
+                break
+
+            request.after = response.after
+
+    assert users == [1, 2, 3, 5, 7, 9]
+    assert len(service._Lobby__listings) == 2
+
+    replies = [reply async for reply in service.TryUserList(
+        CommandRequest(status=CommandRequest.Status.LIST_USERS, after=3, limit=2), mock_context)]
+    assert [tuple(reply.users) for reply in replies] == [(5, 7), (9,)]
+
+    receiving.cancel()
+
+
+@pytest.mark.asyncio
+async def test_lobby_session() -> None:
+    service = lobby.Lobby(LOBBY_IP, CHANNEL_IP)
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    requests = {index: asyncio.Queue() for index in (1, 2)}
+
+    async def read(index: int):
+        yield Frame(login=UserRequest(index=index))
+
+        while True:
+            yield await requests[index].get()
+
+    sessions = {index: service.Session(read(index), mock_context) for index in requests}
+
+    async def receive(index: int) -> Frame:
+        response = await asyncio.wait_for(sessions[index].__anext__(), 0.1)
+
+        return response if isinstance(response, Frame) else Frame.FromString(response)
+
+    receivings = {index: asyncio.ensure_future(receive(index)) for index in requests}
+    await asyncio.sleep(0)
+
+    requests[1].put_nowait(Frame(command=CommandRequest(status=CommandRequest.Status.MAKE_CHANNEL)))
+    response = await receivings[1]
+    channel_index = response.reply.channels[0]
+    assert response.reply.status == CommandReply.Status.SUCCESS
+
+    requests[2].put_nowait(Frame(command=CommandRequest(
+        status=CommandRequest.Status.JOIN_CHANNEL, channel=channel_index)))
+    assert (await receivings[2]).reply.status == CommandReply.Status.SUCCESS
+
+    for index in (1, 2):
+        response = await receive(1)
+        assert response.status.status == StatusReply.Status.JOIN_USER
+        assert response.status.index == index
+
+    requests[2].put_nowait(Frame(chat=Chat(text='Hello, channel', channel=channel_index)))
+    response = await receive(1)
+    assert response.chat.index == 2
+    assert response.chat.text == 'Hello, channel'
+
+    requests[2].put_nowait(Frame(chats=ChatBatch(chats=[
+        Chat(text=text, channel=channel_index) for text in ('a', 'b', 'c')])))
+    texts = []
+
+    while len(texts) < 3:
+        response = await receive(1)
+        texts.extend(chat.text for chat in (response.chats.chats if response.chats.chats else [response.chat]))
+
+    assert texts == ['a', 'b', 'c']
+
+    requests[1].put_nowait(Frame(keepalive=HeartbeatReply()))
+    assert (await receive(1)).keepalive.time
+
+    assert service.streams == 2
+    assert not len(service._Lobby__heartbeats)
+
+    for session in sessions.values():
+        await session.aclose()
+
+    assert service.streams == 0
+    assert not service._Lobby__channels
+
+
+@pytest.mark.asyncio
+async def test_message_log() -> None:
+    log = MessageLog(2)
+    cursor = Cursor(log)
+
+    for text in ('a', 'b', 'c'):
+        log.append(text)
+
+    assert await cursor.receive() == ['b', 'c']
+    assert cursor.offset == log.sequence == 3
+
+    late_cursor = Cursor(log)
+    log.append('d')
+    assert await late_cursor.receive() == ['d']
+
+    assert MessageLog(4).read(0) == ([], 0)
+    assert not len(Mailbox())
+
+
+@pytest.mark.asyncio
+async def test_mailbox_overflow() -> None:
+    statistics = Statistics()
+    mailbox = Mailbox(Limit(2, Overflow.DROP_OLDEST), statistics)
+
+    for item in range(4):
+        mailbox.append(item)
+
+    assert await mailbox.receive() == [2, 3]
+    assert statistics.dropped == 2
+    assert str(statistics) == '2 dropped, 0 evicted'
+
+    mailbox = Mailbox(Limit(2, Overflow.COALESCE), statistics, key=lambda item: item[0])
+
+    for item in (('a', 1), ('b', 1), ('a', 2)):
+        mailbox.append(item)
+
+    assert await mailbox.receive() == [('b', 1), ('a', 2)]
+
+    mailbox = Mailbox(Limit(1, Overflow.DISCONNECT), statistics)
+    mailbox.append(0)
+    mailbox.append(1)
+
+    with pytest.raises(Overflowed):
+        await mailbox.receive()
+
+    log = MessageLog(1)
+    cursor = Cursor(log, Overflow.DISCONNECT, statistics)
+    log.append(0)
+    log.append(1)
+
+    with pytest.raises(Overflowed):
+        await cursor.receive()
+
+    assert statistics.evicted == 2
+
+
+@pytest.mark.asyncio
+async def test_coalescer_batches_bursts() -> None:
+    log = MessageLog(16)
+    coalescer = Coalescer(Cursor(log))
+
+    receiving = asyncio.ensure_future(coalescer.receive())
+    await asyncio.sleep(0.01)
+    log.append(0)
+    assert await receiving == [0]
+    assert not coalescer.delay
+
+    log.append(1)
+    receiving = asyncio.ensure_future(coalescer.receive())
+    await asyncio.sleep(0)
+    log.append(2)
+
+    assert await receiving == [1, 2]
+    assert coalescer.delay
+
+    chats = [Chat(index=index, text='x' * 10).SerializeToString() for index in range(4)]
+    batches = pack((encode_field(1, chat) for chat in chats), 32)
+    assert len(batches) == 2
+    assert [chat.index for batch in batches for chat in ChatBatch.FromString(batch).chats] == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_selector_waits_on_one_wakeup() -> None:
+    log = MessageLog(16)
+    mailbox = Mailbox()
+    selector = Selector()
+    selector.add(Coalescer(Cursor(log)), list)
+    selector.add(mailbox, lambda items: [item * 10 for item in items])
+    tasks = len(asyncio.all_tasks())
+
+    receiving = asyncio.ensure_future(selector.receive())
+    await asyncio.sleep(0)
+    assert not receiving.done()
+    assert len(asyncio.all_tasks()) == tasks + 1
+
+    mailbox.append(1)
+    assert await asyncio.wait_for(receiving, 0.1) == [10]
+
+    receiving = asyncio.ensure_future(selector.receive())
+    await asyncio.sleep(0)
+    log.append(2)
+    mailbox.append(3)
+    assert sorted(await asyncio.wait_for(receiving, 0.1)) == [2, 30]
+
+    selector.remove(mailbox)
+    mailbox.append(4)
+    receiving = asyncio.ensure_future(selector.receive())
+    await asyncio.sleep(0)
+    assert not receiving.done()
+
+    receiving.cancel()
+    selector.close()
+
 
 @pytest.mark.asyncio
 async def test_channel() -> None:
@@ -77,18 +576,293 @@ async def test_channel() -> None:
     user1_index = 1
     test_message = 'Hello, world'
 
-    ch = channel.Channel('localhost', 50053)
+    ch = channel.Channel(CHANNEL_IP)
+    room = ch.make_room(1)
     handler = ch._Channel__handler
     mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
-    iterator = handler.TryChatReceive(Chat(index=user0_index), mock_context)
-    handler._Handler__users[user0_index] = user = channel.User()
-    user.chats.append(Chat(index=user1_index, text=test_message))
+    iterator = handler.TryChatReceive(Chat(index=user0_index, channel=room.index), mock_context)
+    chats = room._Room__chats
+    room._Room__users[user0_index] = channel.User(chats)
+    chats.append((user0_index, Chat(index=user0_index, text=test_message).SerializeToString()))
+    chats.append((user1_index, Chat(index=user1_index, text=test_message).SerializeToString()))
 
-    response = await iterator.__anext__()
+    response = ChatBatch.FromString(await iterator.__anext__()).chats[0]
     assert response.index == user1_index
     assert response.text == test_message
 
 
+@pytest.mark.asyncio
+async def test_channel_rooms() -> None:
+    ch = channel.Channel(CHANNEL_IP)
+    rooms = ch.make_room(1), ch.make_room(2)
+    handler = ch._Channel__handler
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    iterator = handler.TryChatReceive(Chat(index=0, channel=1), mock_context)
+    receiving = asyncio.ensure_future(iterator.__anext__())
+    await asyncio.sleep(0)
+
+    await handler.TryChatSend(Chat(index=2, text='other room', channel=2), mock_context)
+    await handler.TryChatSend(Chat(index=1, text='same room', channel=1), mock_context)
+
+    response = ChatBatch.FromString(await asyncio.wait_for(receiving, 0.1)).chats[0]
+    assert response.text == 'same room'
+
+    ch.remove_room(2)
+    assert 2 not in handler._Handler__rooms
+    assert list(rooms[0].users) == [0]
+
+
+@pytest.mark.asyncio
+async def test_channel_subscription() -> None:
+    ch = channel.Channel(CHANNEL_IP)
+    handler = ch._Channel__handler
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    iterator = handler.TrySubscribe(Subscription(channel=3), mock_context)
+    receiving = asyncio.ensure_future(iterator.__anext__())
+    await asyncio.sleep(0)
+    assert handler.rooms == 1
+
+    await handler.TryChatSend(Chat(index=1, text='Hello, channel', channel=3), mock_context)
+    assert ChatBatch.FromString(await asyncio.wait_for(receiving, 0.1)).chats[0].index == 1
+
+    await iterator.aclose()
+    assert not handler.rooms
+    assert not handler.streams
+
+
+@pytest.mark.asyncio
+@mock.patch.object(lobby.Lobby, '_Lobby__subscribe_seconds', 0)
+async def test_lobby_places_room_on_host_ring() -> None:
+    service = lobby.Lobby(LOBBY_IP, '')
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    service._Lobby__get_user(1)
+
+    response = await service.TryCommand(
+        CommandRequest(index=1, status=CommandRequest.Status.MAKE_CHANNEL), mock_context)
+    assert response.status == CommandReply.Status.FAILURE
+
+    async def report(load: ChannelLoad):
+        yield load
+        await asyncio.Event().wait()
+
+    registerings = tuple(
+        asyncio.ensure_future(service.TryChannelRegister(report(load), mock_context)) for load in (
+            ChannelLoad(address='localhost:50060', rooms=1, streams=2),
+            ChannelLoad(address='localhost:50061')))
+    await asyncio.sleep(0)
+    assert service.loads['localhost:50060'].streams == 2
+
+    response = await service.TryCommand(
+        CommandRequest(index=1, status=CommandRequest.Status.MAKE_CHANNEL), mock_context)
+    assert response.status == CommandReply.Status.SUCCESS
+    assert response.address == service._Lobby__ring.get(response.channels[0])
+
+    await service.TryCommand(CommandRequest(index=1, status=CommandRequest.Status.LEAVE_CHANNEL), mock_context)
+    assert not service._Lobby__subscriptions
+
+    reconnecting = asyncio.ensure_future(
+        service.TryChannelRegister(report(ChannelLoad(address='localhost:50060')), mock_context))
+    await asyncio.sleep(0)
+    registerings[0].cancel()
+    await asyncio.sleep(0)
+    assert service._Lobby__hosts == {'localhost:50060': 1, 'localhost:50061': 1}
+
+    for registering in registerings + (reconnecting,):
+        registering.cancel()
+
+    await asyncio.sleep(0)
+    assert not service._Lobby__hosts
+    assert not service._Lobby__ring
+    assert not service.loads
+
+
+@pytest.mark.asyncio
+async def test_lobby_replies_once_host_is_subscribed() -> None:
+    service = lobby.Lobby(LOBBY_IP, '')
+    host = channel.Channel('localhost:50062')
+    await host.start()
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    service._Lobby__get_user(1)
+
+    async def report():
+        yield ChannelLoad(address=host.address)
+        await asyncio.Event().wait()
+
+    registering = asyncio.ensure_future(service.TryChannelRegister(report(), mock_context))
+    await asyncio.sleep(0)
+
+    response = await service.TryCommand(
+        CommandRequest(index=1, status=CommandRequest.Status.MAKE_CHANNEL), mock_context)
+    assert response.status == CommandReply.Status.SUCCESS
+    assert host.streams == 1
+
+    await service.TryCommand(CommandRequest(index=1, status=CommandRequest.Status.LEAVE_CHANNEL), mock_context)
+    registering.cancel()
+    await host.stop()
+
+
+def test_presence_index() -> None:
+    presence = PresenceIndex()
+
+    for user in range(1, 6):
+        presence.move(user)
+
+    assert presence.move(2, 10) == 0
+    assert presence.move(3, 10) == 0
+    assert presence.move(3, 20) == 10
+    assert list(presence.get_members(10)) == [2]
+    assert presence.count(20) == 1
+
+    assert presence.remove(2) == 10
+    assert not presence.count(10)
+    assert not presence.get_members(10)
+    assert 2 not in presence
+    assert len(presence) == 4
+    assert presence.get_channel(3) == 20
+
+    presence.move(5, 20)
+    presence.move(1, 20)
+    assert list(presence.get_members(20)) == [1, 3, 5]
+    assert list(presence) == [1, 3, 4, 5]
+    assert presence.get_channel(4) == 0
+
+    presence.move(-1)
+    presence.move(2 ** 31 - 1, 20)
+    assert presence.get_channel(-1) == 0
+    assert list(presence.get_members(20)) == [1, 3, 5, 2 ** 31 - 1]
+    assert list(presence.get_users()) == [-1, 1, 3, 4, 5, 2 ** 31 - 1]
+
+
+def test_ring_moves_few_keys() -> None:
+    ring = Ring()
+
+    for port in range(50060, 50064):
+        ring.add(f'localhost:{port}')
+
+    keys = range(1000)
+    placements = [ring.get(key) for key in keys]
+    assert len(set(placements)) == 4
+
+    ring.add('localhost:50064')
+    moved = [key for key in keys if ring.get(key) != placements[key]]
+    assert 0 < len(moved) < 400
+    assert all(ring.get(key) == 'localhost:50064' for key in moved)
+
+    ring.remove('localhost:50064')
+    assert [ring.get(key) for key in keys] == placements
+
+
+@pytest.mark.asyncio
+async def test_channel_exports_room() -> None:
+    ch = channel.Channel(CHANNEL_IP)
+    handler = ch._Channel__handler
+    room = ch.make_room(1)
+    member = room.get_user(2)
+    room.send(Chat(index=2, text='backlog', channel=1))
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+
+    migration = Migration(channel=1, source=CHANNEL_IP, destination='localhost:50060')
+    chats = [Chat.FromString(chat) async for chat in handler.TryRoomExport(migration, mock_context)]
+    assert [chat.text for chat in chats] == ['backlog']
+
+    status = (await member.statuses.receive())[0]
+    assert status.status == StatusReply.Status.MOVE_CHANNEL
+    assert status.address == 'localhost:50060'
+
+
+@pytest.mark.asyncio
+async def test_channel_imports_room_before_serving() -> None:
+    source = channel.Channel('localhost:50065')
+    await source.start()
+    source.make_room(1).send(Chat(index=2, text='backlog', channel=1))
+    destination = channel.Channel('localhost:50066')
+    handler = destination._Channel__handler
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+
+    migration = Migration(channel=1, source=source.address, destination=destination.address)
+    importing = asyncio.ensure_future(handler.TryRoomImport(migration, mock_context))
+    await asyncio.sleep(0)
+    sending = asyncio.ensure_future(handler.TryChatSend(Chat(index=3, text='moving', channel=1), mock_context))
+    iterator = handler.TrySubscribe(Subscription(channel=1, moved=True), mock_context)
+    receiving = asyncio.ensure_future(iterator.__anext__())
+    await asyncio.wait_for(asyncio.gather(importing, sending), 1)
+
+    chats = ChatBatch.FromString(await asyncio.wait_for(receiving, 1)).chats
+    assert [chat.text for chat in chats] == ['moving']
+
+    await handler.TryRoomImport(migration, mock_context)
+    room = handler._Handler__rooms[1]
+    assert [Chat.FromString(chat).text for chat in room.backlog] == ['backlog', 'moving']
+
+    await iterator.aclose()
+    await source.stop()
+
+
+@pytest.mark.asyncio
+@mock.patch.object(lobby.Lobby, '_Lobby__subscribe_seconds', 0)
+async def test_lobby_moves_room_to_new_host() -> None:
+    service = lobby.Lobby(LOBBY_IP, '')
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    service._Lobby__get_user(1)
+
+    async def report(address: str):
+        yield ChannelLoad(address=address)
+        await asyncio.Event().wait()
+
+    registering = asyncio.ensure_future(service.TryChannelRegister(report('localhost:50060'), mock_context))
+    await asyncio.sleep(0)
+
+    response = await service.TryCommand(
+        CommandRequest(index=1, status=CommandRequest.Status.MAKE_CHANNEL), mock_context)
+    assert response.address == 'localhost:50060'
+
+    channel_index = response.channels[0]
+    member = service._Lobby__channels[channel_index].get_user(1)
+
+    moving = asyncio.ensure_future(service.TryChannelRegister(report('localhost:50061'), mock_context))
+    await asyncio.sleep(0)
+    registering.cancel()
+    await asyncio.sleep(0)
+    assert service._Lobby__placements[channel_index] == 'localhost:50061'
+
+    status = (await member.statuses.receive())[-1]
+    assert status.status == StatusReply.Status.MOVE_CHANNEL
+    assert status.address == 'localhost:50061'
+
+    await service.TryCommand(CommandRequest(index=1, status=CommandRequest.Status.LEAVE_CHANNEL), mock_context)
+    assert not service._Lobby__subscriptions
+
+    moving.cancel()
+    await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_fanout_shares_one_feed_per_room() -> None:
+    fanout = Fanout('localhost:50056')
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    request = Subscription(channel=1, origin='localhost:50060')
+    iterators = tuple(fanout.TrySubscribe(request, mock_context) for _ in range(2))
+    receivings = tuple(asyncio.ensure_future(iterator.__anext__()) for iterator in iterators)
+    await asyncio.sleep(0)
+
+    feeds = fanout._Fanout__feeds
+    assert len(feeds) == 1
+    assert fanout.streams == 2
+
+    batch = ChatBatch(chats=(Chat(index=1, text='Hello, relay', channel=1),)).SerializeToString()
+    feeds['localhost:50060', 1].forwarded.set()
+    feeds['localhost:50060', 1].chats.append(batch)
+    assert [await asyncio.wait_for(receiving, 0.1) for receiving in receivings] == [batch, batch]
+
+    for iterator in iterators:
+        await iterator.aclose()
+
+    assert not feeds
+    assert not fanout.streams
+
+    await asyncio.sleep(0)
+
+
 @pytest.mark.asyncio
 async def test_heartbeat() -> None:
     user_index = 0
@@ -96,15 +870,106 @@ async def test_heartbeat() -> None:
     heartbeat = Heartbeat(HEARTBEAT_IP)
 
     iterator = heartbeat.TryHeartbeat(HeartbeatRequest(index=user_index), mock_context)
-    response = await iterator.__anext__()
+    response = HeartbeatReply.FromString(await iterator.__anext__())
     assert response.time
 
     response = await heartbeat.TryUserLives(UserRequest(index=user_index), mock_context)
     assert response.status == UserLivesReply.Status.LIVE
 
+    response = await heartbeat.TryUsersLives(UsersRequest(indexes=(user_index, 1)), mock_context)
+    assert tuple(response.statuses) == (UserLivesReply.Status.LIVE, UserLivesReply.Status.UNKNOWN)
+
     users = heartbeat._Heartbeat__users
     users[user_index] = heartbeat._Heartbeat__get_time_stamp() - 1
     response = await heartbeat.TryUserLives(UserRequest(index=user_index), mock_context)
     assert response.status == UserLivesReply.Status.UNKNOWN
     assert not users
 
+
+@pytest.mark.asyncio
+async def test_heartbeat_publishes_expired_users() -> None:
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    heartbeat = Heartbeat(HEARTBEAT_IP)
+    iterator = heartbeat.TryExpiredUsers(Empty(), mock_context)
+    receiving = asyncio.ensure_future(iterator.__anext__())
+    await asyncio.sleep(0)
+
+    time_stamp = heartbeat._Heartbeat__get_time_stamp()
+    users = heartbeat._Heartbeat__users
+    users[1] = time_stamp + 10
+    users[2] = time_stamp - 1
+    heartbeat._Heartbeat__expire_users()
+
+    response = await asyncio.wait_for(receiving, 0.1)
+    assert response.index == 2
+    assert list(users) == [1]
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_beats_each_cohort_once() -> None:
+    mock_context = mock.create_autospec(spec=grpc.aio.ServicerContext)
+    heartbeat = Heartbeat(HEARTBEAT_IP)
+    iterators = tuple(heartbeat.TryHeartbeat(HeartbeatRequest(index=index), mock_context) for index in range(8))
+
+    for iterator in iterators:
+        await iterator.__anext__()
+
+    receivings = tuple(asyncio.ensure_future(iterator.__anext__()) for iterator in iterators)
+    await asyncio.sleep(0)
+
+    cohorts = heartbeat._Heartbeat__cohorts
+    assert sum(map(len, cohorts)) == len(iterators)
+
+    for _ in cohorts:
+        heartbeat._Heartbeat__beat()
+
+    responses = await asyncio.wait_for(asyncio.gather(*receivings), 0.1)
+    assert all(HeartbeatReply.FromString(response).time for response in responses)
+
+    expirations = heartbeat.TryExpiredUsers(Empty(), mock_context)
+    receiving = asyncio.ensure_future(expirations.__anext__())
+    await asyncio.sleep(0)
+
+    await iterators[0].aclose()
+    assert heartbeat.streams == len(iterators) - 1
+
+    response = await asyncio.wait_for(receiving, 0.1)
+    assert response.index == 0
+
+
+def test_heartbeat_deadlines() -> None:
+    deadlines = Deadlines()
+
+    for index in (3, 1, 2, 4):
+        deadlines[index] = index * 10
+
+    deadlines[2] = 100
+    assert list(deadlines) == [1, 2, 3, 4]
+    assert deadlines[2] == 100
+
+    assert deadlines.pop_expired(35) == [1, 3]
+    assert list(deadlines) == [2, 4]
+    assert 1 not in deadlines and 4 in deadlines
+
+    del deadlines[4]
+    assert len(deadlines) == 1
+    assert deadlines.memory_per_user >= 12
+
+
+def test_supervisor_restarts_exited_process() -> None:
+    supervisor = Supervisor((Service('heartbeat', Heartbeat, ('unix:/nonexistent/heartbeat.sock',), ()),))
+    supervisor.start()
+    worker = supervisor.workers[0]
+
+    try:
+        worker.process.join(30)
+        supervisor._Supervisor__check()
+        assert worker.restarts == 1
+        assert worker.failures == 1
+    finally:
+        supervisor.stop()
+
+    usage = get_usage(os.getpid())
+
+    if usage is not None:
+        assert usage.RSS